@@ -0,0 +1,186 @@
+###############################################################################
+# file    BatchReport.py
+###############################################################################
+# brief   Headless reports of many CAN dumps, exported in parallel
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import sys
+import atexit
+import pathlib
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import plotly.io as pio
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Inlude file from other directory
+importPath = pathlib.Path(__file__).resolve().parents[1] / "LiveVisualizer"
+sys.path.insert(0, str(importPath))
+from FrameStore import openStore
+from Downsampling import downsample
+from StateSignals import stateTraces
+sys.path.remove(str(importPath))
+
+dumpSuffixes = (".txt", ".log")  # candump files taken from a directory
+reportFormats = ["html", "svg", "pdf"]
+
+# (PGN, signal, title) of the report rows, the doors follow as timeline bars
+reportSignals = [(0xFE6C, "speed", "Vehicle Speed [km/h]"),
+                 (0xF003, "acceleratorPedal", "Accelerator Pedal [%]"),
+                 (0xFD09, "fuelConsumption", "Fuel Consumption [l]")]
+
+
+# Figure of one dump from start (None: all) on, the CAN-Dump Converter shows
+# the same one
+def reportFigure(store, start=None):
+    fig = make_subplots(rows=len(reportSignals) + 1, cols=1, shared_xaxes=True,
+                        vertical_spacing = 0.065,
+                        subplot_titles=[title for _, _, title in reportSignals] + ["  Door Open State        "])
+
+    for row, (pgn, signal, title) in enumerate(reportSignals, 1):
+        frame = store.read(pgn, [signal], start=start)
+        y = frame[signal]
+        if(signal == "fuelConsumption" and len(y) > 0):
+            y = y - y.iloc[0]
+        x, y = downsample(frame["date"], y)  # About one point per pixel
+        fig.add_trace(go.Scatter(x=x, y=y, name=title, fill="tozeroy"), row=row, col=1)
+
+    for label, signal in [("Door 2", "door2"), ("Door 1", "door1")]:
+        for trace in stateTraces(store.runs(0xFDA5, signal, start=start), label):
+            fig.add_trace(trace, row=len(reportSignals) + 1, col=1)
+    fig.update_layout(barmode="overlay")
+    fig.update_xaxes(type="date")
+
+    fig.update_annotations(font=dict(size=18))
+    for i in fig.layout.annotations:
+        i.update(x=0.06, yshift=6)
+
+    gray = "#CCCCCC"
+    fig.update_layout(showlegend=False)
+    fig.update_yaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=5,
+                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
+                     tickfont=dict(size=15))
+    fig.update_xaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=10,
+                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
+                     tickfont=dict(size=15))
+    fig['layout']['yaxis3'].tickvals = [0, 0.25, 0.5, 0.75, 1.0, 1.25]
+    fig.update_layout(width=2000, height=1100, template="plotly_white")
+    return fig
+
+
+# Dump files of the given files and directories, sorted and without duplicates
+def dumpFiles(paths):
+    dumps = set()
+    for path in map(pathlib.Path, paths):
+        if(path.is_dir()):
+            dumps.update(p for p in path.iterdir() if(p.is_file() and p.suffix.lower() in dumpSuffixes))
+        else:
+            dumps.add(path)
+    return sorted(dumps)
+
+
+# {format: file} of the report of one dump
+def reportFiles(dump, output, formats):
+    return {format: pathlib.Path(output) / f"{dump.stem}.{format}" for format in formats}
+
+
+# All reports exist and are newer than the dump
+def upToDate(dump, files):
+    modified = dump.stat().st_mtime_ns
+    return all(f.exists() and f.stat().st_mtime_ns >= modified for f in files.values())
+
+
+# Worker initializer: keeps one image export process (Kaleido's browser) for
+# all dumps of the worker instead of starting one per image
+def startExporter():
+    try:
+        import kaleido
+        kaleido.start_sync_server()
+        atexit.register(kaleido.stop_sync_server)
+    except (ImportError, AttributeError):
+        pass  # Not installed or older Kaleido, write_images() starts its own
+
+
+# Worker: reports of one dump, or the error if it could not be converted
+def writeReport(dump, output, formats, start=None):
+    try:
+        store = openStore(dump.with_suffix(".store"), [dump])  # Decoded frames, shared with the converter
+        fig = reportFigure(store, start)
+        files = reportFiles(dump, output, formats)
+        if("html" in files):
+            fig.write_html(files["html"], include_plotlyjs="directory")  # plotly.min.js once for all reports
+        images = [files[format] for format in formats if(format != "html")]
+        if(images):
+            pio.write_images(fig, images)  # One export request for all formats
+        return None
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+
+
+# Reports of all dumps which changed since their last report, converted in a
+# pool of workers. Returns {dump: error} of the dumps which failed.
+def batchReport(paths, output, formats=reportFormats, start=None, workers=None, force=False):
+    pathlib.Path(output).mkdir(parents=True, exist_ok=True)
+    dumps = dumpFiles(paths)
+    pending = [d for d in dumps if(force or not upToDate(d, reportFiles(d, output, formats)))]
+    print(f"{len(dumps)} dumps, {len(dumps) - len(pending)} up to date")
+    if(len(pending) == 0):
+        return {}
+
+    errors = {}
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    with ProcessPoolExecutor(workers, initializer=startExporter) as pool:
+        futures = {pool.submit(writeReport, dump, output, formats, start): dump for dump in pending}
+        for done, future in enumerate(as_completed(futures), 1):
+            dump = futures[future]
+            error = future.result()
+            if(error is not None):
+                errors[dump] = error
+            print(f"[{done}/{len(pending)}] {dump.name}" + ("" if(error is None) else f" failed: {error}"))
+    return errors
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless reports of many CAN dumps")
+    parser.add_argument("dumps", nargs="+", help="candump files or directories containing them")
+    parser.add_argument("-o", "--output", default="reports", help="directory of the reports")
+    parser.add_argument("-f", "--formats", default=",".join(reportFormats), help="comma separated, html, svg, pdf or png")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--start", help="only frames after this time")
+    parser.add_argument("--force", action="store_true", help="also convert dumps with up to date reports")
+    args = parser.parse_args()
+
+    formats = args.formats.split(",")
+    if(importlib.util.find_spec("kaleido") is None and formats != ["html"]):
+        print("Kaleido is not installed, only writing html reports")
+        formats = ["html"]
+    errors = batchReport(args.dumps, args.output, formats, args.start, args.workers, args.force)
+    sys.exit(1 if(errors) else 0)
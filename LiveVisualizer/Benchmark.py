@@ -0,0 +1,182 @@
+###############################################################################
+# file    Benchmark.py
+###############################################################################
+# brief   End-to-end benchmark suite on synthetic FMS traffic, JSON results
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import json
+import time
+import platform
+import argparse
+import pathlib
+import tempfile
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+import plotly.utils
+from CandumpReader import readCandump
+from CsvReader import readCsv
+from FrameArray import FrameArray
+from SignalDatabase import decodeSignals
+from RingBuffer import FleetWindow
+from LiveFigure import liveTraces, liveUpdate, liveSnapshot
+from TrafficGenerator import generateFrames, writeCsv, writeCandump
+
+repetitions = 3
+windowSizes = [60, 300, 900]  # [s] maxDisplayTime of the live window benchmark
+
+
+# Best of repetitions wall time [s] and the last result
+def measure(function, *args):
+    best = float("inf")
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def figureBytes(figure):
+    return len(json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder))
+
+
+def commitId():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=pathlib.Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# Parse throughput of both file formats and decode throughput of all signals
+def benchmarkParsing(frames, directory):
+    results = {}
+    candump = directory / "dump.txt"
+    csv = directory / "data.csv"
+    writeCandump(candump, frames)
+    writeCsv(csv, frames)
+
+    seconds, _ = measure(lambda: FrameArray.concat([FrameArray.fromFrame(c) for c in readCandump(candump)]))
+    results["parseCandump"] = {"framesPerSecond": len(frames) / seconds, "megabytesPerSecond": os.path.getsize(candump) / seconds / 1e6}
+    seconds, _ = measure(readCsv, csv)
+    results["parseCsv"] = {"framesPerSecond": len(frames) / seconds, "megabytesPerSecond": os.path.getsize(csv) / seconds / 1e6}
+
+    groups = [(int(pgn), frames.payload[frames.pgn == pgn]) for pgn in np.unique(frames.pgn)]
+    seconds, _ = measure(lambda: [decodeSignals(pgn, payload) for pgn, payload in groups])
+    results["decodeSignals"] = {"framesPerSecond": len(frames) / seconds}
+
+    tracemalloc.start()
+    readCsv(csv)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    perMillion = 1e6 / len(frames)
+    results["memory"] = {"frameArrayBytesPerMillionFrames": frames.nbytes * perMillion,
+                         "readCsvPeakBytesPerMillionFrames": peak * perMillion}
+    return results
+
+
+# Window and figure work inside one polling tick of update_graph_scatter
+# (FleetWindow.add of one second of frames and liveUpdate of the selected
+# vehicle) and of a vehicle switch (liveSnapshot) for different window sizes.
+# Without the Dash request, source, merger and trip statistics around them.
+def benchmarkLiveWindow(vehicles):
+    results = {}
+    for size in windowSizes:
+        frames = generateFrames(vehicles, size + 10, seed=1)
+        start = frames.time[0]
+        fleet = FleetWindow(size, sorted({pgn for pgn, _, _ in liveTraces}))
+        fleet.add(frames.window(None, pd.Timestamp(start + size * 10**9)))
+        vehicle = fleet.vehicles[0]
+        state = liveSnapshot(fleet[vehicle])[1]
+
+        ticks, deltas = [], []
+        for second in range(size, size + 10):
+            tick = frames.window(pd.Timestamp(start + second * 10**9 - 1), pd.Timestamp(start + (second + 1) * 10**9))
+            begin = time.perf_counter()
+            fleet.add(tick)
+            extendData, state = liveUpdate(fleet[vehicle], state)
+            ticks.append(time.perf_counter() - begin)
+            deltas.append(figureBytes(extendData))
+        seconds, (figure, _) = measure(liveSnapshot, fleet[vehicle])
+        results[f"window{size}s"] = {"addAndUpdateSeconds": float(np.median(ticks)), "snapshotSeconds": seconds,
+                                     "deltaBytes": float(np.median(deltas)), "figureBytes": figureBytes(figure)}
+    return results
+
+
+def run(vehicles, duration):
+    frames = generateFrames(vehicles, duration)
+    with tempfile.TemporaryDirectory() as directory:
+        parsing = benchmarkParsing(frames, pathlib.Path(directory))
+    return {"commit": commitId(),
+            "date": pd.Timestamp.now().isoformat(),
+            "platform": {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+                         "machine": platform.machine(), "cpus": os.cpu_count()},
+            "config": {"vehicles": vehicles, "duration": duration, "frames": len(frames), "repetitions": repetitions},
+            "results": {**parsing, "liveWindow": benchmarkLiveWindow(vehicles)}}
+
+
+# Flattens the results into {"parseCsv.framesPerSecond": value, ...}
+def flatten(results, prefix=""):
+    values = {}
+    for key, value in results.items():
+        if(isinstance(value, dict)):
+            values.update(flatten(value, f"{prefix}{key}."))
+        else:
+            values[f"{prefix}{key}"] = value
+    return values
+
+
+# Prints every metric next to the one of an older result file
+def compare(old, new):
+    old, new = flatten(old["results"]), flatten(new["results"])
+    for key, value in new.items():
+        if(key in old and old[key]):
+            print(f"{key:50s} {old[key]:14.4g} -> {value:14.4g}  ({value / old[key]:6.2f} x)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks parsing, decoding and the live window updates")
+    parser.add_argument("--vehicles", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=600.0, help="[s] of traffic for the parse benchmarks")
+    parser.add_argument("--output", default=None, help="result file (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="older result file to compare with")
+    args = parser.parse_args()
+
+    result = run(args.vehicles, args.duration)
+    output = args.output or f"benchmark-{result['commit'] or 'local'}.json"
+    with open(output, "w") as file:
+        json.dump(result, file, indent=1)
+    for key, value in flatten(result["results"]).items():
+        print(f"{key:50s} {value:14.4g}")
+    print(f"Results written to {output}")
+    if(args.compare is not None):
+        with open(args.compare) as file:
+            compare(json.load(file), result)
@@ -0,0 +1,231 @@
+###############################################################################
+# file    CandumpReader.py
+###############################################################################
+# brief   Streaming, bounded-memory parser for candump text files
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+from FrameDecoder import hexTable, pgnFilter, toNanoseconds, timeMask
+
+chunkSize = 16 * 2**20  # [bytes] read per block, bounds the peak memory
+frameColumns = ["time", "priority", "pgn", "source", "payload"]
+
+whitespace = np.zeros(256, dtype=bool)
+whitespace[[9, 10, 13, 32]] = True
+
+
+# Fallback for lines the vectorized path does not cover, e.g. frames with less
+# than 8 data bytes or the "18FEF100#0011..." log format. Missing bytes are
+# filled with 0xFF (J1939 "not available").
+def parseLine(line):
+    fields = line.decode("ascii", "replace").split()
+    try:
+        time = float(fields[0].strip("()"))
+        if(len(fields) == 3 and "#" in fields[2]):
+            canId, data = fields[2].split("#")
+            data = bytes.fromhex(data)
+        else:
+            canId = fields[2]
+            data = bytes(int(d, 16) for d in fields[4:])
+        canId = int(canId, 16)
+    except (IndexError, ValueError):
+        return None
+    if(len(data) > 8):
+        return None
+    data = data.ljust(8, b"\xFF")
+    return time, canId, int.from_bytes(data, "little")
+
+
+# Parses the "(1637161234.123456)" token into int64 nanoseconds. column(offset)
+# returns the characters at the given offset of the token for every line.
+def parseTimestamps(column, length):
+    count = len(length)
+    width = int(length.max(initial=0))
+    dot = np.zeros(count, dtype=np.int64)
+    for offset in range(width - 2, 0, -1):
+        dot[column(offset) == ord(".")] = offset
+    valid = (column(0) == ord("(")) & (column(length - 1) == ord(")"))
+    valid &= (dot > 0) & (dot <= 12)
+
+    seconds = np.zeros(count, dtype=np.int64)
+    fraction = np.zeros(count, dtype=np.int64)
+    for offset in range(1, width - 1):
+        digit = column(offset).astype(np.int64) - ord("0")
+        number = (offset < length - 1) & (offset != dot)
+        valid &= ~number | ((digit >= 0) & (digit <= 9))
+        integer = number & (offset < dot)
+        seconds = np.where(integer, seconds * 10 + digit, seconds)
+        decimal = offset - dot
+        decimal = number & (decimal > 0) & (decimal <= 9)
+        fraction += np.where(decimal, digit * 10**np.clip(9 - (offset - dot), 0, 9), 0)
+    return seconds * 10**9 + fraction, valid
+
+
+# Decodes regular "(time) can0 18FE6C00 [8] 00 11 22 33 44 55 66 77" lines.
+# select(rows) returns an accessor column(token, offset) for the characters at
+# offset of a token in the given rows (None for all), length holds the length of
+# the 12 tokens. The CAN-ID is decoded first so that frames of other PGNs or
+# outside of the time window are dropped before their payload is touched.
+def parseRegular(select, length, pgns=None, start=None, end=None):
+    column = select(None)
+    valid = (length[:, 2] == 8) & (length[:, 3] == 3) & (length[:, 4:] == 2).all(axis=1)
+    valid &= (column(3, 0) == ord("[")) & (column(3, 1) == ord("8")) & (column(3, 2) == ord("]"))
+    canId = np.zeros(len(length), dtype=np.uint32)
+    for offset in range(8):
+        nibble = hexTable[column(2, offset)]
+        valid &= nibble != 0xFF
+        canId = (canId << 4) | nibble
+    if(pgns is not None):
+        valid &= np.isin((canId >> 8) & 0xFFFF, pgns)
+
+    rows = np.flatnonzero(valid)
+    column = select(rows)
+    ns, valid = parseTimestamps(lambda offset: column(0, offset), length[rows, 0])
+    valid &= timeMask(ns, start, end)
+    rows, ns = rows[valid], ns[valid]
+
+    column = select(rows)
+    payload = np.zeros(len(rows), dtype=np.uint64)
+    valid = np.ones(len(rows), dtype=bool)
+    for i in range(8):
+        high = hexTable[column(4 + i, 0)]
+        low = hexTable[column(4 + i, 1)]
+        valid &= (high != 0xFF) & (low != 0xFF)
+        payload |= ((high << 4) | low).astype(np.uint64) << np.uint64(8 * i)
+    return rows[valid], ns[valid], canId[rows[valid]], payload[valid]
+
+
+# Splits a block into lines and returns the rows with 12 tokens together with a
+# row selector (see parseRegular). Blocks in which all lines share one layout
+# are read as a 2D view without running the tokenizer.
+def tokenize(chars, lineEnd):
+    lineLength = np.diff(lineEnd, prepend=-1)
+    space = whitespace[chars]
+    if(len(lineEnd) > 0 and (lineLength == lineLength[0]).all()):
+        pattern = space[:lineLength[0]]
+        if((space.reshape(len(lineEnd), lineLength[0]) == pattern).all()):
+            lines = chars.reshape(len(lineEnd), lineLength[0])
+            begin = np.flatnonzero(~pattern & np.concatenate(([True], pattern[:-1])))
+            end = np.flatnonzero(~pattern & np.concatenate((pattern[1:], [True]))) + 1
+            count = len(lineEnd) if(len(begin) == 12) else 0
+
+            def select(rows):
+                selected = lines[:count] if(rows is None or len(rows) == count) else lines[rows]
+
+                def column(token, offset):
+                    if(np.ndim(offset) == 0):
+                        return selected[:, begin[token] + offset]
+                    return selected[np.arange(len(selected)), begin[token] + offset]
+                return column
+            length = np.broadcast_to(end - begin, (count, len(begin)))
+            return np.arange(count), select, length, np.full(len(lineEnd), len(begin))
+
+    tokenStart = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+    tokenEnd = np.flatnonzero(~space & np.concatenate((space[1:], [True]))) + 1
+    tokenCount = np.bincount(np.searchsorted(lineEnd, tokenStart), minlength=len(lineEnd))
+    firstToken = np.cumsum(tokenCount) - tokenCount
+    rows = np.flatnonzero(tokenCount == 12)
+    token = firstToken[rows][:, None] + np.arange(12)
+    start = tokenStart[token]
+    last = len(chars) - 1
+
+    def select(rows):
+        selected = start if(rows is None) else start[rows]
+
+        def column(token, offset):
+            return chars[np.minimum(selected[:, token] + offset, last)]
+        return column
+    return rows, select, tokenEnd[token] - start, tokenCount
+
+
+# Parses a block of complete candump lines into typed column arrays, keeping
+# only frames of the given PGNs within the time window (nanoseconds)
+def parseBlock(block, pgns=None, start=None, end=None):
+    chars = np.frombuffer(block, dtype=np.uint8)
+    lineEnd = np.flatnonzero(chars == ord("\n"))
+    lineCount = len(lineEnd)
+    ns = np.zeros(lineCount, dtype=np.int64)
+    canId = np.zeros(lineCount, dtype=np.uint32)
+    payload = np.zeros(lineCount, dtype=np.uint64)
+    parsed = np.zeros(lineCount, dtype=bool)
+
+    rows, select, length, tokenCount = tokenize(chars, lineEnd)
+    irregular = tokenCount != 12
+    if(len(rows) > 0):
+        # 12 token lines with an unexpected layout are left to the slow path
+        irregular[rows] = (length[:, 2] != 8) | (length[:, 4:] != 2).any(axis=1)
+        subset, time, identifier, data = parseRegular(select, length, pgns, start, end)
+        rows = rows[subset]
+        ns[rows] = time
+        canId[rows] = identifier
+        payload[rows] = data
+        parsed[rows] = True
+
+    # Irregular lines go through the slow path, empty lines are dropped
+    lineStart = np.concatenate(([0], lineEnd[:-1] + 1))
+    for row in np.flatnonzero(irregular & (tokenCount > 0)):
+        frame = parseLine(bytes(block[lineStart[row]:lineEnd[row]]))
+        if(frame is not None):
+            ns[row] = round(frame[0] * 1e9)
+            canId[row] = frame[1]
+            payload[row] = frame[2]
+            parsed[row] = True
+    if(pgns is not None):
+        parsed &= np.isin((canId >> 8) & 0xFFFF, pgns)
+    parsed &= timeMask(ns, start, end)
+
+    canId = canId[parsed]
+    return pd.DataFrame({"time":     ns[parsed] / 1e9,
+                         "priority": (canId >> 24).astype(np.uint8),
+                         "pgn":      ((canId >> 8) & 0xFFFF).astype(np.uint16),
+                         "source":   (canId & 0xFF).astype(np.uint8),
+                         "payload":  payload[parsed]}, columns=frameColumns)
+
+
+# Yields the frames of a candump text file as DataFrame chunks. Only one block
+# of at most chunkSize bytes (plus one partial line) is held in memory. pgns
+# and the start/end time (unix seconds, datetime or date string) select the
+# frames to decode, everything else is skipped right after the CAN-ID.
+def readCandump(fileName, chunkSize=chunkSize, pgns=None, start=None, end=None):
+    pgns = pgnFilter(pgns)
+    start, end = toNanoseconds(start), toNanoseconds(end)
+    with open(fileName, "rb") as file:
+        rest = b""
+        while(True):
+            data = file.read(chunkSize)
+            if(not data):
+                break
+            block = rest + data
+            cut = block.rfind(b"\n") + 1
+            rest = block[cut:]
+            if(cut > 0):
+                yield parseBlock(memoryview(block)[:cut], pgns, start, end)
+        if(rest.strip()):
+            yield parseBlock(rest + b"\n", pgns, start, end)
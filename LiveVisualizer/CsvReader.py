@@ -0,0 +1,66 @@
+###############################################################################
+# file    CsvReader.py
+###############################################################################
+# brief   Reader for the CSV files written by the fleet-monitor-network-tool
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import io
+import numpy as np
+import pandas as pd
+from FrameDecoder import decodePgn, decodePayload, payloadWord, pgnFilter, toNanoseconds, timeMask
+
+# index, unix timestamp, PGN (hex), payload (hex), vehicle name
+csvColumns = {1: "date", 2: "pgn", 3: "data", 4: "name"}
+
+
+# Reads one network-tool CSV file. pgns and the start/end time (unix seconds,
+# datetime or date string) are applied on the PGN and time columns before the
+# payload of the remaining frames is decoded.
+def readCsv(fileName, pgns=None, start=None, end=None):
+    tmp = pd.read_csv(fileName, header=None, usecols=list(csvColumns),
+                      dtype={2: str, 3: str, 4: str})
+    tmp = tmp.rename(csvColumns, axis=1)
+    pgn = decodePgn(tmp["pgn"].to_numpy())
+    ns = np.round(tmp["date"].to_numpy(dtype=np.float64) * 1e9).astype(np.int64)
+
+    mask = timeMask(ns, toNanoseconds(start), toNanoseconds(end))
+    pgns = pgnFilter(pgns)
+    if(pgns is not None):
+        mask &= np.isin(pgn, pgns)
+    tmp = tmp[mask]
+    tmp["date"] = ns[mask].astype("datetime64[ns]")
+    tmp["pgn"] = pgn[mask]
+    tmp["payload"] = payloadWord(decodePayload(tmp["data"].to_numpy()))
+    return tmp
+
+
+# Same as readCsv for a block of complete CSV lines, e.g. appended to a file
+# and returned by DirectoryWatcher.poll()
+def parseCsv(data, pgns=None, start=None, end=None):
+    return readCsv(io.BytesIO(data), pgns=pgns, start=start, end=end)
@@ -0,0 +1,228 @@
+###############################################################################
+# file    DataManifest.py
+###############################################################################
+# brief   Persistent time index of the files in the data directory
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import io
+import os
+import sys
+import json
+import zlib
+import pathlib
+import numpy as np
+import pandas as pd
+from CsvReader import parseCsv
+from FrameArray import FrameArray, vehicleCodes
+from FrameDecoder import decodePgn, toNanoseconds
+from DirectoryWatcher import fileOrder
+from FrameMerger import mergeBlocks, uniqueFrames
+
+manifestVersion = 2
+blockSize = 256 * 1024  # Bytes between two time checkpoints of a file
+tailSize = 4096  # Bytes before the indexed size which must not change when a file grows
+
+
+# Times [ns], PGNs and vehicle names of a block of complete CSV lines
+def scanBlock(data):
+    tmp = pd.read_csv(io.BytesIO(data), header=None, usecols=[1, 2, 4], dtype={2: str, 4: str})
+    ns = np.round(tmp[1].to_numpy(dtype=np.float64) * 1e9).astype(np.int64)
+    return ns, decodePgn(tmp[2].to_numpy()), tmp[4].fillna("").to_numpy()
+
+
+# Summary of every network-tool file in a directory, kept in manifestPath
+# (default <directory>-manifest.json next to the directory, never inside it:
+# the network tool owns the data directory):
+#   first, last   time range of the file [ns]
+#   vehicles      names of the vehicles in the file
+#   pgns          frames per PGN ("FE6C": count)
+#   blocks        [offset, first, last] per block of about blockSize bytes
+#   size, inode   bytes indexed so far, appended bytes are indexed on update()
+#   mtime, tail   modification time and CRC of the last tailSize indexed bytes,
+#                 a file rewritten in place is indexed again
+# Range queries only read the blocks which overlap, out of order frames are
+# fine as every block knows its own time range.
+class DataManifest:
+    def __init__(self, path, manifestPath=None, suffix=".csv"):
+        self.path = pathlib.Path(path)
+        self.manifestPath = pathlib.Path(manifestPath or self.path.parent / f"{self.path.name}-manifest.json")
+        self.suffix = suffix
+        self.files = {}  # name -> entry (see above)
+        self.blocks = {}  # name -> int64[N, 3] of the blocks
+        try:
+            with open(self.manifestPath) as file:
+                manifest = json.load(file)
+            if(manifest.get("version") == manifestVersion):
+                self.files = manifest["files"]
+        except (OSError, ValueError):
+            pass
+
+    # Indexes new files and the lines appended to known files, forgets removed
+    # ones. A file which shrank or was replaced is indexed again.
+    def update(self):
+        names = {e.name: e.stat() for e in os.scandir(self.path) if(e.is_file() and e.name.endswith(self.suffix))}
+        changed = set(self.files) - set(names)
+        for name in changed:
+            del self.files[name]
+        for name, stat in names.items():
+            entry = self.files.get(name)
+            if(entry is not None and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size):
+                continue  # Unchanged
+            if(entry is None or entry["inode"] != stat.st_ino or entry["size"] > stat.st_size or
+               entry["tail"] != self.tailHash(name, entry["size"])):
+                entry = {"inode": stat.st_ino, "mtime": None, "size": 0, "tail": 0, "first": None, "last": None,
+                         "vehicles": [], "pgns": {}, "blocks": []}
+                self.files[name] = entry
+            if(stat.st_size > entry["size"]):
+                self.indexFile(name, entry)
+                entry["tail"] = self.tailHash(name, entry["size"])
+            entry["mtime"] = stat.st_mtime_ns
+            changed.add(name)
+        for name in changed:
+            self.blocks.pop(name, None)
+        if(len(changed) > 0):
+            self.save()
+        return self
+
+    def tailHash(self, name, size):
+        with open(self.path / name, "rb") as file:
+            file.seek(max(0, size - tailSize))
+            return zlib.crc32(file.read(min(size, tailSize)))
+
+    # Adds the complete lines after entry["size"], False if there were none
+    def indexFile(self, name, entry):
+        with open(self.path / name, "rb") as file:
+            file.seek(entry["size"])
+            data = file.read()
+        data = data[:data.rfind(b"\n") + 1]  # Line still being written
+        offset = 0
+        while(offset < len(data)):
+            end = data.find(b"\n", offset + blockSize) + 1 or len(data)
+            try:
+                ns, pgn, names = scanBlock(data[offset:end])
+            except (ValueError, pd.errors.ParserError) as error:
+                print(f"Could not index {name}: {error}")  # Retried on the next update
+                break
+            if(len(ns) > 0):
+                first, last = int(ns.min()), int(ns.max())
+                entry["blocks"].append([entry["size"], first, last])
+                entry["first"] = first if(entry["first"] is None) else min(entry["first"], first)
+                entry["last"] = last if(entry["last"] is None) else max(entry["last"], last)
+                entry["vehicles"] = sorted(set(entry["vehicles"]).union(names))
+                pgns, counts = np.unique(pgn, return_counts=True)
+                for p, count in zip(pgns, counts):
+                    key = f"{p:04X}"
+                    entry["pgns"][key] = entry["pgns"].get(key, 0) + int(count)
+            entry["size"] += end - offset
+            offset = end
+        return offset > 0
+
+    def save(self):
+        temporary = self.manifestPath.with_suffix(".tmp")
+        with open(temporary, "w") as file:
+            json.dump({"version": manifestVersion, "files": self.files}, file)
+        os.replace(temporary, self.manifestPath)
+
+    # Time range of all files [ns], None if there are no frames
+    @property
+    def bounds(self):
+        entries = [e for e in self.files.values() if(e["first"] is not None)]
+        if(len(entries) == 0):
+            return None
+        return min(e["first"] for e in entries), max(e["last"] for e in entries)
+
+    # Names of the files with frames strictly after start and before end (unix
+    # seconds, datetime or string) and of the vehicle, in network-tool order
+    def overlapping(self, start=None, end=None, vehicle=None):
+        start, end = toNanoseconds(start), toNanoseconds(end)
+        names = []
+        for name, entry in self.files.items():
+            if(entry["first"] is None or (vehicle is not None and vehicle not in entry["vehicles"])):
+                continue
+            if((start is None or entry["last"] > start) and (end is None or entry["first"] < end)):
+                names.append(name)
+        return sorted(names, key=fileOrder)
+
+    # [(offset, length, first)] of the blocks of a file which overlap start and
+    # end [ns], adjacent blocks are read at once. first is the earliest time in
+    # the range.
+    def ranges(self, name, start=None, end=None):
+        if(name not in self.blocks):
+            self.blocks[name] = np.array(self.files[name]["blocks"], dtype=np.int64).reshape(-1, 3)
+        blocks = self.blocks[name]
+        ends = np.append(blocks[1:, 0], self.files[name]["size"])
+        mask = np.ones(len(blocks), dtype=bool)
+        if(start is not None):
+            mask &= blocks[:, 2] > start
+        if(end is not None):
+            mask &= blocks[:, 1] < end
+        ranges = []
+        for offset, stop, first in zip(blocks[mask, 0], ends[mask], blocks[mask, 1]):
+            if(len(ranges) > 0 and ranges[-1][0] + ranges[-1][1] == offset):
+                ranges[-1][1] += int(stop - offset)
+                ranges[-1][2] = min(ranges[-1][2], int(first))
+            else:
+                ranges.append([int(offset), int(stop - offset), int(first)])
+        return ranges
+
+    # Frames of a byte range of a file, like readCsv
+    def readRange(self, name, offset, length, pgns=None, start=None, end=None, vehicle=None):
+        with open(self.path / name, "rb") as file:
+            file.seek(offset)
+            frames = FrameArray.fromFrame(parseCsv(file.read(length), pgns=pgns, start=start, end=end))
+        if(vehicle is not None):
+            frames = frames[frames.vehicle == vehicleCodes.get(vehicle, -1)]
+        return frames
+
+    # Frames strictly after start and before end in time ordered batches. The
+    # overlapping blocks of all files are merged by their time checkpoints
+    # (k-way) and read one after the other, so a long range never has to fit
+    # into memory at once.
+    def stream(self, start=None, end=None, pgns=None, vehicle=None):
+        blocks = []
+        for name in self.overlapping(start, end, vehicle):
+            for offset, length, first in self.ranges(name, toNanoseconds(start), toNanoseconds(end)):
+                blocks.append((first, lambda name=name, offset=offset, length=length:
+                               self.readRange(name, offset, length, pgns, start, end, vehicle)))
+        return mergeBlocks(blocks)
+
+    # Same as stream() as a single FrameArray without duplicate frames
+    def read(self, start=None, end=None, pgns=None, vehicle=None):
+        frames = FrameArray.concat(list(self.stream(start, end, pgns, vehicle)))
+        return frames[uniqueFrames(frames)]
+
+
+if __name__ == '__main__':
+    if(len(sys.argv) != 4):
+        print("usage: DataManifest.py DIRECTORY START END")
+        sys.exit(1)
+    manifest = DataManifest(sys.argv[1]).update()
+    frames = manifest.read(sys.argv[2], sys.argv[3])
+    print(f"{len(frames)} frames of {len(frames.vehicles)} vehicles")
+    print(frames.toDataFrame().groupby(["name", "pgn"], observed=True).size().to_string())
@@ -0,0 +1,82 @@
+###############################################################################
+# file    DecoderBenchmark.py
+###############################################################################
+# brief   Throughput benchmark of the hex decoder against the apply() path
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import numpy as np
+import pandas as pd
+from FrameDecoder import decodeFrames, payloadWord
+
+frameCount = 500000
+repetitions = 3
+
+
+# Same conversion as the plotters did before the vectorized decoder
+def decodeFramesApply(df):
+    df["pgn"] = df["pgn"].apply(int, base=16)
+    for i in range(8):
+        df[f"{7-i}"] = pd.Series((df["data"].apply(int, base=16) // 2**(8*i)) & 0xFF)
+    return df
+
+
+def makeFrames(count):
+    rng = np.random.default_rng(0)
+    pgns = np.array(["FE6C", "F004", "F003", "FEE9", "FEEE", "FEF5"])
+    payload = rng.integers(0, 2**63, size=count, dtype=np.uint64)
+    return pd.DataFrame({"date": np.arange(count) * 0.02 + 1.64e9,
+                         "pgn":  pgns[rng.integers(0, len(pgns), size=count)],
+                         "data": [f"{p:016X}" for p in payload],
+                         "name": "vehicle"})
+
+
+def measure(function, frames):
+    best = float("inf")
+    for _ in range(repetitions):
+        tmp = frames.copy()
+        start = time.perf_counter()
+        result = function(tmp)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == '__main__':
+    frames = makeFrames(frameCount)
+    applyTime, expected = measure(decodeFramesApply, frames)
+    vectorTime, result = measure(decodeFrames, frames)
+
+    payload = payloadWord(expected[[f"{i}" for i in range(8)]].to_numpy())
+    if(not ((expected["pgn"] == result["pgn"]).all() and (payload == result["payload"]).all())):
+        raise RuntimeError("vectorized decoder does not match the apply() path")
+
+    print(f"frames:     {frameCount}")
+    print(f"apply():    {applyTime:8.3f} s  {frameCount / applyTime:12.0f} frames/s")
+    print(f"vectorized: {vectorTime:8.3f} s  {frameCount / vectorTime:12.0f} frames/s")
+    print(f"speedup:    {applyTime / vectorTime:8.1f} x")
@@ -0,0 +1,186 @@
+###############################################################################
+# file    DirectoryWatcher.py
+###############################################################################
+# brief   Incremental tail reader for the network-tool data directory
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import pathlib
+
+
+# Minimal inotify binding, raises OSError where inotify is not available
+class Inotify:
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    header = struct.Struct("iIII")
+
+    def __init__(self, path):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (AttributeError, OSError, TypeError):
+            raise OSError("inotify is not available")
+        if(self.fd < 0 or libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask) < 0):
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    # Names of the files changed since the last call, None after an overflow
+    def read(self, timeout=0):
+        names = set()
+        if(not select.select([self.fd], [], [], timeout)[0]):
+            return names
+        while(True):
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while(offset < len(data)):
+                _, mask, _, length = self.header.unpack_from(data, offset)
+                name = data[offset + self.header.size:offset + self.header.size + length].rstrip(b"\0")
+                offset += self.header.size + length
+                if(mask & self.IN_Q_OVERFLOW):
+                    return None
+                names.add(os.fsdecode(name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+# Network-tool files are numbered ("0.csv", "1.csv", ...), order them as numbers
+def fileOrder(name):
+    stem = name.split(".")[0]
+    return (0, int(stem), name) if(stem.isdigit()) else (1, 0, name)
+
+
+# Keeps a byte offset per file and returns only the complete lines appended
+# since the last call. Changes are taken from inotify, the directory is only
+# listed when inotify is not available (or overflowed), then only files whose
+# inode, size or modification time changed since the last listing are opened.
+# Files which shrink or
+# are replaced (new inode) are read again from the start. history limits how
+# many of the newest files existing at start-up are read, None reads all.
+class DirectoryWatcher:
+    def __init__(self, path, suffix=".csv", history=None, usePolling=False):
+        self.path = pathlib.Path(path)
+        self.suffix = suffix
+        self.state = {}  # name -> [inode, offset, partial line]
+        self.dirty = set()
+        self.listing = {}  # name -> (inode, size, mtime) of the last scan()
+        self.inotify = None
+        if(not usePolling):
+            try:
+                self.inotify = Inotify(self.path)
+            except OSError:
+                pass
+
+        self.listing = self.scan()
+        names = sorted(self.listing, key=fileOrder)
+        skip = 0 if(history is None) else max(0, len(names) - history)
+        for name in names[:skip]:
+            inode, size, _ = self.listing[name]
+            self.state[name] = [inode, size, b""]
+        for name in names[skip:]:
+            self.state[name] = [None, 0, b""]
+        self.dirty.update(names[skip:])
+
+    def scan(self):
+        listing = {}
+        for entry in os.scandir(self.path):
+            if(entry.name.endswith(self.suffix) and entry.is_file()):
+                stat = entry.stat()
+                listing[entry.name] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        return listing
+
+    def refresh(self, timeout=0):
+        names = self.inotify.read(timeout) if(self.inotify is not None) else None
+        if(self.inotify is None and timeout > 0):
+            time.sleep(timeout)  # Polling, listed once per timeout
+        if(names is None):
+            listing = self.scan()
+            names = {n for n, stat in listing.items() if(self.listing.get(n) != stat)} | (set(self.state) - set(listing))
+            self.listing = listing
+        for name in names:
+            if(not name.endswith(self.suffix)):
+                continue
+            if((self.path / name).is_file()):
+                self.state.setdefault(name, [None, 0, b""])
+                self.dirty.add(name)
+            else:
+                self.state.pop(name, None)
+                self.dirty.discard(name)
+
+    # Names of all known files in network-tool order
+    def files(self):
+        self.refresh()
+        return sorted(self.state, key=fileOrder)
+
+    # [(name, bytes)] of the complete lines appended to each file since the
+    # last call, in file order. Waits up to timeout seconds for a change.
+    def poll(self, timeout=0):
+        self.refresh(timeout)
+        chunks = []
+        for name in sorted(self.dirty, key=fileOrder):
+            data = self.readFile(name)
+            if(data):
+                chunks.append((name, data))
+        self.dirty.clear()
+        return chunks
+
+    def readFile(self, name):
+        state = self.state[name]
+        try:
+            with open(self.path / name, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if(stat.st_ino != state[0] or stat.st_size < state[1]):
+                    state[:] = [stat.st_ino, 0, b""]  # New or rotated / truncated file
+                file.seek(state[1])
+                data = file.read()
+        except FileNotFoundError:
+            self.state.pop(name, None)
+            return b""
+        state[1] += len(data)
+        data = state[2] + data
+        cut = data.rfind(b"\n") + 1
+        state[2] = data[cut:]  # Line still being written
+        return data[:cut]
+
+    def close(self):
+        if(self.inotify is not None):
+            self.inotify.close()
@@ -0,0 +1,137 @@
+###############################################################################
+# file    Downsampling.py
+###############################################################################
+# brief   Viewport-aware decimation (LTTB, min/max envelope) of plot traces
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import re
+import numpy as np
+import pandas as pd
+
+screenPoints = 2000  # About the horizontal pixels of a plot
+
+
+# Largest-Triangle-Three-Buckets: indices of the points which keep the visual
+# shape of the line. x must be sorted, NaN values are never chosen over valid ones.
+def lttbIndex(x, y, points):
+    length = len(x)
+    if(points >= length or points < 3):
+        return np.arange(length)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, length - 1, points - 1).astype(np.int64)
+    index = np.empty(points, dtype=np.int64)
+    index[0] = 0
+    index[-1] = length - 1
+    a = 0
+    for i in range(points - 2):
+        low, high = edges[i], edges[i + 1]
+        nextHigh = edges[i + 2] if(i + 2 < len(edges)) else length
+        nextY = y[high:nextHigh][np.isfinite(y[high:nextHigh])]
+        averageX = x[high:nextHigh].mean()
+        averageY = nextY.mean() if(len(nextY) > 0) else y[a]
+        area = np.abs((x[a] - averageX) * (y[low:high] - y[a]) - (x[a] - x[low:high]) * (averageY - y[a]))
+        a = low + int(np.argmax(np.where(np.isfinite(area), area, -1)))
+        index[i + 1] = a
+    return index
+
+
+# Per-pixel envelope: first, last, minimum and maximum point of every bucket
+# (buckets are equally wide in x). Draws the same line as the full data at
+# the given resolution. x must be sorted.
+def minMaxIndex(x, y, buckets):
+    length = len(x)
+    if(4 * buckets >= length):
+        return np.arange(length)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    span = max(x[-1] - x[0], 1e-12)
+    bucket = np.minimum(((x - x[0]) * (buckets / span)).astype(np.int64), buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], length] - 1
+
+    index = [starts, ends]
+    finite = np.isfinite(y)
+    for reduce in (np.fmin, np.fmax):
+        extreme = reduce.reduceat(y, starts)
+        hit = finite & (y == np.repeat(extreme, ends - starts + 1))
+        candidates = np.flatnonzero(hit)
+        _, first = np.unique(bucket[candidates], return_index=True)
+        index.append(candidates[first])
+    return np.unique(np.concatenate(index))
+
+
+# Reduces a trace to about points samples inside [start, end] (plus one point
+# beyond each edge so the line reaches the border). x may be numeric or
+# datetime and is sorted first if needed; the bounds are numbers or anything pd.Timestamp takes.
+# Non-numeric y (states, labels) always uses the min/max envelope on its codes.
+def downsample(x, y, points=screenPoints, start=None, end=None, method="lttb"):
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if(np.issubdtype(x.dtype, np.datetime64)):
+        position = x.astype("datetime64[ns]").view(np.int64)
+        bound = lambda value: pd.Timestamp(value).value
+    else:
+        position = x.astype(np.float64)
+        bound = float
+    if((position[1:] < position[:-1]).any()):
+        order = np.argsort(position, kind="stable")
+        x, y, position = x[order], y[order], position[order]
+
+    first, last = 0, len(x)
+    if(start is not None):
+        first = max(0, int(np.searchsorted(position, bound(start), side="left")) - 1)
+    if(end is not None):
+        last = min(len(x), int(np.searchsorted(position, bound(end), side="right")) + 1)
+    values = y[first:last]
+    if(not np.issubdtype(values.dtype, np.number) and not np.issubdtype(values.dtype, np.bool_)):
+        values = pd.factorize(values)[0]
+        method = "minmax"
+
+    if(method == "lttb"):
+        index = lttbIndex(position[first:last], values, points)
+    else:
+        index = minMaxIndex(position[first:last], values, max(1, points // 4))
+    return x[first + index], y[first + index]
+
+
+# Visible x-range from a dcc.Graph relayoutData event. Returns (start, end),
+# (None, None) when the axes were reset to autorange, or None if the event
+# does not change the x-range (y-zoom, drag mode, ...).
+def viewRange(relayoutData):
+    if(not relayoutData):
+        return (None, None)
+    for key, value in relayoutData.items():
+        if(re.fullmatch(r"xaxis\d*\.range\[0\]", key)):
+            return (value, relayoutData.get(key.replace("[0]", "[1]")))
+        if(re.fullmatch(r"xaxis\d*\.range", key)):
+            return (value[0], value[1])
+        if(re.fullmatch(r"xaxis\d*\.autorange", key)):
+            return (None, None)
+    return None
@@ -5,28 +5,31 @@ Created on Thu Dec 30 12:02:20 2021
 @author: Admin
 """
 
-import os
 import sys
 import dash
 import pathlib
 import platform
 import pandas as pd
-from plotly.subplots import make_subplots
-from dash.dependencies import Output, Input
+from dash.dependencies import Output, Input, State, ClientsideFunction
 import dash_core_components as dcc
 import dash_html_components as html
-import plotly.graph_objs as go
-from datetime import datetime
+from RingBuffer import FleetWindow
+from ReplayEngine import ReplayEngine
+from FrameArray import FrameArray
+from FrameMerger import FrameMerger
+from LiveFigure import liveTraces, liveFigure, liveUpdate, liveSnapshot, fleetFigure, tripFigure
+from Metrics import metrics
+from PushStream import PushStream
+from FigureCache import FigureCache
+from TripStatistics import TripStatistics, tripPgns
 import webbrowser
 import threading
-import time
 
 # Inlude file from other directory
 importPath = pathlib.Path.cwd().parents[1] / "fleet-monitor-network-tool"
 sys.path.insert(0, str(importPath))
 from server import HttpServer
 sys.path.remove(str(importPath))
-systemStartTime = datetime.fromisoformat("2020-01-01 00:00:00")
 
 
 def runServer():
@@ -42,127 +45,138 @@ def runServer():
 
 
 maxDisplayTime = 60  # [s]
-df = pd.DataFrame()
+plotPgns = [0xFE6C, 0xF004, 0xF003, 0xFEF5, 0xFEEE, 0xFEE9]  # PGNs decoded for the graphs
+pushMode = True  # Stream new samples to the browsers (Server-Sent Events) instead of polling every second
+fleet = FleetWindow(maxDisplayTime, plotPgns)  # One window per vehicle
+trips = TripStatistics()  # Whole trips and shifts, beyond the window
+merger = FrameMerger(lateness=2.0)  # Reorders late frames of up to 2 s, drops duplicates
+figureCache = FigureCache(32 * 2**20)  # Overview figures shared by all sessions
+replaySpeeds = [1, 10, 100]  # Recorded time per wall clock time
+manifestPath = importPath / "data-manifest.json"  # Index of the recorded files, outside the data directory
+replay = ReplayEngine(importPath / "data", plotPgns + tripPgns, speed=replaySpeeds[0],
+                      manifestPath=manifestPath)  # All recorded files in timestamp order
+
+
+# New frames of the replay in order and without duplicates, the trip
+# statistics see them on the way
+def readFrames(timeout=0):
+    with metrics.stage("merge"):
+        frames = merger.add(FrameArray.concat(replay.read(timeout)))
+    if(len(frames) == 0):
+        return []
+    with metrics.stage("trips"):
+        trips.add(frames)
+    return [frames]
+
+stream = PushStream(fleet, readFrames)  # Also guards the fleet in polling mode
 
 
 app = dash.Dash(__name__)
 app.layout = html.Div([
-    dcc.Graph(id='live-update-graph', animate=True),
-    dcc.Interval(id='graph-update', interval=1*1000)
+    html.Div([
+        dcc.Dropdown(id='vehicle-select', clearable=False, style={'width': 400}),
+        dcc.Dropdown(id='replay-speed', clearable=False, style={'width': 120}, value=replaySpeeds[0],
+                     options=[{"label": f"{speed}x", "value": speed} for speed in replaySpeeds]),
+        html.Div(id='replay-time', style={'width': 300, 'lineHeight': '36px'})
+    ], style={'display': 'flex', 'gap': 20}),
+    dcc.Slider(id='replay-seek', min=replay.begin / 1e9, max=replay.end / 1e9, value=replay.begin / 1e9,
+               updatemode="mouseup", marks=None),
+    dcc.Graph(id='live-update-graph', figure=liveFigure()),
+    dcc.Store(id='graph-state'),
+    dcc.Store(id='stream-vehicle'),
+    dcc.Store(id='overview-version'),
+    dcc.Graph(id='fleet-overview'),
+    dcc.Graph(id='trip-overview'),
+    dcc.Interval(id='graph-update', interval=1*1000, disabled=pushMode),
+    dcc.Interval(id='overview-update', interval=5*1000)
 ])
+metrics.register(app.server)  # /metrics (Prometheus), POST /profile toggles cProfile with FLEET_PROFILE=1
+trips.register(app.server)  # /trips and /trips/<vehicle> (JSON)
+if(pushMode):
+    stream.register(app.server)  # /stream/<vehicle>, consumed by assets/pushStream.js
+    app.clientside_callback(ClientsideFunction(namespace="pushStream", function_name="connect"),
+                            Output('stream-vehicle', 'data'), [ Input('graph-state', 'data') ])
 
 
 @app.callback(
-    Output('live-update-graph', 'figure'),
-    [ Input('graph-update', 'n_intervals') ]
+    [ Output('live-update-graph', 'figure'), Output('live-update-graph', 'extendData'),
+      Output('graph-state', 'data') ],
+    [ Input('graph-update', 'n_intervals'), Input('vehicle-select', 'value') ],
+    [ State('graph-state', 'data') ]
 )
-def update_graph_scatter(n):
-    global df, systemStartTime, maxDisplayTime
-    
-    files = sorted(os.listdir(importPath / "data"))
-    valid = (update_graph_scatter.fileIndex + 1) in range(len(files))
-    if((time.time() - update_graph_scatter.time > 2.5) and valid):
-        update_graph_scatter.time = time.time()
-        update_graph_scatter.fileIndex += 1
-        update_graph_scatter.fileIndex %= len(files)
-        print(f"We have a new file ready: {files[update_graph_scatter.fileIndex]}")
-        
-        tmp = pd.read_csv(importPath / "data" / files[update_graph_scatter.fileIndex], header=None)  
-        tmp = tmp.rename({1: "date", 2: "pgn", 3: "data", 4: "name"}, axis=1)
-        tmp["date"] = pd.to_datetime(tmp["date"], unit="s")  # Convert Unix Timestamp
-        tmp["pgn"] = tmp["pgn"].apply(int, base=16)
-        for i in range(8):
-            tmp[f"{7-i}"] = pd.Series((tmp["data"].apply(int, base=16) // 2**(8*i)) & 0xFF)
-        tmp = tmp[tmp["date"] > systemStartTime.strftime("%Y-%m-%d %H:%M:%S")]
-        df = df.append(tmp)
-
-    if(len(df) > 0):
-        df = df[df["date"] > (df.iloc[-1, :]["date"] - pd.to_timedelta(f"{maxDisplayTime}s"))]
-    
-        tachograph = df[df["pgn"] == 0xFE6C]
-        tachograph["speed"] = tachograph["7"] + tachograph["6"] / 256.0
-        
-        engineController1 = df[df["pgn"] == 0xF004]
-        engineController1["engineTorque"] = engineController1["2"] - 125.0
-        engineController1["engineSpeed"] = (engineController1["3"] + engineController1["4"] * 256) / 8.0
-        
-        engineController2 = df[df["pgn"] == 0xF003]
-        engineController2["acceleratorPedal"] = engineController2["1"] * 0.4
-        engineController2["engineLoad"] = engineController2["2"] * 0.4
-        
-        ambientAir = df[df["pgn"] == 0xFEF5]
-        ambientAir["ambientAir"] = (ambientAir["3"] + ambientAir["4"] * 256) * 0.03125 - 273.0
-        
-        temperature = df[df["pgn"] == 0xFEEE]
-        temperature["temperature"] = temperature["0"] - 40.0
-        
-        fuelConsumption = df[df["pgn"] == 0xFEE9]
-        fuelConsumption["fuelConsumption"] = (fuelConsumption["4"] + 
-                                              fuelConsumption["5"] * 256 + 
-                                              fuelConsumption["6"] * 256**2  +
-                                              fuelConsumption["7"] * 256**3) * 0.5
-        fuelConsumption["fuelConsumption"] -= fuelConsumption["fuelConsumption"].iloc[0]
-        
-    
-    fig = make_subplots(rows=4, cols=1, vertical_spacing = 0.065,
-                        subplot_titles=["Vehicle Speed [km/h]",
-                                        "Accelerator Pedal [%]",
-                                        "Engine Speed [rpm]",
-                                        "Fuel Consumption [l]"])
-    
-    fig.append_trace(go.Scatter(x=tachograph["date"], y=tachograph["speed"],
-                                name="Vehicle Speed [km/h]", fill="tozeroy"), 1, 1)
-    
-    fig.append_trace(go.Scatter(x=engineController2["date"], y=engineController2["acceleratorPedal"],
-                                name="Accelerator Pedal [%]", fill="tozeroy"), 2, 1)
-    
-    fig.append_trace(go.Scatter(x=engineController1["date"], y=engineController1["engineSpeed"],
-                                name="Engine Speed [rpm]", fill="tozeroy"), 3, 1)
-    
-    fig.append_trace(go.Scatter(x=fuelConsumption["date"], y=fuelConsumption["fuelConsumption"],
-                                name="Fuel Consumption [l]", fill="tozeroy"), 4, 1)
-    
-    # fig.append_trace(go.Scatter(x=temperature["date"], y=temperature["temperature"],
-    #                             name="Engine Temperature [°C]", fill="tozeroy"), 4, 1)
-    
-    # fig.append_trace(go.Scatter(x=ambientAir["date"], y=ambientAir["ambientAir"],
-    #                             name="Ambient Air [°C]", fill="tozeroy"), 5, 1)
-    
-    # fig.append_trace(go.Scatter(x=engineController2["date"], y=engineController2["engineLoad"],
-    #                             name="Engine Load [%]", fill="tozeroy"), 2, 1)
-    
-    # fig.append_trace(go.Scatter(x=engineController1["date"], y=engineController1["engineTorque"],
-    #                             name="Engine Torque [%]", fill="tozeroy"), 3, 1)
+def update_graph_scatter(n, vehicle, state):
+    global fleet, stream
+
+    with metrics.callback("update_graph_scatter"):
+        if(pushMode):
+            # Only called when the vehicle changes, the browser streams everything after the snapshot
+            with metrics.stage("figure"):
+                figure, sequence = stream.snapshot(vehicle)
+            if(figure is None):
+                return dash.no_update, dash.no_update, dash.no_update
+            return figure, dash.no_update, {"vehicle": vehicle, "sequence": sequence}
+
+        with stream.lock:
+            frames = readFrames()
+            with metrics.stage("window"):
+                for frameArray in frames:
+                    fleet.add(frameArray)
+            metrics.gauge("window_frames", sum(len(fleet[name]) for name in fleet.vehicles))
+            metrics.gauge("vehicles", len(fleet))
+
+            if(vehicle not in fleet):
+                return dash.no_update, dash.no_update, dash.no_update
+            window = fleet[vehicle]
+            if(state is None or state.get("vehicle") != vehicle):
+                with metrics.stage("figure"):
+                    figure, state = liveSnapshot(window)  # Other vehicle selected, send its whole window once
+                state["vehicle"] = vehicle
+                return figure, dash.no_update, state
+
+            # Only the points this session has not received yet
+            with metrics.stage("figure"):
+                extendData, state = liveUpdate(window, state)
+            if(extendData is None):
+                return dash.no_update, dash.no_update, dash.no_update
+            return dash.no_update, extendData, state
 
 
-    fig['layout']['xaxis1'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis2'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis3'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis4'].update(range=[min(df["date"]),max(df["date"])])
-    
-    fig['layout']['yaxis1'].update(range=[0, 265])
-    fig['layout']['yaxis2'].update(range=[0, 110])
-    fig['layout']['yaxis3'].update(range=[0, 8250])
-    fig['layout']['yaxis4'].update(range=[0, max(1, max(fuelConsumption["fuelConsumption"]) * 1.05)])  
-
-    fig.update_annotations(font=dict(size=18))
-    for i in fig.layout.annotations:
-        i.update(x=0.06, yshift=6)
-
-    gray = "#CCCCCC"
-    fig.update_yaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=5,
-                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
-                     tickfont=dict(size=15))
-    fig.update_xaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=10,
-                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
-                     tickfont=dict(size=15))
-
-    fig.update_layout(width=1700, height=1100, template="plotly_white")
-    fig.update_layout(showlegend=False)
-    return fig
-    
-update_graph_scatter.fileIndex = -1
-update_graph_scatter.time = 0
+@app.callback(
+    [ Output('vehicle-select', 'options'), Output('vehicle-select', 'value'),
+      Output('fleet-overview', 'figure'), Output('trip-overview', 'figure'),
+      Output('overview-version', 'data') ],
+    [ Input('overview-update', 'n_intervals') ],
+    [ State('vehicle-select', 'value'), State('overview-version', 'data') ]
+)
+def update_fleet_overview(n, vehicle, seenVersion):
+    global fleet, stream, trips
+
+    with stream.lock:
+        version = [fleet.version, trips.version]
+        if(version == seenVersion):
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update  # Nothing new for this session
+        vehicles = fleet.vehicles
+        with metrics.stage("figure"):
+            fleetOverview = figureCache.figure(("fleet", *version),
+                                               lambda: fleetFigure(fleet.overview([(pgn, signal) for pgn, signal, _ in liveTraces])))
+    with metrics.stage("figure"):
+        tripOverview = figureCache.figure(("trips", *version), lambda: tripFigure(trips.summary()))
+    options = [{"label": name, "value": name} for name in vehicles]
+    value = vehicles[0] if(vehicle is None and len(vehicles) > 0) else dash.no_update
+    return options, value, fleetOverview, tripOverview, version
+
+
+@app.callback(
+    Output('replay-time', 'children'),
+    [ Input('replay-speed', 'value'), Input('replay-seek', 'value'), Input('overview-update', 'n_intervals') ]
+)
+def update_replay(speed, position, n):
+    trigger = dash.callback_context.triggered[0]["prop_id"]
+    if(trigger.startswith("replay-speed")):
+        replay.setSpeed(speed)
+    elif(trigger.startswith("replay-seek")):
+        replay.seek(position)  # Unix seconds
+    return f"Replay {pd.Timestamp(replay.replayTime()):%Y-%m-%d %H:%M:%S} ({replay.speed}x)"
 
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+###############################################################################
+# file    FigureCache.py
+###############################################################################
+# brief   Bounded cache of serialized figures, in memory and on disk
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import json
+import hashlib
+import pathlib
+import threading
+import collections
+from plotly.io.json import to_json_plotly
+from Metrics import metrics
+
+
+# Figures as JSON bytes keyed by everything they depend on, e.g. (data
+# version, window, vehicle, signal set). A hit saves building the figure. The
+# memory tier drops the least recently used figures beyond maxBytes, the
+# optional disk tier (directory) keeps figures across restarts and drops the
+# oldest files beyond maxDiskBytes.
+class FigureCache:
+    def __init__(self, maxBytes=64 * 2**20, directory=None, maxDiskBytes=512 * 2**20):
+        self.maxBytes = maxBytes
+        self.maxDiskBytes = maxDiskBytes
+        self.entries = collections.OrderedDict()  # key -> bytes, least recently used first
+        self.size = 0
+        self.lock = threading.Lock()
+        self.directory = None if(directory is None) else pathlib.Path(directory)
+        self.diskSize = None  # Known after the first scan
+        if(self.directory is not None):
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def fileName(self, key):
+        return self.directory / (hashlib.sha1(repr(key).encode()).hexdigest() + ".json")
+
+    def get(self, key):
+        with self.lock:
+            if(key in self.entries):
+                self.entries.move_to_end(key)
+                metrics.count("figure_cache_hits_total", tier="memory")
+                return self.entries[key]
+        if(self.directory is not None):
+            fileName = self.fileName(key)
+            try:
+                data = fileName.read_bytes()
+                os.utime(fileName)  # Recently used
+            except OSError:
+                data = None
+            if(data is not None):
+                metrics.count("figure_cache_hits_total", tier="disk")
+                self.remember(key, data)
+                return data
+        metrics.count("figure_cache_misses_total")
+        return None
+
+    def put(self, key, data):
+        self.remember(key, data)
+        if(self.directory is not None):
+            fileName = self.fileName(key)
+            temporary = fileName.with_suffix(".tmp")
+            temporary.write_bytes(data)
+            os.replace(temporary, fileName)
+            self.trimDisk(len(data))
+
+    def remember(self, key, data):
+        if(len(data) > self.maxBytes):
+            return
+        with self.lock:
+            if(key in self.entries):
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = data
+            self.size += len(data)
+            while(self.size > self.maxBytes):
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+            metrics.gauge("figure_cache_bytes", self.size)
+
+    # Drops the least recently used files once the directory exceeds its budget
+    def trimDisk(self, added):
+        with self.lock:
+            if(self.diskSize is not None):
+                self.diskSize += added
+                if(self.diskSize <= self.maxDiskBytes):
+                    return
+            files = []
+            for entry in os.scandir(self.directory):
+                if(entry.name.endswith(".json")):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            files.sort()
+            self.diskSize = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if(self.diskSize <= self.maxDiskBytes):
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                self.diskSize -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    # JSON of what build() returns, built only when the key is not cached. For
+    # Flask routes, which can send it as it is.
+    def serialized(self, key, build):
+        data = self.get(key)
+        if(data is None):
+            data = to_json_plotly(build()).encode()
+            self.put(key, data)
+        return data
+
+    # Same as serialized(), parsed again for the Dash callbacks. Dash encodes
+    # the dict once more, a hit saves the build but not the serialization.
+    def figure(self, key, build):
+        return json.loads(self.serialized(key, build))
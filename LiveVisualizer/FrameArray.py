@@ -0,0 +1,131 @@
+###############################################################################
+# file    FrameArray.py
+###############################################################################
+# brief   Compact struct-of-arrays container for CAN frames
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+from FrameDecoder import timeMask, toNanoseconds
+from SignalDatabase import decodeSignals
+
+# Interned vehicle names, a frame only stores the uint16 index into this list
+vehicleNames = []
+vehicleCodes = {}
+
+
+def internVehicles(names):
+    names, inverse = np.unique(np.asarray(names, dtype=object).astype(str), return_inverse=True)
+    codes = np.empty(len(names), dtype=np.uint16)
+    for i, name in enumerate(map(str, names)):
+        if(name not in vehicleCodes):
+            vehicleCodes[name] = len(vehicleNames)
+            vehicleNames.append(name)
+        codes[i] = vehicleCodes[name]
+    return codes[inverse.reshape(-1)]
+
+
+# One array per field, 21 bytes per frame:
+#   time     int64   nanoseconds since the epoch
+#   pgn      uint16
+#   source   uint8   J1939 source address
+#   payload  uint64  data bytes, byte 0 is the least significant byte
+#   vehicle  uint16  index into vehicleNames
+class FrameArray:
+    dtypes = {"time": np.int64, "pgn": np.uint16, "source": np.uint8,
+              "payload": np.uint64, "vehicle": np.uint16}
+
+    def __init__(self, time=(), pgn=None, source=None, payload=None, vehicle=None):
+        self.time = np.asarray(time, dtype=np.int64)
+        for name, values in (("pgn", pgn), ("source", source), ("payload", payload), ("vehicle", vehicle)):
+            if(values is None):
+                values = np.zeros(len(self.time), dtype=self.dtypes[name])
+            setattr(self, name, np.asarray(values, dtype=self.dtypes[name]))
+
+    # From a reader DataFrame ("date" or "time" in seconds, "pgn", "payload" and
+    # optionally "source" and the vehicle "name")
+    @classmethod
+    def fromFrame(cls, df):
+        if("date" in df):
+            time = df["date"].to_numpy().astype("datetime64[ns]").astype(np.int64)
+        else:
+            time = np.round(df["time"].to_numpy() * 1e9).astype(np.int64)
+        source = df["source"].to_numpy() if("source" in df) else None
+        vehicle = internVehicles(df["name"].fillna("").to_numpy()) if("name" in df) else None
+        return cls(time, df["pgn"].to_numpy(), source, df["payload"].to_numpy(), vehicle)
+
+    @classmethod
+    def concat(cls, arrays):
+        arrays = [a for a in arrays if(len(a) > 0)]
+        if(len(arrays) <= 1):
+            return arrays[0] if(len(arrays) == 1) else cls()
+        return cls(*[np.concatenate([getattr(a, n) for a in arrays]) for n in cls.dtypes])
+
+    def __len__(self):
+        return len(self.time)
+
+    # A column name returns the column ("date" and "name" are derived from
+    # time and vehicle), anything else selects frames like a NumPy index
+    def __getitem__(self, key):
+        if(isinstance(key, str)):
+            if(key == "date"):
+                return self.time.view("datetime64[ns]")
+            if(key == "name"):
+                return np.asarray(vehicleNames, dtype=object)[self.vehicle]
+            return getattr(self, key)
+        return FrameArray(*[getattr(self, n)[key] for n in self.dtypes])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, n).nbytes for n in self.dtypes)
+
+    @property
+    def vehicles(self):
+        return [vehicleNames[v] for v in np.unique(self.vehicle)]
+
+    # Vehicle names as categorical, the codes are shared with vehicleNames
+    def names(self):
+        return pd.Categorical.from_codes(self.vehicle.astype(np.int64), list(vehicleNames))
+
+    def select(self, pgn):
+        return self[self.pgn == pgn]
+
+    # Frames strictly after start and before end (unix seconds, datetime or string)
+    def window(self, start=None, end=None):
+        return self[timeMask(self.time, toNanoseconds(start), toNanoseconds(end))]
+
+    # Frames of one PGN with all of their decoded signals, like signalGroup()
+    def signalGroup(self, pgn):
+        group = self.select(pgn)
+        return pd.DataFrame({"date": group["date"], "name": group.names(),
+                             **decodeSignals(pgn, group.payload)})
+
+    def toDataFrame(self):
+        return pd.DataFrame({"date": self["date"], "pgn": self.pgn, "source": self.source,
+                             "payload": self.payload, "name": self.names()})
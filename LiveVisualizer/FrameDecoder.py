@@ -0,0 +1,127 @@
+###############################################################################
+# file    FrameDecoder.py
+###############################################################################
+# brief   Vectorized decoder for the hex encoded PGN and payload columns
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+
+# ASCII code -> nibble value, 0xFF marks characters that are not hex digits
+hexTable = np.full(256, 0xFF, dtype=np.uint8)
+hexTable[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+hexTable[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
+hexTable[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+
+
+# Converts a column of hex strings into an uint8[N, byteCount] matrix with the
+# first byte of each string in column 0. Shorter strings are right-aligned like
+# int(x, base=16) would treat them.
+def hexToBytes(column, byteCount):
+    width = 2 * byteCount
+    text = np.asarray(column, dtype=f"S{width + 1}")
+    chars = text.view(np.uint8).reshape(-1, width + 1)
+    if(chars[:, width].any()):
+        raise ValueError(f"hex value longer than {width} digits")
+    chars = chars[:, :width]
+    nibbles = hexTable[chars]
+
+    length = np.count_nonzero(chars, axis=1)
+    if((length != width).any()):
+        if((length == 0).any()):
+            raise ValueError("empty hex value")
+        index = np.arange(width) - (width - length)[:, None]
+        padding = index < 0
+        nibbles = np.take_along_axis(nibbles, np.maximum(index, 0), axis=1)
+        nibbles[padding] = 0
+    if((nibbles == 0xFF).any()):
+        raise ValueError("invalid hex digit")
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+
+# uint8[N, byteCount] -> column of upper-case hex strings, inverse of hexToBytes
+def bytesToHex(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.uint8)
+    digits = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+    chars = np.empty((matrix.shape[0], 2 * matrix.shape[1]), dtype=np.uint8)
+    chars[:, 0::2] = digits[matrix >> 4]
+    chars[:, 1::2] = digits[matrix & 0x0F]
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str)
+
+
+# Hex payload column ("0011223344556677") -> uint8[N, 8]
+def decodePayload(column):
+    return hexToBytes(column, 8)
+
+
+# Hex PGN column ("FE6C") -> uint16[N]
+def decodePgn(column):
+    pgnBytes = hexToBytes(column, 2).astype(np.uint16)
+    return (pgnBytes[:, 0] << 8) | pgnBytes[:, 1]
+
+
+# uint8[N, 8] -> uint64[N] with byte 0 as least significant byte (J1939 order)
+def payloadWord(payload):
+    payload = np.ascontiguousarray(payload, dtype=np.uint8).reshape(-1, 8)
+    return payload.view("<u8")[:, 0].astype(np.uint64)
+
+
+# Replaces the hex "pgn" column of a network-tool frame by its numeric value and
+# adds the "payload" word the signal decoders are working on.
+def decodeFrames(df):
+    df["pgn"] = decodePgn(df["pgn"].to_numpy())
+    df["payload"] = payloadWord(decodePayload(df["data"].to_numpy()))
+    return df
+
+
+# Normalizes a PGN filter (ints or hex strings) into a sorted uint16 array
+def pgnFilter(pgns):
+    if(pgns is None):
+        return None
+    return np.unique([int(p, 16) if(isinstance(p, str)) else int(p) for p in pgns]).astype(np.uint16)
+
+
+# Converts a time bound (unix seconds, datetime or date string) into int64
+# nanoseconds since the epoch
+def toNanoseconds(value):
+    if(value is None):
+        return None
+    if(isinstance(value, (int, float, np.integer, np.floating))):
+        return int(round(value * 1e9))
+    return pd.Timestamp(value).value
+
+
+# Frames strictly after start and before end (both in nanoseconds, optional)
+def timeMask(ns, start=None, end=None):
+    mask = np.ones(len(ns), dtype=bool)
+    if(start is not None):
+        mask &= ns > start
+    if(end is not None):
+        mask &= ns < end
+    return mask
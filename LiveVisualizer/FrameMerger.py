@@ -0,0 +1,173 @@
+###############################################################################
+# file    FrameMerger.py
+###############################################################################
+# brief   Time ordered merge of frame streams without duplicates
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import heapq
+import numpy as np
+from FrameArray import FrameArray
+from Metrics import metrics
+
+
+# 64 bit fingerprint of (vehicle, time, PGN, payload) per frame, the key of the
+# duplicate detection (splitmix64 finalizer over the fields)
+def frameHash(frames):
+    def mix(h):
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return h ^ (h >> np.uint64(31))
+
+    with np.errstate(over="ignore"):
+        h = mix(frames.time.astype(np.uint64))
+        h = mix(h ^ frames.payload)
+        return mix(h ^ ((frames.pgn.astype(np.uint64) << np.uint64(16)) | frames.vehicle.astype(np.uint64)))
+
+
+# Mask of the first occurrence of every frame
+def uniqueFrames(frames):
+    mask = np.zeros(len(frames), dtype=bool)
+    mask[np.unique(frameHash(frames), return_index=True)[1]] = True
+    return mask
+
+
+# Sorted fingerprints of the frames seen recently, 18 bytes per frame. Only
+# frames at or after the time the caller still accepts per vehicle are kept.
+class DuplicateFilter:
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.times = np.empty(0, dtype=np.int64)
+        self.vehicles = np.empty(0, dtype=np.uint16)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    # Mask of the frames neither seen before nor earlier in the same batch
+    def fresh(self, frames):
+        hashes = frameHash(frames)
+        mask = np.zeros(len(frames), dtype=bool)
+        mask[np.unique(hashes, return_index=True)[1]] = True
+        if(len(self.hashes) > 0):
+            index = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+            mask &= self.hashes[index] != hashes
+
+        hashes = np.concatenate([self.hashes, hashes[mask]])
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.times = np.concatenate([self.times, frames.time[mask]])[order]
+        self.vehicles = np.concatenate([self.vehicles, frames.vehicle[mask]])[order]
+        return mask
+
+    # Forgets the frames before the oldest accepted time of their vehicle
+    def forget(self, accepted):
+        keep = self.times >= accepted[self.vehicles]
+        if(not keep.all()):
+            self.hashes, self.times, self.vehicles = self.hashes[keep], self.times[keep], self.vehicles[keep]
+
+
+# Reorder buffer of a live feed: frames are held until their vehicle's newest
+# frame is lateness seconds ahead and come out without duplicates, in time
+# order per vehicle. Frames older than what their vehicle already returned
+# can not be put in order any more and are dropped. A vehicle which stopped
+# sending gets its frames after lateness seconds of wall time. Memory is
+# bounded by the frames of lateness seconds, maxFrames releases the oldest
+# frames earlier.
+class FrameMerger:
+    def __init__(self, lateness=2.0, maxFrames=1000000):
+        self.lateness = int(lateness * 1e9)
+        self.maxFrames = maxFrames
+        self.buffer = FrameArray()
+        self.duplicates = DuplicateFilter()
+        self.latest = np.full(0, np.iinfo(np.int64).min, dtype=np.int64)  # Per vehicle code
+        self.emitted = np.full(0, np.iinfo(np.int64).min, dtype=np.int64)
+        self.arrived = np.zeros(0)  # Wall clock of the newest frame per vehicle code
+
+    def grow(self, vehicles):
+        size = int(vehicles.max()) + 1 if(len(vehicles) > 0) else 0
+        if(size > len(self.latest)):
+            padding = np.full(size - len(self.latest), np.iinfo(np.int64).min, dtype=np.int64)
+            self.latest = np.concatenate([self.latest, padding])
+            self.emitted = np.concatenate([self.emitted, padding])
+            self.arrived = np.concatenate([self.arrived, np.zeros(len(padding))])
+
+    # Frames released by the new ones, sorted by time
+    def add(self, frames):
+        self.grow(frames.vehicle)
+        late = frames.time < self.emitted[frames.vehicle]
+        frames = frames[~late]
+        fresh = self.duplicates.fresh(frames)
+        metrics.count("frames_late_total", int(np.count_nonzero(late)))
+        metrics.count("frames_duplicate_total", int(len(frames) - np.count_nonzero(fresh)))
+        frames = frames[fresh]
+        np.maximum.at(self.latest, frames.vehicle, frames.time)
+        now = time.monotonic()
+        self.arrived[frames.vehicle] = now
+        self.buffer = FrameArray.concat([self.buffer, frames])
+        vehicle = self.buffer.vehicle
+        return self.release((self.buffer.time <= self.latest[vehicle] - self.lateness) |
+                            (now - self.arrived[vehicle] > self.lateness / 1e9))
+
+    # All buffered frames, e.g. at the end of a recording
+    def flush(self):
+        return self.release(np.ones(len(self.buffer), dtype=bool))
+
+    def release(self, ready):
+        excess = len(self.buffer) - self.maxFrames
+        if(excess > 0):
+            ready |= self.buffer.time < np.partition(self.buffer.time, excess)[excess]  # Oldest frames
+        frames = self.buffer[ready]
+        self.buffer = self.buffer[~ready]
+        frames = frames[np.argsort(frames.time, kind="stable")]
+        np.maximum.at(self.emitted, frames.vehicle, frames.time)
+        self.duplicates.forget(self.emitted)
+        metrics.gauge("merge_buffer_frames", len(self.buffer))
+        return frames
+
+
+# k-way merge of blocks into time ordered batches. blocks are (first, read)
+# pairs: read() returns the frames of the block in any order, first is a time
+# [ns] none of them is before (e.g. a time checkpoint of DataManifest). The
+# heap orders the blocks by first and a block is only read once it is the
+# next one, everything before the first time of the next block is final.
+# Only the blocks overlapping each other are held at once, whether the blocks
+# of a file are in order or not.
+def mergeBlocks(blocks):
+    heap = [(int(first), index, read) for index, (first, read) in enumerate(blocks)]
+    heapq.heapify(heap)
+    pending = FrameArray()
+    while(len(heap) > 0):
+        _, _, read = heapq.heappop(heap)
+        frames = FrameArray.concat([pending, read()])
+        frames = frames[np.argsort(frames.time, kind="stable")]
+        bound = heap[0][0] if(len(heap) > 0) else None
+        cut = len(frames) if(bound is None) else int(np.searchsorted(frames.time, bound, side="left"))
+        pending = frames[cut:]
+        if(cut > 0):
+            yield frames[:cut]
@@ -0,0 +1,371 @@
+###############################################################################
+# file    FrameStore.py
+###############################################################################
+# brief   Columnar on-disk store of raw frames and decoded signals
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import json
+import hashlib
+import shutil
+import pathlib
+import numpy as np
+import pandas as pd
+from CsvReader import readCsv
+from CandumpReader import readCandump
+from FrameArray import FrameArray, vehicleNames, internVehicles
+from FrameDecoder import toNanoseconds
+from SignalDatabase import signalDatabase, decodeSignals, signalLabels
+from ParallelLoader import loadFiles
+from FrameMerger import uniqueFrames
+from Rollups import rollupStats, rollupSignals, buildRollups, reduceRollup, rollupFrame
+from StateSignals import stateGap, stateSignals, runRows, joinRuns
+
+storeVersion = 5
+dayLength = 86400 * 10**9  # [ns] partition length
+
+# Layout of a store directory:
+#   manifest.json              sources (size, mtime, partitions written),
+#                              vehicles, partitions
+#   <PGN>/<YYYY-MM-DD>/*.npy   one file per column, sorted by time:
+#                              time (int64 ns), source (uint8), payload
+#                              (uint64), vehicle (uint16 index into the
+#                              vehicles list) and one file per decoded
+#                              signal (float64 / uint8 state code)
+#   <PGN>/<YYYY-MM-DD>/rollup<seconds>/*.npy
+#                              aggregates of the numeric signals for every
+#                              rollup level (see Rollups.py)
+#   <PGN>/<YYYY-MM-DD>/runs/<signal>/*.npy
+#                              runs of every state signal: start, end (int64
+#                              ns), value (uint8 state code) and vehicle, see
+#                              StateSignals.runRows()
+
+
+def fingerprint(fileName):
+    stat = os.stat(fileName)
+    return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+# Frames of a network-tool CSV (*.csv) or candump text file. Candump files
+# carry no vehicle name, their frames are assigned to the file name instead.
+def readSource(fileName):
+    fileName = pathlib.Path(fileName)
+    if(fileName.suffix.lower() == ".csv"):
+        return FrameArray.fromFrame(readCsv(fileName))
+    frames = FrameArray.concat([FrameArray.fromFrame(c) for c in readCandump(fileName)])
+    frames.vehicle[:] = internVehicles([fileName.stem])[0]
+    return frames
+
+
+# Partition name "<PGN>/<YYYY-MM-DD>" of a key PGN * 2^32 + day and back
+def partitionName(key):
+    pgn, day = divmod(int(key), 2**32)
+    return f"{pgn:04X}/{np.datetime64(day, 'D')}"
+
+
+def partitionKey(name):
+    pgn, day = name.split("/")
+    return int(pgn, 16) * 2**32 + int(np.datetime64(day, "D").astype(np.int64))
+
+
+def saveArray(fileName, array):
+    temporary = fileName.with_suffix(".tmp.npy")
+    np.save(temporary, array)
+    os.replace(temporary, fileName)
+
+
+class FrameStore:
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.manifest = {"version": storeVersion, "sources": {}, "vehicles": [], "partitions": {}}
+        try:
+            with open(self.path / "manifest.json") as file:
+                manifest = json.load(file)
+            if(manifest.get("version") == storeVersion):
+                self.manifest = manifest
+        except (OSError, ValueError):
+            pass
+
+    @property
+    def vehicles(self):
+        return self.manifest["vehicles"]
+
+    # Index of a vehicle name in the vehicle column, -1 for unknown vehicles
+    def vehicleCode(self, name):
+        return self.vehicles.index(name) if(name in self.vehicles) else -1
+
+    # Changes with every change of the stored data, keys cached figures
+    @property
+    def revision(self):
+        return hashlib.sha1(json.dumps(self.manifest["partitions"], sort_keys=True).encode()).hexdigest()
+
+    @property
+    def pgns(self):
+        return sorted(int(pgn, 16) for pgn in self.manifest["partitions"])
+
+    # Brings the store in sync with the given source files. New files are read
+    # in parallel and appended. A changed or removed source invalidates only
+    # the partitions (PGN and day) it had written, those are rebuilt from the
+    # changed file and the frames of the other sources in them.
+    def update(self, sources):
+        sources = {str(pathlib.Path(s).resolve()): fingerprint(s) for s in sources}
+        known = self.manifest["sources"]
+        changed = [s for s, e in known.items() if(sources.get(s) != {"size": e["size"], "mtime": e["mtime"]})]
+        stale = {p for s in changed for p in known[s]["partitions"]}
+        for s in changed:
+            del known[s]
+        for name in stale:
+            self.drop(name)
+        refill = [s for s, e in known.items() if(not stale.isdisjoint(e["partitions"]))]
+        new = [s for s in sources if(s not in known)]
+        if(len(new) + len(refill) == 0):
+            if(len(changed) > 0):
+                self.save()
+            return self
+
+        frames, errors, counts = loadFiles(new + refill, readSource)
+        for fileName, error in errors.items():
+            print(f"Could not read {fileName}: {error}")  # Retried on the next update
+            known.pop(fileName, None)
+        loaded = list(counts)
+        owner = np.repeat(np.arange(len(loaded)), list(counts.values()))
+        key = frames.pgn.astype(np.int64) * 2**32 + frames.time // dayLength
+        if(len(refill) > 0):  # Only their frames in the rebuilt partitions
+            keep = ~np.isin(np.array(loaded), refill)[owner] | np.isin(key, [partitionKey(p) for p in stale])
+            frames, owner, key = frames[keep], owner[keep], key[keep]
+        written = {s: [] for s in loaded}
+        for index, k in np.unique(np.column_stack((owner, key)), axis=0):
+            written[loaded[index]].append(partitionName(k))
+
+        frames = frames[uniqueFrames(frames)]  # Uploads sent twice end up in several files
+        codes = np.zeros(max(len(vehicleNames), 1), dtype=np.uint16)
+        for code in np.unique(frames.vehicle):
+            if(vehicleNames[code] not in self.vehicles):
+                self.vehicles.append(vehicleNames[code])
+            codes[code] = self.vehicles.index(vehicleNames[code])
+        frames.vehicle = codes[frames.vehicle]
+
+        day = frames.time // dayLength
+        frames = frames[np.lexsort((frames.time, day, frames.pgn))]
+        day = frames.time // dayLength
+        bounds = np.flatnonzero((np.diff(frames.pgn) != 0) | (np.diff(day) != 0)) + 1
+        for begin, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(frames)]))):
+            if(begin < end):
+                self.append(int(frames.pgn[begin]), int(day[begin]), frames[begin:end])
+
+        for s in new:
+            if(s in written):
+                known[s] = {**sources[s], "partitions": written[s]}
+        self.save()
+        return self
+
+    def append(self, pgn, day, frames):
+        name = str(np.datetime64(day, "D"))
+        directory = self.path / f"{pgn:04X}" / name
+        directory.mkdir(parents=True, exist_ok=True)
+        columns = {c: getattr(frames, c) for c in ["time", "source", "payload", "vehicle"]}
+        if(name in self.manifest["partitions"].setdefault(f"{pgn:04X}", {})):
+            columns = {c: np.concatenate((np.load(directory / f"{c}.npy"), v)) for c, v in columns.items()}
+            order = np.argsort(columns["time"], kind="stable")
+            columns = {c: v[order] for c, v in columns.items()}
+            unique = uniqueFrames(FrameArray(columns["time"], np.full(len(order), pgn), columns["source"],
+                                             columns["payload"], columns["vehicle"]))
+            columns = {c: v[unique] for c, v in columns.items()}  # Frames stored from another file
+
+        for column, values in columns.items():
+            saveArray(directory / f"{column}.npy", values)
+        signals = decodeSignals(pgn, columns["payload"], labels=False)
+        for signal, values in signals.items():
+            saveArray(directory / f"{signal}.npy", values)
+        ns = columns["time"]
+
+        # Rollups are rebuilt from the whole day, like the columns above
+        numeric = {s: signals[s] for s in rollupSignals(pgn)}
+        for resolution, rows in buildRollups(ns, columns["vehicle"], numeric).items():
+            (directory / f"rollup{resolution}").mkdir(exist_ok=True)
+            for column, values in rows.items():
+                saveArray(directory / f"rollup{resolution}" / f"{column}.npy", values)
+        for signal in stateSignals(pgn):
+            (directory / "runs" / signal).mkdir(parents=True, exist_ok=True)
+            for column, values in runRows(ns, signals[signal], columns["vehicle"], stateGap).items():
+                saveArray(directory / "runs" / signal / f"{column}.npy", values)
+        self.manifest["partitions"][f"{pgn:04X}"][name] = {"rows": len(ns), "start": int(ns[0]), "end": int(ns[-1])}
+
+    # Deletes one partition ("<PGN>/<YYYY-MM-DD>")
+    def drop(self, name):
+        pgn, day = name.split("/")
+        shutil.rmtree(self.path / pgn / day, ignore_errors=True)
+        partitions = self.manifest["partitions"].get(pgn, {})
+        partitions.pop(day, None)
+        if(pgn in self.manifest["partitions"] and len(partitions) == 0):
+            del self.manifest["partitions"][pgn]
+            shutil.rmtree(self.path / pgn, ignore_errors=True)
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        temporary = self.path / "manifest.json.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.manifest, file, indent=1)
+        os.replace(temporary, self.path / "manifest.json")
+
+    # (first, last) frame time [ns] over the given PGNs (default all), None
+    # for an empty store
+    def bounds(self, pgns=None):
+        partitions = [p for pgn in (self.pgns if(pgns is None) else pgns)
+                      for p in self.manifest["partitions"].get(f"{pgn:04X}", {}).values()]
+        if(len(partitions) == 0):
+            return None
+        return min(p["start"] for p in partitions), max(p["end"] for p in partitions)
+
+    # Yields (directory, first, last) of the partitions of one PGN which overlap
+    # the time range (nanoseconds, both exclusive)
+    def slices(self, pgn, start=None, end=None):
+        partitions = self.manifest["partitions"].get(f"{pgn:04X}", {})
+        for name, partition in sorted(partitions.items()):
+            if((start is not None and partition["end"] <= start) or (end is not None and partition["start"] >= end)):
+                continue
+            directory = self.path / f"{pgn:04X}" / name
+            ns = np.load(directory / "time.npy", mmap_mode="r")
+            first = 0 if(start is None) else np.searchsorted(ns, start, side="right")
+            last = len(ns) if(end is None) else np.searchsorted(ns, end, side="left")
+            yield directory, first, last
+
+    def load(self, directory, column, first, last):
+        return np.array(np.load(directory / f"{column}.npy", mmap_mode="r")[first:last])
+
+    # Frames of one PGN strictly after start and before end, optionally of one
+    # vehicle (name). Only the partitions overlapping the time range and the
+    # requested columns are opened. columns defaults to all decoded signals,
+    # "vehicle", "source" and "payload" are available too.
+    def read(self, pgn, columns=None, start=None, end=None, vehicle=None):
+        if(columns is None):
+            columns = [s["name"] for s in signalDatabase.get(pgn, [])]
+        parts = {c: [] for c in ["date"] + list(columns)}
+        for directory, first, last in self.slices(pgn, toNanoseconds(start), toNanoseconds(end)):
+            select = slice(None)
+            if(vehicle is not None):
+                select = self.load(directory, "vehicle", first, last) == self.vehicleCode(vehicle)
+            for column in parts:
+                parts[column].append(self.load(directory, "time" if(column == "date") else column, first, last)[select])
+
+        data = {}
+        for column, values in parts.items():
+            values = np.concatenate(values) if(len(values) > 0) else np.zeros(0)
+            if(column == "date"):
+                values = values.astype(np.int64).astype("datetime64[ns]")
+            elif(column == "vehicle"):
+                values = pd.Categorical.from_codes(values.astype(np.int64), self.vehicles)
+            elif(signalLabels(pgn, column) is not None):
+                values = signalLabels(pgn, column)[values.astype(np.int64)]
+            data[column] = values
+        return pd.DataFrame(data)
+
+    # Aggregates of one numeric signal at a rollup resolution [s] for the buckets
+    # overlapping the time range: date, count, min, max, mean, last and with
+    # byVehicle also "vehicle". Merged over the fleet unless byVehicle or a
+    # vehicle (name) is given. Reads at most one row per bucket and vehicle,
+    # whatever the number of frames.
+    def rollup(self, pgn, signal, resolution, start=None, end=None, byVehicle=False, vehicle=None):
+        start, end = toNanoseconds(start), toNanoseconds(end)
+        step = resolution * 10**9
+        partitions = self.manifest["partitions"].get(f"{pgn:04X}", {})
+        parts = {c: [] for c in ["time", "vehicle"] + [f"{signal}.{stat}" for stat in rollupStats]}
+        for name, partition in sorted(partitions.items()):
+            if((start is not None and partition["end"] + step <= start) or (end is not None and partition["start"] >= end)):
+                continue
+            directory = self.path / f"{pgn:04X}" / name / f"rollup{resolution}"
+            ns = np.load(directory / "time.npy", mmap_mode="r")
+            first = 0 if(start is None) else np.searchsorted(ns, start - step, side="right")
+            last = len(ns) if(end is None) else np.searchsorted(ns, end, side="left")
+            for column in parts:
+                parts[column].append(self.load(directory, column, first, last))
+
+        rows = {c: np.concatenate(v) if(len(v) > 0) else np.zeros(0) for c, v in parts.items()}
+        rows["time"] = rows["time"].astype(np.int64)
+        rows["vehicle"] = rows["vehicle"].astype(np.uint16)
+        if(vehicle is not None):
+            select = rows["vehicle"] == self.vehicleCode(vehicle)
+            rows = {c: v[select] for c, v in rows.items()}
+        elif(not byVehicle):
+            rows = reduceRollup(rows, resolution, byVehicle=False)
+        frame = rollupFrame(rows, signal)
+        if(byVehicle):
+            frame["vehicle"] = pd.Categorical.from_codes(rows["vehicle"].astype(np.int64), self.vehicles)
+        return frame
+
+    # Runs of one state signal (see StateSignals.stateRuns()) overlapping the
+    # time range: start, end, value and "vehicle" unless a vehicle (name) is
+    # given. Only the stored runs are read, whatever the number of frames.
+    def runs(self, pgn, signal, start=None, end=None, vehicle=None):
+        start, end = toNanoseconds(start), toNanoseconds(end)
+        partitions = self.manifest["partitions"].get(f"{pgn:04X}", {})
+        parts = {"start": [], "end": [], "value": [], "vehicle": []}
+        for name, partition in sorted(partitions.items()):
+            if((start is not None and partition["end"] < start) or (end is not None and partition["start"] > end)):
+                continue
+            for column in parts:
+                parts[column].append(np.load(self.path / f"{pgn:04X}" / name / "runs" / signal / f"{column}.npy"))
+
+        dtypes = {"start": np.int64, "end": np.int64, "value": np.uint8, "vehicle": np.uint16}
+        rows = {c: np.concatenate(v) if(len(v) > 0) else np.zeros(0, dtype=dtypes[c]) for c, v in parts.items()}
+        order = np.lexsort((rows["start"], rows["vehicle"]))
+        rows = joinRuns({c: v[order] for c, v in rows.items()}, stateGap)
+        select = np.ones(len(rows["start"]), dtype=bool)
+        if(start is not None):
+            select &= rows["end"] >= start
+        if(end is not None):
+            select &= rows["start"] <= end
+        if(vehicle is not None):
+            select &= rows["vehicle"] == self.vehicleCode(vehicle)
+        rows = {c: v[select] for c, v in rows.items()}
+
+        frame = pd.DataFrame({"start": rows["start"].astype("datetime64[ns]"),
+                              "end": rows["end"].astype("datetime64[ns]"),
+                              "value": signalLabels(pgn, signal)[rows["value"].astype(np.int64)]})
+        if(vehicle is None):
+            frame["vehicle"] = pd.Categorical.from_codes(rows["vehicle"].astype(np.int64), self.vehicles)
+        return frame
+
+    # Raw frames of the given PGNs (default all) as FrameArray
+    def frames(self, pgns=None, start=None, end=None):
+        codes = internVehicles(self.vehicles)
+        parts = []
+        for pgn in (self.pgns if(pgns is None) else pgns):
+            for directory, first, last in self.slices(pgn, toNanoseconds(start), toNanoseconds(end)):
+                time = self.load(directory, "time", first, last)
+                parts.append(FrameArray(time, np.full(len(time), pgn),
+                                        self.load(directory, "source", first, last),
+                                        self.load(directory, "payload", first, last),
+                                        codes[self.load(directory, "vehicle", first, last)]))
+        return FrameArray.concat(parts)
+
+
+# Opens the store at path and ingests all new or changed source files
+def openStore(path, sources):
+    return FrameStore(path).update(sources)
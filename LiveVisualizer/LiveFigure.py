@@ -0,0 +1,170 @@
+###############################################################################
+# file    LiveFigure.py
+###############################################################################
+# brief   Live figure layout and incremental trace updates for dcc.Graph
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+from plotly.subplots import make_subplots
+import plotly.graph_objs as go
+
+# (PGN, signal, title) of the live traces, one subplot each
+liveTraces = [(0xFE6C, "speed", "Vehicle Speed [km/h]"),
+              (0xF003, "acceleratorPedal", "Accelerator Pedal [%]"),
+              (0xF004, "engineSpeed", "Engine Speed [rpm]"),
+              (0xFEE9, "fuelConsumption", "Fuel Consumption [l]")]
+              # (0xFEEE, "temperature", "Engine Temperature [°C]"),
+              # (0xFEF5, "ambientAir", "Ambient Air [°C]"),
+              # (0xF003, "engineLoad", "Engine Load [%]"),
+              # (0xF004, "engineTorque", "Engine Torque [%]")]
+
+# Counters which are plotted relative to the first value a session received
+relativeSignals = {"fuelConsumption"}
+
+
+# Layout, styling and empty traces of the live figure. Built once, every page
+# load gets the cached dict and the data follows through liveUpdate().
+def liveFigure():
+    if(liveFigure.figure is not None):
+        return liveFigure.figure
+    fig = make_subplots(rows=len(liveTraces), cols=1, vertical_spacing = 0.065, shared_xaxes=True,
+                        subplot_titles=[title for _, _, title in liveTraces])
+    for row, (_, _, title) in enumerate(liveTraces, 1):
+        fig.append_trace(go.Scatter(x=[], y=[], name=title, fill="tozeroy"), row, 1)
+
+    # The x-axes follow the data, old points are dropped through maxPoints
+    fig.update_xaxes(autorange=True)
+    fig.update_xaxes(showticklabels=False)
+    fig['layout'][f'xaxis{len(liveTraces)}'].update(showticklabels=True)
+
+    fig['layout']['yaxis1'].update(range=[0, 265])
+    fig['layout']['yaxis2'].update(range=[0, 110])
+    fig['layout']['yaxis3'].update(range=[0, 8250])
+    fig['layout']['yaxis4'].update(autorange=True, rangemode="tozero")
+
+    fig.update_annotations(font=dict(size=18))
+    for i in fig.layout.annotations:
+        i.update(x=0.06, yshift=6)
+
+    gray = "#CCCCCC"
+    fig.update_yaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=5,
+                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
+                     tickfont=dict(size=15))
+    fig.update_xaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=10,
+                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
+                     tickfont=dict(size=15))
+
+    fig.update_layout(width=1700, height=1100, template="plotly_white")
+    fig.update_layout(showlegend=False)
+    liveFigure.figure = fig.to_dict()
+    return liveFigure.figure
+
+liveFigure.figure = None
+
+
+# Points of the LiveWindow the browser session has not seen yet. state is the
+# session's dcc.Store content (None on page load, which sends the whole
+# window). Returns the dcc.Graph extendData value, None when there is nothing
+# new, and the new state. maxPoints keeps each trace at its window length, or
+# at the last length seconds of it. The time of the last point sent is kept as
+# a string, nanoseconds would not survive the browser's JSON doubles.
+def liveUpdate(window, state, length=None):
+    if(state is None):
+        state = {"last": [None] * len(liveTraces), "offset": [None] * len(liveTraces)}
+    x, y, indices, maxPoints = [], [], [], []
+    for i, (pgn, signal, _) in enumerate(liveTraces):
+        ring = window.rings.get(pgn)
+        if(ring is None or len(ring) == 0):
+            continue
+        times = ring["time"]
+        last = state["last"][i]
+        begin = 0 if(length is None) else int(np.searchsorted(times, times[-1] - int(length * 1e9), side="right"))
+        first = begin if(last is None) else max(begin, int(np.searchsorted(times, int(last), side="right")))
+        if(first == len(times)):
+            continue
+        values = ring[signal][first:].astype(np.float64)
+        if(signal in relativeSignals):
+            finite = values[np.isfinite(values)]
+            if(state["offset"][i] is None and len(finite) > 0):
+                state["offset"][i] = float(finite[0])
+            if(state["offset"][i] is not None):
+                values -= state["offset"][i]
+        x.append(times[first:].view("datetime64[ns]"))
+        y.append(values)
+        indices.append(i)
+        maxPoints.append(len(times) - begin)
+        state["last"][i] = str(int(times[-1]))
+    if(len(indices) == 0):
+        return None, state
+    return [dict(x=x, y=y), indices, dict(x=maxPoints, y=maxPoints)], state
+
+
+# Live figure already filled with the whole window, e.g. after switching the
+# vehicle. Returns the figure and the session state for liveUpdate(). offset
+# keeps the relative signals on the zero point of an existing state.
+def liveSnapshot(window, offset=None, length=None):
+    figure = dict(liveFigure())
+    figure["data"] = [dict(trace) for trace in figure["data"]]
+    state = None if(offset is None) else {"last": [None] * len(liveTraces), "offset": list(offset)}
+    extendData, state = liveUpdate(window, state, length)
+    if(extendData is not None):
+        data, indices, _ = extendData
+        for k, i in enumerate(indices):
+            figure["data"][i]["x"] = data["x"][k]
+            figure["data"][i]["y"] = data["y"][k]
+    return figure, state
+
+
+# Fleet overview grid: one row per vehicle with its last frame and the latest
+# value of every live trace (FleetWindow.overview() of liveTraces)
+def fleetFigure(overview):
+    titles = [title for _, _, title in liveTraces]
+    cells = [overview["vehicle"], pd.to_datetime(overview["last"]).dt.strftime("%H:%M:%S")]
+    cells += [overview[signal].round(1) for _, signal, _ in liveTraces]
+    fig = go.Figure(go.Table(header=dict(values=["Vehicle", "Last Frame"] + titles, font=dict(size=15)),
+                             cells=dict(values=cells, font=dict(size=14), height=26)))
+    fig.update_layout(width=1700, height=max(200, 26 * len(overview) + 80), template="plotly_white",
+                      margin=dict(l=20, r=20, t=20, b=20))
+    return fig
+
+
+# Trip statistics grid: one row per vehicle (TripStatistics.summary())
+def tripFigure(summary):
+    columns = [("fuel", "Fuel [l]", 1), ("distance", "Distance [km]", 1), ("averageSpeed", "Avg. Speed [km/h]", 1),
+               ("fuelPer100km", "Fuel [l/100 km]", 1), ("drivingTime", "Driving [min]", 0), ("idleTime", "Idle [min]", 0)]
+    cells = [summary["vehicle"], pd.to_datetime(summary["start"]).dt.strftime("%H:%M:%S")]
+    for name, _, digits in columns:
+        values = pd.to_numeric(summary[name]) / (60 if(name.endswith("Time")) else 1)
+        cells.append(values.round(digits))
+    fig = go.Figure(go.Table(header=dict(values=["Vehicle", "Trip Start"] + [title for _, title, _ in columns], font=dict(size=15)),
+                             cells=dict(values=cells, font=dict(size=14), height=26)))
+    fig.update_layout(width=1700, height=max(200, 26 * len(summary) + 80), template="plotly_white",
+                      margin=dict(l=20, r=20, t=20, b=20))
+    return fig
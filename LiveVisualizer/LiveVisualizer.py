@@ -32,15 +32,26 @@
 
 import os
 import sys
+import json
 import dash
+import flask
+import argparse
 import pathlib
 import platform
 import pandas as pd
-from plotly.subplots import make_subplots
-from dash.dependencies import Output, Input
+from dash.dependencies import Output, Input, State, ClientsideFunction
 import dash_core_components as dcc
 import dash_html_components as html
-import plotly.graph_objs as go
+from RingBuffer import FleetWindow
+from Sources import openSource
+from LiveFigure import liveTraces, liveFigure, liveUpdate, liveSnapshot, fleetFigure, tripFigure
+from Metrics import metrics
+from PushStream import PushStream
+from TripStatistics import TripStatistics, tripPgns, summaryColumns
+from SharedWindow import SharedWindow
+from FrameArray import FrameArray
+from FrameMerger import FrameMerger
+from FigureCache import FigureCache
 from datetime import datetime
 import webbrowser
 import threading
@@ -65,123 +76,190 @@ def runServer():
 
 
 maxDisplayTime = 60  # [s]
-df = pd.DataFrame()
+windowLengths = [10, 30, 60]  # [s] each session chooses the part of the window it shows
+plotPgns = [0xFE6C, 0xF004, 0xF003, 0xFEF5, 0xFEEE, 0xFEE9]  # PGNs decoded for the graphs
+sharedSignals = [(pgn, signal) for pgn, signal, _ in liveTraces]
+sharedWindowPath = os.environ.get("FLEET_SHARED_WINDOW")  # Set for server workers reading an ingest process (--ingest)
+sharedVehicles = int(os.environ.get("FLEET_SHARED_VEHICLES", 512))  # Vehicle slots of the shared window, at least the fleet size
+sharedCapacity = int(os.environ.get("FLEET_SHARED_CAPACITY", 6000))  # Samples per PGN and vehicle, 60 s at 100 Hz
+pushMode = sharedWindowPath is None  # Stream new samples to the browsers (Server-Sent Events) instead of polling every second
+fleet = FleetWindow(maxDisplayTime, plotPgns)  # One window per vehicle
+trips = TripStatistics()  # Whole trips and shifts, beyond the window
+merger = FrameMerger(lateness=2.0)  # Reorders late frames of up to 2 s, drops duplicates
+sourceUrl = importPath / "data"  # Data directory of the network tool, or "udp://127.0.0.1:50001" for binary frames
+if(sharedWindowPath is None):
+    source = openSource(sourceUrl, plotPgns + tripPgns, systemStartTime, history=1)  # Newest file and everything appended
+    shared = None
+else:
+    source = None
+    shared = SharedWindow(sharedWindowPath, sharedSignals)
+view = fleet if(shared is None) else shared  # The windows the callbacks read
+figureCache = FigureCache(32 * 2**20)  # Figures shared by all sessions showing the same data
+
+
+# New frames of the source in order and without duplicates, the trip
+# statistics see them on the way
+def readFrames(timeout=0):
+    with metrics.stage("merge"):
+        frames = merger.add(FrameArray.concat(source.read(timeout)))
+    if(len(frames) == 0):
+        return []
+    with metrics.stage("trips"):
+        trips.add(frames)
+    return [frames]
+
+stream = PushStream(fleet, readFrames)  # Also guards the fleet in polling mode
+
+
+# Changes whenever the window or the trip statistics change, keys the cached figures
+def dataVersion():
+    if(shared is None):
+        return [fleet.version, trips.version]
+    return [shared.version]  # Trip statistics are shared with the same update
+
+
+# Trip statistics of the own ingest, or the ones the ingest process shares
+def tripSummary():
+    if(shared is None):
+        return trips.summary()
+    return pd.DataFrame(json.loads(shared.blob() or b"[]"), columns=["vehicle"] + summaryColumns)
+
+
+# Ingest process of the multi-process setup: reads the source and mirrors the
+# window and the trip statistics into shared memory for any number of server
+# workers, which then only copy what they show
+def runIngest(path, maxVehicles=sharedVehicles, capacity=sharedCapacity):
+    window = SharedWindow(path, sharedSignals, maxVehicles, capacity, create=True)
+    print(f"Sharing the live window of up to {maxVehicles} vehicles in {path} ({window.size / 2**20:.0f} MB at most)")
+    while(True):
+        frames = readFrames(0.25)
+        if(len(frames) == 0):
+            continue
+        with metrics.stage("window"):
+            for frameArray in frames:
+                fleet.add(frameArray)
+        with metrics.stage("share"):
+            window.update(fleet, trips.summary().to_json(orient="records").encode())
 
 
 app = dash.Dash(__name__)
 app.layout = html.Div([
-    dcc.Graph(id='live-update-graph', animate=True),
-    dcc.Interval(id='graph-update', interval=1*1000)
+    html.Div([
+        dcc.Dropdown(id='vehicle-select', clearable=False, style={'width': 400}),
+        dcc.Dropdown(id='window-length', clearable=False, style={'width': 200}, value=maxDisplayTime,
+                     options=[{"label": f"{length} s", "value": length} for length in windowLengths],
+                     persistence=True, persistence_type="local")
+    ], style={'display': 'flex', 'gap': 20}),
+    dcc.Graph(id='live-update-graph', figure=liveFigure()),
+    dcc.Store(id='graph-state'),
+    dcc.Store(id='stream-vehicle'),
+    dcc.Store(id='overview-version'),
+    dcc.Graph(id='fleet-overview'),
+    dcc.Graph(id='trip-overview'),
+    dcc.Interval(id='graph-update', interval=1*1000, disabled=pushMode),
+    dcc.Interval(id='overview-update', interval=5*1000)
 ])
+server = app.server  # WSGI application, e.g. for gunicorn LiveVisualizer:server
+metrics.register(server)  # /metrics (Prometheus), POST /profile toggles cProfile with FLEET_PROFILE=1
+if(shared is None):
+    trips.register(server)  # /trips and /trips/<vehicle> (JSON)
+else:
+    @server.route("/trips")
+    def sharedTripsRoute():
+        return flask.Response(shared.blob() or b"[]", mimetype="application/json")
+if(pushMode):
+    stream.register(server)  # /stream/<vehicle>, consumed by assets/pushStream.js
+    app.clientside_callback(ClientsideFunction(namespace="pushStream", function_name="connect"),
+                            Output('stream-vehicle', 'data'), [ Input('graph-state', 'data') ])
 
 
 @app.callback(
-    Output('live-update-graph', 'figure'),
-    [ Input('graph-update', 'n_intervals') ]
+    [ Output('live-update-graph', 'figure'), Output('live-update-graph', 'extendData'),
+      Output('graph-state', 'data') ],
+    [ Input('graph-update', 'n_intervals'), Input('vehicle-select', 'value'),
+      Input('window-length', 'value') ],
+    [ State('graph-state', 'data') ]
 )
-def update_graph_scatter(input_data):
-    global df, systemStartTime, maxDisplayTime
-
-    files = sorted(os.listdir(importPath / "data"))
-    try:
-        index = [int(i.split('.')[0]) for i in files][-1]
-    except:
-        index = -1
-    if(index != update_graph_scatter.fileIndex):
-        update_graph_scatter.fileIndex = index
-        print(f"We have a new file ready: {files[index]}")
-        
-        tmp = pd.read_csv(importPath / "data" / files[update_graph_scatter.fileIndex], header=None)  
-        tmp = tmp.rename({1: "date", 2: "pgn", 3: "data", 4: "name"}, axis=1)
-        tmp["date"] = pd.to_datetime(tmp["date"], unit="s")  # Convert Unix Timestamp
-        tmp["pgn"] = tmp["pgn"].apply(int, base=16)
-        for i in range(8):
-            tmp[f"{7-i}"] = pd.Series((tmp["data"].apply(int, base=16) // 2**(8*i)) & 0xFF)
-        tmp = tmp[tmp["date"] > systemStartTime.strftime("%Y-%m-%d %H:%M:%S")]
-        df = df.append(tmp)
-        
-        
-    if(len(df) > 0):
-        df = df[df["date"] > (df.iloc[-1, :]["date"] - pd.to_timedelta(f"{maxDisplayTime}s"))]
-    
-        tachograph = df[df["pgn"] == 0xFE6C]
-        tachograph["speed"] = tachograph["7"] + tachograph["6"] / 256.0
-        
-        engineController1 = df[df["pgn"] == 0xF004]
-        engineController1["engineTorque"] = engineController1["2"] - 125.0
-        engineController1["engineSpeed"] = (engineController1["3"] + engineController1["4"] * 256) / 8.0
-        
-        engineController2 = df[df["pgn"] == 0xF003]
-        engineController2["acceleratorPedal"] = engineController2["1"] * 0.4
-        engineController2["engineLoad"] = engineController2["2"] * 0.4
-        
-        ambientAir = df[df["pgn"] == 0xFEF5]
-        ambientAir["ambientAir"] = (ambientAir["3"] + ambientAir["4"] * 256) * 0.03125 - 273.0
-        
-        temperature = df[df["pgn"] == 0xFEEE]
-        temperature["temperature"] = temperature["0"] - 40.0
-        
-        fuelConsumption = df[df["pgn"] == 0xFEE9]
-        fuelConsumption["fuelConsumption"] = (fuelConsumption["4"] + 
-                                              fuelConsumption["5"] * 256 + 
-                                              fuelConsumption["6"] * 256**2  +
-                                              fuelConsumption["7"] * 256**3) * 0.5
-        fuelConsumption["fuelConsumption"] -= fuelConsumption["fuelConsumption"].iloc[0]
-    
-
-    fig = make_subplots(rows=4, cols=1, vertical_spacing = 0.065,
-                        subplot_titles=["Vehicle Speed [km/h]",
-                                        "Accelerator Pedal [%]",
-                                        "Engine Speed [rpm]",
-                                        "Fuel Consumption [l]"])
-    
-    fig.append_trace(go.Scatter(x=tachograph["date"], y=tachograph["speed"],
-                                name="Vehicle Speed [km/h]", fill="tozeroy"), 1, 1)
-    
-    fig.append_trace(go.Scatter(x=engineController2["date"], y=engineController2["acceleratorPedal"],
-                                name="Accelerator Pedal [%]", fill="tozeroy"), 2, 1)
-    
-    fig.append_trace(go.Scatter(x=engineController1["date"], y=engineController1["engineSpeed"],
-                                name="Engine Speed [rpm]", fill="tozeroy"), 3, 1)
-    
-    fig.append_trace(go.Scatter(x=fuelConsumption["date"], y=fuelConsumption["fuelConsumption"],
-                                name="Fuel Consumption [l]", fill="tozeroy"), 4, 1)
-
-    fig['layout']['xaxis1'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis2'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis3'].update(range=[min(df["date"]),max(df["date"])], showticklabels=False)
-    fig['layout']['xaxis4'].update(range=[min(df["date"]),max(df["date"])])
-    
-    fig['layout']['yaxis1'].update(range=[0, 265])
-    fig['layout']['yaxis2'].update(range=[0, 110])
-    fig['layout']['yaxis3'].update(range=[0, 8250])
-    fig['layout']['yaxis4'].update(range=[0, max(1, max(fuelConsumption["fuelConsumption"]) * 1.05)])    
-    
-    fig.update_annotations(font=dict(size=18))
-    for i in fig.layout.annotations:
-        i.update(x=0.06, yshift=6)
-    
-    gray = "#CCCCCC"
-    fig.update_yaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=5,
-                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
-                     tickfont=dict(size=15))
-    fig.update_xaxes(ticks="outside", tickwidth=2, tickcolor='white', ticklen=10,
-                     linewidth=1.1, linecolor=gray, gridwidth=1.1, gridcolor=gray,
-                     tickfont=dict(size=15))
-    
-    fig.update_layout(width=1700, height=1100, template="plotly_white")
-    fig.update_layout(showlegend=False)
-    return fig
-
-update_graph_scatter.fileIndex = -1
-update_graph_scatter.time = 0
+def update_graph_scatter(input_data, vehicle, length, state):
+    global fleet, stream, view
+
+    with metrics.callback("update_graph_scatter"):
+        if(pushMode):
+            # Only called when the vehicle changes, the browser streams everything after the snapshot
+            with metrics.stage("figure"):
+                figure, sequence = stream.snapshot(vehicle, length)
+            if(figure is None):
+                return dash.no_update, dash.no_update, dash.no_update
+            return figure, dash.no_update, {"vehicle": vehicle, "length": length, "sequence": sequence}
+
+        with stream.lock:
+            if(shared is None):
+                frames = readFrames()
+                with metrics.stage("window"):
+                    for frameArray in frames:
+                        fleet.add(frameArray)
+            metrics.gauge("vehicles", len(view))
+
+            if(vehicle not in view):
+                return dash.no_update, dash.no_update, dash.no_update
+            if(state is None or state.get("vehicle") != vehicle or state.get("length") != length):
+                # Other view selected, send it whole once. Cheaper to build than to
+                # decode from figureCache, which only keeps the overview tables.
+                with metrics.stage("figure"):
+                    figure, state = liveSnapshot(view[vehicle], length=length)
+                state.update(vehicle=vehicle, length=length)
+                return figure, dash.no_update, state
+
+            # Only the points this session has not received yet
+            window = view[vehicle]  # Consistent copy when shared
+            with metrics.stage("figure"):
+                extendData, state = liveUpdate(window, state, length)
+            if(extendData is None):
+                return dash.no_update, dash.no_update, dash.no_update
+            return dash.no_update, extendData, state
+
+
+@app.callback(
+    [ Output('vehicle-select', 'options'), Output('vehicle-select', 'value'),
+      Output('fleet-overview', 'figure'), Output('trip-overview', 'figure'),
+      Output('overview-version', 'data') ],
+    [ Input('overview-update', 'n_intervals') ],
+    [ State('vehicle-select', 'value'), State('overview-version', 'data') ]
+)
+def update_fleet_overview(n, vehicle, seenVersion):
+    global stream, view
+
+    with stream.lock:
+        version = dataVersion()
+        if(version == seenVersion):
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update  # Nothing new for this session
+        vehicles = view.vehicles
+        with metrics.stage("figure"):
+            fleetOverview = figureCache.figure(("fleet", *version), lambda: fleetFigure(view.overview(sharedSignals)))
+    with metrics.stage("figure"):
+        tripOverview = figureCache.figure(("trips", *version), lambda: tripFigure(tripSummary()))
+    options = [{"label": name, "value": name} for name in vehicles]
+    value = vehicles[0] if(vehicle is None and len(vehicles) > 0) else dash.no_update
+    return options, value, fleetOverview, tripOverview, version
 
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Live visualizer of the fleet monitor")
+    parser.add_argument("--ingest", metavar="PATH", nargs="?", const="/dev/shm/fleet-monitor-window",
+                        help="only ingest into a shared window, served by FLEET_SHARED_WINDOW=PATH gunicorn LiveVisualizer:server")
+    parser.add_argument("--vehicles", type=int, default=sharedVehicles,
+                        help="vehicle slots of the shared window (FLEET_SHARED_VEHICLES), about 0.8 MB each")
+    parser.add_argument("--capacity", type=int, default=sharedCapacity,
+                        help="samples per PGN and vehicle in the shared window (FLEET_SHARED_CAPACITY)")
+    args = parser.parse_args()
+
     serverThread = threading.Thread(target=runServer, daemon=True)
     serverThread.start()
-    
+
+    if(args.ingest is not None):
+        runIngest(args.ingest, args.vehicles, args.capacity)
+
     port = 40000
     threading.Timer(1, webbrowser.open_new("http://localhost:{}".format(port))).start();
     app.run_server(port=port)
@@ -0,0 +1,203 @@
+###############################################################################
+# file    Metrics.py
+###############################################################################
+# brief   Stage timers, counters and a Prometheus /metrics route for Dash
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import io
+import os
+import time
+import bisect
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+
+latencyBuckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # [s]
+sizeBuckets = (1e3, 1e4, 1e5, 1e6, 1e7)  # [bytes]
+maxRoutes = 100  # Distinct route labels, any further ones are counted as "other"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+# Counters, gauges and histograms keyed by name and labels. Recording is a dict
+# update under a lock, cheap enough for every callback and stage.
+class Metrics:
+    def __init__(self, prefix="fleetmonitor"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.profiler = None
+        self.profiling = threading.Lock()  # cProfile only follows one callback at a time
+        self.routes = set()  # Route labels seen so far, at most maxRoutes
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, buckets=latencyBuckets, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if(key not in self.histograms):
+                self.histograms[key] = Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    # Times one stage of a callback into stage_seconds{stage=name}
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=name)
+
+    # Times a whole callback into callback_seconds{callback=name} and runs it
+    # under cProfile while profiling is switched on
+    @contextmanager
+    def callback(self, name):
+        profiler = self.profiler
+        profiled = profiler is not None and self.profiling.acquire(blocking=False)
+        start = time.perf_counter()
+        if(profiled):
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if(profiled):
+                profiler.disable()
+                self.profiling.release()
+            self.observe("callback_seconds", time.perf_counter() - start, callback=name)
+
+    # Switches profiling on, or off again returning the collected statistics
+    def toggleProfile(self, lines=40):
+        if(self.profiler is None):
+            self.profiler = cProfile.Profile()
+            return "profiling started\n"
+        with self.profiling:
+            profiler, self.profiler = self.profiler, None
+        text = io.StringIO()
+        try:
+            pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(lines)
+        except TypeError:
+            return "profiling stopped, no callback ran\n"
+        return text.getvalue()
+
+    def labelText(self, labels, extra=()):
+        labels = list(labels) + list(extra)
+        if(len(labels) == 0):
+            return ""
+        escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+    # Prometheus text exposition format (version 0.0.4)
+    def prometheus(self):
+        lines = []
+        with self.lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({name for name, _ in values}):
+                    lines.append(f"# TYPE {self.prefix}_{name} {kind}")
+                    for (key, labels), value in sorted(values.items()):
+                        if(key == name):
+                            lines.append(f"{self.prefix}_{name}{self.labelText(labels)} {value}")
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append(f"# TYPE {self.prefix}_{name} histogram")
+                for (key, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if(key != name):
+                        continue
+                    total = 0
+                    for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                        total += count
+                        lines.append(f"{self.prefix}_{name}_bucket{self.labelText(labels, [('le', bound)])} {total}")
+                    lines.append(f"{self.prefix}_{name}_sum{self.labelText(labels)} {histogram.sum}")
+                    lines.append(f"{self.prefix}_{name}_count{self.labelText(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    # Bounded label of a route, new labels beyond maxRoutes become "other"
+    def routeLabel(self, route):
+        with self.lock:
+            if(route not in self.routes and len(self.routes) >= maxRoutes):
+                return "other"
+            self.routes.add(route)
+        return route
+
+    # Adds /metrics to the Flask server of a Dash app and records latency and
+    # response size of every request, labeled with the route pattern (the
+    # callback output for Dash updates). With profile (FLEET_PROFILE=1) a POST
+    # to /profile toggles cProfile.
+    def register(self, server, profile=os.environ.get("FLEET_PROFILE") == "1"):
+        import flask
+
+        @server.before_request
+        def startRequest():
+            flask.g.metricsStart = time.perf_counter()
+
+        @server.after_request
+        def endRequest(response):
+            if(flask.request.path in ("/metrics", "/profile") or not hasattr(flask.g, "metricsStart")):
+                return response
+            rule = flask.request.url_rule
+            route = "unmatched" if(rule is None) else rule.rule  # Not the path, /stream/<name> is one series
+            if(flask.request.is_json):
+                route = str((flask.request.get_json(silent=True) or {}).get("output", route))  # Dash callback outputs
+            route = self.routeLabel(route)
+            # Includes the JSON serialization of the figure, which Dash does after the callback returns
+            self.observe("request_seconds", time.perf_counter() - flask.g.metricsStart, route=route)
+            if(not response.is_streamed):
+                self.observe("response_bytes", response.calculate_content_length() or 0, sizeBuckets, route=route)
+            return response
+
+        @server.route("/metrics")
+        def metricsRoute():
+            return flask.Response(self.prometheus(), mimetype="text/plain; version=0.0.4")
+
+        if(profile):
+            @server.route("/profile", methods=["POST"])
+            def profileRoute():
+                return flask.Response(self.toggleProfile(), mimetype="text/plain")
+
+
+metrics = Metrics()
@@ -0,0 +1,72 @@
+###############################################################################
+# file    ParallelLoader.py
+###############################################################################
+# brief   Reads many source files in a process pool into one FrameArray
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from FrameArray import FrameArray, vehicleNames, internVehicles
+
+
+# Worker: frames of one file and the vehicle names their codes refer to (the
+# table is per process), or the error if the file could not be read
+def loadFile(reader, fileName):
+    try:
+        return reader(fileName), list(vehicleNames), None
+    except Exception as error:
+        return None, None, f"{type(error).__name__}: {error}"
+
+
+# Reads the files with reader (fileName -> FrameArray, a module level function)
+# in a process pool and merges them with a single concat, in file order.
+# Returns the frames, {fileName: error} of the files which failed, those do
+# not abort the others, and {fileName: frames} of the files read.
+def loadFiles(fileNames, reader, workers=None):
+    fileNames = list(fileNames)
+    workers = min(workers or os.cpu_count() or 1, len(fileNames))
+    if(workers > 1):
+        chunkSize = max(1, len(fileNames) // (4 * workers))  # Thousands of small files
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(loadFile, itertools.repeat(reader), fileNames, chunksize=chunkSize))
+    else:
+        results = [loadFile(reader, f) for f in fileNames]
+
+    parts = []
+    errors = {}
+    counts = {}
+    for fileName, (frames, names, error) in zip(fileNames, results):
+        if(error is not None):
+            errors[fileName] = error
+            continue
+        frames.vehicle = internVehicles(names)[frames.vehicle]
+        parts.append(frames)
+        counts[fileName] = len(frames)
+    return FrameArray.concat(parts), errors, counts
@@ -0,0 +1,220 @@
+###############################################################################
+# file    PushStream.py
+###############################################################################
+# brief   Server-Sent Events push of new live samples to all browser sessions
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import queue
+import threading
+import collections
+from plotly.io.json import to_json_plotly
+from LiveFigure import liveFigure, liveUpdate, liveSnapshot
+from Metrics import metrics
+
+
+# Live data of one vehicle as sent to its viewers: the liveUpdate() state all
+# of them share, the numbered messages since the last snapshots and the queues
+# of the connected clients
+class Feed:
+    def __init__(self, state, length, historyLength):
+        self.state = state  # None until the vehicle has data
+        self.length = length  # [s] of the window shown, None for all
+        self.sequence = 0
+        self.history = collections.deque(maxlen=historyLength)  # (sequence, message)
+        self.clients = set()
+        self.idleSince = time.monotonic()  # Without clients since, None while connected
+
+
+# One ingest loop for all browser sessions. readFrames(timeout) waits up to
+# timeout seconds for new data and returns a list of FrameArray, they are added
+# to the FleetWindow and the new points of every watched vehicle are encoded
+# once and queued to each of its clients. The server cost therefore follows the
+# data rate, not the number of viewers times a polling rate. A feed without
+# clients for idleTime seconds is dropped, reconnects within it continue.
+class PushStream:
+    def __init__(self, fleet, readFrames, timeout=0.25, historyLength=64, queueLength=256, idleTime=60):
+        self.fleet = fleet
+        self.readFrames = readFrames
+        self.timeout = timeout
+        self.historyLength = historyLength
+        self.queueLength = queueLength
+        self.idleTime = idleTime
+        self.lock = threading.Lock()  # Guards the fleet and the feeds
+        self.feeds = {}  # (vehicle name, length) -> Feed of the vehicles being watched
+        self.thread = None
+        self.running = False
+        self.startLock = threading.Lock()
+
+    # Starts the ingest thread, once
+    def start(self):
+        with self.startLock:
+            if(self.thread is not None):
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if(self.thread is not None):
+            self.thread.join()
+            self.thread = None
+
+    # A broken file or datagram is logged and skipped, the loop keeps running
+    def run(self):
+        while(self.running):
+            try:
+                self.ingest()
+            except Exception as error:
+                print(f"Ingest failed: {type(error).__name__}: {error}")
+                metrics.count("ingest_errors_total")
+                time.sleep(self.timeout)  # Not spinning on a lasting error
+
+    def ingest(self):
+        frames = self.readFrames(self.timeout)
+        if(len(frames) == 0):
+            return
+        with self.lock:
+            with metrics.stage("window"):
+                for frameArray in frames:
+                    self.fleet.add(frameArray)
+            self.broadcast()
+            metrics.gauge("window_frames", sum(len(window) for window in self.fleet.windows.values()))
+            metrics.gauge("vehicles", len(self.fleet))
+
+    def broadcast(self):
+        now = time.monotonic()
+        for key in [k for k, f in self.feeds.items() if(f.idleSince is not None and now - f.idleSince > self.idleTime)]:
+            del self.feeds[key]
+        metrics.gauge("push_feeds", len(self.feeds))
+        for (name, length), feed in self.feeds.items():
+            if(name not in self.fleet):
+                continue
+            with metrics.stage("figure"):
+                extendData, feed.state = liveUpdate(self.fleet[name], feed.state, length)
+            if(extendData is None):
+                continue
+            with metrics.stage("serialize"):
+                feed.sequence += 1
+                message = f"id: {feed.sequence}\ndata: {to_json_plotly(extendData)}\n\n"
+            feed.history.append((feed.sequence, message))
+            for client in list(feed.clients):
+                try:
+                    client.put_nowait(message)
+                except queue.Full:
+                    self.disconnect(feed, client)  # Too slow, the browser reconnects
+                    metrics.count("push_dropped_clients_total")
+            metrics.count("push_messages_total", len(feed.clients))
+
+    # Figure with the window of a vehicle (the last length seconds of it) and
+    # the sequence number its stream continues from. Empty while the vehicle has
+    # no data yet, the stream then sends its first samples. None without a
+    # vehicle.
+    def snapshot(self, name, length=None):
+        if(name is None):
+            return None, None
+        with self.lock:
+            feed = self.feeds.get((name, length))
+            if(name not in self.fleet):
+                if(feed is None):
+                    self.feeds[(name, length)] = feed = Feed(None, length, self.historyLength)
+                return liveFigure(), feed.sequence
+            if(feed is None):
+                figure, state = liveSnapshot(self.fleet[name], length=length)
+                self.feeds[(name, length)] = feed = Feed(state, length, self.historyLength)
+            else:  # The stream filled its state since the vehicle got data
+                figure, _ = liveSnapshot(self.fleet[name], feed.state["offset"], length)
+            return figure, feed.sequence
+
+    # Queue of the messages after sequence number since
+    def subscribe(self, name, length, since):
+        client = queue.Queue(self.queueLength)
+        with self.lock:
+            feed = self.feeds.get((name, length))
+            if(feed is None):
+                return None
+            for sequence, message in feed.history:
+                if(sequence > since):
+                    client.put_nowait(message)
+            feed.clients.add(client)
+            feed.idleSince = None
+            metrics.gauge("push_clients", sum(len(f.clients) for f in self.feeds.values()))
+        return client
+
+    def unsubscribe(self, name, length, client):
+        with self.lock:
+            feed = self.feeds.get((name, length))
+            if(feed is not None):
+                self.disconnect(feed, client)
+            metrics.gauge("push_clients", sum(len(f.clients) for f in self.feeds.values()))
+
+    def disconnect(self, feed, client):
+        feed.clients.discard(client)
+        if(len(feed.clients) == 0 and feed.idleSince is None):
+            feed.idleSince = time.monotonic()
+
+    # Adds /stream/<vehicle>?length=<seconds>&since=<sequence> (text/event-stream)
+    # to the Flask server. EventSource reconnects by itself and sends the last
+    # id it got. The ingest thread starts with the first request, in every
+    # server process (also under gunicorn, where __main__ never runs).
+    def register(self, server):
+        import flask
+
+        @server.before_request
+        def startStream():
+            if(self.thread is None):
+                self.start()
+
+        @server.route("/stream/<name>")
+        def streamRoute(name):
+            since = flask.request.headers.get("Last-Event-ID", flask.request.args.get("since", "0"))
+            length = flask.request.args.get("length", "")
+            length = int(length) if(length.isdigit()) else None
+            client = self.subscribe(name, length, int(since) if(since.isdigit()) else 0)
+            if(client is None):
+                return flask.Response("unknown vehicle\n", status=404, mimetype="text/plain")
+
+            def events():
+                try:
+                    yield "retry: 1000\n\n"
+                    while(True):
+                        try:
+                            yield client.get(timeout=15)
+                        except queue.Empty:
+                            with self.lock:
+                                feed = self.feeds.get((name, length))
+                                if(feed is None or client not in feed.clients):
+                                    return
+                            yield ": keep-alive\n\n"
+                finally:
+                    self.unsubscribe(name, length, client)
+
+            return flask.Response(events(), mimetype="text/event-stream",
+                                  headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
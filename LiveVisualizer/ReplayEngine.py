@@ -0,0 +1,158 @@
+###############################################################################
+# file    ReplayEngine.py
+###############################################################################
+# brief   Timestamp ordered replay of recorded files with speed and seeking
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import pathlib
+import threading
+import numpy as np
+import pandas as pd
+from FrameArray import FrameArray
+from FrameDecoder import toNanoseconds
+from DataManifest import DataManifest
+from Metrics import metrics
+
+
+# Replays the network-tool files of a directory in timestamp order across all
+# files, speed times as fast as recorded. Used like the sources of Sources.py:
+# read() returns the frames which became due since the last call. The frames
+# are moved to the wall clock (start of the replay = now), so the live window
+# and the trip statistics see them like real traffic; seek() jumps to any
+# moment of the recording and keeps the moved times increasing.
+# The blocks of the DataManifest (about 256 KB with their time range) are the
+# unit of reading: they are sorted by their first time, opened when the replay
+# reaches it and dropped once replayed.
+class ReplayEngine:
+    def __init__(self, path, pgns=None, speed=1, start=None, suffix=".csv", manifestPath=None):
+        self.path = pathlib.Path(path)
+        self.pgns = pgns
+        self.lock = threading.Lock()
+        self.manifest = DataManifest(self.path, manifestPath, suffix).update()  # Time ranges without reading the files
+        self.files = self.manifest.overlapping()
+        rows = []  # first, last, file index, offset, length
+        for index, name in enumerate(self.files):
+            entry = self.manifest.files[name]
+            ends = [offset for offset, _, _ in entry["blocks"][1:]] + [entry["size"]]
+            rows += [(first, last, index, offset, end - offset) for (offset, first, last), end in zip(entry["blocks"], ends)]
+        blocks = np.array(rows, dtype=np.int64).reshape(-1, 5)
+        self.blocks = blocks[np.argsort(blocks[:, 0], kind="stable")]
+        self.reach = np.maximum.accumulate(self.blocks[:, 1])  # Latest time of the blocks up to each one
+        self.speed = speed
+        self.shift = 0  # Recorded time -> wall clock time [ns]
+        self.emitted = 0  # Newest wall clock time returned so far
+        self.seek(pd.Timestamp(self.begin) if(start is None) else start)
+
+    @property
+    def begin(self):
+        return int(self.blocks[0, 0]) if(len(self.blocks) > 0) else 0
+
+    @property
+    def end(self):
+        return int(self.reach[-1]) if(len(self.blocks) > 0) else 0
+
+    # Recorded time currently replayed [ns]
+    def replayTime(self):
+        started, position = self.clock
+        return position + int((time.monotonic() - started) * self.speed * 1e9)
+
+    def setSpeed(self, speed):
+        with self.lock:
+            self.clock = (time.monotonic(), self.replayTime())
+            self.speed = speed
+
+    # Continues at recorded time position (unix seconds, datetime or string),
+    # limited to the recording. Two binary searches find the blocks around the
+    # position, only the ones which contain it are read.
+    def seek(self, position):
+        position = min(max(toNanoseconds(position), self.begin), self.end)
+        with self.lock:
+            self.position = position  # Everything before was returned
+            self.clock = (time.monotonic(), position)
+            self.shift = max(time.time_ns(), self.emitted + 1) - position
+            self.active = {}  # block index -> [frames, index of the next frame]
+            self.next = int(np.searchsorted(self.blocks[:, 0], position, side="left"))  # First block not opened yet
+            for index in range(int(np.searchsorted(self.reach, position, side="left")), self.next):
+                if(self.blocks[index, 1] >= position):
+                    self.open(index)
+
+    def open(self, index):
+        _, _, file, offset, length = map(int, self.blocks[index])
+        if(offset == 0):
+            print(f"Replaying file: {self.files[file]}")
+        frames = self.manifest.readRange(self.files[file], offset, length, self.pgns)
+        frames = frames[np.argsort(frames.time, kind="stable")]
+        next = int(np.searchsorted(frames.time, self.position))
+        if(next < len(frames)):  # None of the PGNs left otherwise
+            self.active[index] = [frames, next]
+
+    # Recorded time of the next frame, None at the end of the recording
+    def nextTime(self):
+        times = [int(frames.time[next]) for frames, next in self.active.values()]
+        if(self.next < len(self.blocks)):
+            times.append(int(self.blocks[self.next, 0]))
+        return min(times) if(len(times) > 0) else None
+
+    # Frames up to the current replay time as a list of FrameArray, waits up to
+    # timeout seconds for the next one
+    def read(self, timeout=0):
+        with self.lock:
+            due = self.nextTime()
+            wait = None if(due is None) else (due - self.replayTime()) / 1e9 / self.speed
+        if(wait is None or wait > 0):
+            time.sleep(timeout if(wait is None) else min(timeout, wait))
+
+        with self.lock:
+            target = self.replayTime()
+            while(self.next < len(self.blocks) and self.blocks[self.next, 0] < target):
+                self.open(self.next)
+                self.next += 1
+            parts = []
+            for index, entry in list(self.active.items()):
+                frames, next = entry
+                end = int(np.searchsorted(frames.time, target))
+                if(end > next):
+                    parts.append(frames[next:end])
+                    entry[1] = end
+                if(end == len(frames)):
+                    del self.active[index]  # Done with the block, its memory is freed
+            self.position = max(self.position, target)
+            frames = FrameArray.concat(parts)
+            if(len(parts) > 1):
+                frames = frames[np.argsort(frames.time, kind="stable")]  # Merges the sorted runs of the blocks
+            if(len(frames) > 0):
+                frames.time = frames.time + self.shift
+                self.emitted = int(frames.time[-1])
+            metrics.gauge("replay_lag_seconds", max(0, self.replayTime() - target) / 1e9 / self.speed)
+        metrics.count("frames_ingested_total", len(frames))
+        return [frames] if(len(frames) > 0) else []
+
+    def close(self):
+        pass
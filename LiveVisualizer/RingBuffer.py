@@ -0,0 +1,212 @@
+###############################################################################
+# file    RingBuffer.py
+###############################################################################
+# brief   Fixed-capacity circular buffers for the live display window
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import math
+import numpy as np
+import pandas as pd
+from FrameArray import vehicleNames, vehicleCodes
+from FrameDecoder import toNanoseconds
+from SignalDatabase import signalDatabase, decodeSignals, signalLabels
+
+
+# Circular buffer of named columns. Every row is written twice (at i and at
+# i + capacity), so the content is always one contiguous slice and reading it
+# never copies. The storage doubles on demand up to maxCapacity (default: no
+# growth), after that the oldest rows are overwritten.
+class RingBuffer:
+    def __init__(self, capacity, dtypes, maxCapacity=None):
+        self.capacity = capacity
+        self.maxCapacity = capacity if(maxCapacity is None) else maxCapacity
+        self.columns = {name: np.zeros(2 * capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    # Zero-copy view of a column, oldest row first
+    def __getitem__(self, name):
+        return self.columns[name][self.head:self.head + self.count]
+
+    def grow(self, capacity):
+        columns = {name: np.zeros(2 * capacity, dtype=column.dtype) for name, column in self.columns.items()}
+        for name, column in columns.items():
+            column[:self.count] = self[name]
+            column[capacity:capacity + self.count] = self[name]
+        self.columns = columns
+        self.capacity = capacity
+        self.head = 0
+
+    # Appends rows in place, the oldest rows are overwritten when full
+    def extend(self, **values):
+        length = len(next(iter(values.values())))
+        if(self.count + length > self.capacity and self.capacity < self.maxCapacity):
+            self.grow(min(self.maxCapacity, max(2 * self.capacity, self.count + length)))
+        skip = max(0, length - self.capacity)
+        position = (self.head + self.count + np.arange(skip, length)) % self.capacity
+        for name, column in self.columns.items():
+            column[position] = values[name][skip:]
+            column[position + self.capacity] = values[name][skip:]
+        self.count += length
+        if(self.count > self.capacity):
+            self.head = (self.head + self.count - self.capacity) % self.capacity
+            self.count = self.capacity
+
+    # Drops the oldest rows by advancing the head pointer
+    def drop(self, count):
+        count = min(count, self.count)
+        self.head = (self.head + count) % self.capacity
+        self.count -= count
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+
+# Decoded signals of the last maxDisplayTime seconds, one ring buffer per PGN.
+# The rings start small and grow up to frameRate frames per second and PGN.
+class LiveWindow:
+    def __init__(self, maxDisplayTime, pgns=None, frameRate=100):
+        self.maxDisplayTime = maxDisplayTime
+        self.capacity = math.ceil(maxDisplayTime * frameRate)
+        self.pgns = None if(pgns is None) else set(pgns)
+        self.rings = {}
+        self.latest = None
+
+    def __len__(self):
+        return sum(len(r) for r in self.rings.values())
+
+    def ring(self, pgn):
+        if(pgn not in self.rings):
+            dtypes = {"time": np.int64, "vehicle": np.uint16}
+            for name, values in decodeSignals(pgn, np.zeros(1, dtype=np.uint64), labels=False).items():
+                dtypes[name] = values.dtype
+            self.rings[pgn] = RingBuffer(min(64, self.capacity), dtypes, self.capacity)
+        return self.rings[pgn]
+
+    # Decodes the new frames (FrameArray) into their rings and moves the window
+    def add(self, frames):
+        if(len(frames) == 0):
+            return
+        order = np.lexsort((frames.time, frames.pgn))
+        self.addSorted(frames.time[order], frames.pgn[order], frames.vehicle[order], frames.payload[order])
+
+    # Same as add() for frame columns already sorted by PGN and time
+    def addSorted(self, time, pgn, vehicle, payload):
+        bounds = np.flatnonzero(np.diff(pgn)) + 1
+        for begin, end in zip(np.r_[0, bounds], np.r_[bounds, len(pgn)]):
+            group = int(pgn[begin])
+            if(self.pgns is not None and group not in self.pgns):
+                continue
+            self.ring(group).extend(time=time[begin:end], vehicle=vehicle[begin:end],
+                                    **decodeSignals(group, payload[begin:end], labels=False))
+        latest = int(time.max())
+        self.latest = latest if(self.latest is None) else max(self.latest, latest)
+        self.trim(self.latest - toNanoseconds(self.maxDisplayTime))
+
+    # Drops everything up to and including the given time [ns]
+    def trim(self, start):
+        for ring in self.rings.values():
+            ring.drop(int(np.searchsorted(ring["time"], start, side="right")))
+
+    @property
+    def first(self):
+        times = [r["time"][0] for r in self.rings.values() if(len(r) > 0)]
+        return pd.Timestamp(min(times)) if(len(times) > 0) else None
+
+    @property
+    def last(self):
+        return None if(self.latest is None) else pd.Timestamp(self.latest)
+
+    # Frames of one PGN in the window with their decoded signals, like
+    # FrameArray.signalGroup()
+    def signalGroup(self, pgn):
+        ring = self.rings.get(pgn)
+        if(ring is None):
+            return pd.DataFrame({c: [] for c in ["date", "name"] + [s["name"] for s in signalDatabase.get(pgn, [])]})
+        data = {"date": ring["time"].view("datetime64[ns]"),
+                "name": pd.Categorical.from_codes(ring["vehicle"].astype(np.int64), list(vehicleNames))}
+        for name in ring.columns:
+            if(name not in ("time", "vehicle")):
+                labels = signalLabels(pgn, name)
+                data[name] = ring[name] if(labels is None) else labels[ring[name]]
+        return pd.DataFrame(data, copy=True)
+
+
+# Fleet mode: one LiveWindow per vehicle. Incoming frames are split by vehicle
+# once, selecting a vehicle is a dict lookup by its name.
+class FleetWindow:
+    def __init__(self, maxDisplayTime, pgns=None, frameRate=100):
+        self.maxDisplayTime = maxDisplayTime
+        self.pgns = pgns
+        self.frameRate = frameRate
+        self.windows = {}  # vehicle code -> LiveWindow
+        self.version = 0  # Counts the updates, keys cached figures
+
+    def __len__(self):
+        return len(self.windows)
+
+    def __contains__(self, name):
+        return vehicleCodes.get(name) in self.windows
+
+    def __getitem__(self, name):
+        return self.windows[vehicleCodes[name]]
+
+    @property
+    def vehicles(self):
+        return sorted(vehicleNames[code] for code in self.windows)
+
+    def add(self, frames):
+        if(len(frames) == 0):
+            return
+        order = np.lexsort((frames.time, frames.pgn, frames.vehicle))
+        time, pgn, vehicle, payload = frames.time[order], frames.pgn[order], frames.vehicle[order], frames.payload[order]
+        bounds = np.flatnonzero(np.diff(vehicle)) + 1
+        for begin, end in zip(np.r_[0, bounds], np.r_[bounds, len(vehicle)]):
+            code = int(vehicle[begin])
+            if(code not in self.windows):
+                self.windows[code] = LiveWindow(self.maxDisplayTime, self.pgns, self.frameRate)
+            self.windows[code].addSorted(time[begin:end], pgn[begin:end], vehicle[begin:end], payload[begin:end])
+        self.version += 1
+
+    # One row per vehicle: name, time of its latest frame and the latest value
+    # of each (pgn, signal)
+    def overview(self, signals):
+        rows = []
+        for name in self.vehicles:
+            window = self[name]
+            row = {"vehicle": name, "last": window.last}
+            for pgn, signal in signals:
+                ring = window.rings.get(pgn)
+                row[signal] = ring[signal][-1] if(ring is not None and len(ring) > 0) else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows, columns=["vehicle", "last"] + [signal for _, signal in signals])
@@ -0,0 +1,140 @@
+###############################################################################
+# file    Rollups.py
+###############################################################################
+# brief   Multi-resolution aggregates (min, max, mean, last, count) of signals
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+from SignalDatabase import signalDatabase
+from Downsampling import minMaxIndex
+
+rollupLevels = [1, 10, 60, 900]  # [s] resolutions, each one a multiple of the previous
+rollupStats = ["count", "min", "max", "sum", "last"]
+
+# Rollup rows are dicts of equally long columns: "time" (int64 ns, bucket
+# start), "vehicle" (uint16) and "<signal>.<stat>" for every signal. The mean
+# is stored as sum and count so finer rows can be merged into coarser ones.
+
+
+# Numeric signals of a PGN which get rollups (states are not aggregated)
+def rollupSignals(pgn):
+    return [s["name"] for s in signalDatabase.get(pgn, []) if("enum" not in s)]
+
+
+# Raw samples as rollup rows of zero width, NaN (not available) is not counted
+def sampleRows(time, vehicle, signals):
+    rows = {"time": np.asarray(time, dtype=np.int64), "vehicle": np.asarray(vehicle, dtype=np.uint16)}
+    for name, values in signals.items():
+        values = np.asarray(values, dtype=np.float64)
+        valid = np.isfinite(values)
+        rows[f"{name}.count"] = valid.astype(np.int64)
+        rows[f"{name}.min"] = values
+        rows[f"{name}.max"] = values
+        rows[f"{name}.sum"] = np.where(valid, values, 0.0)
+        rows[f"{name}.last"] = values
+    return rows
+
+
+def rowSignals(rows):
+    return [c[:-len(".count")] for c in rows if(c.endswith(".count"))]
+
+
+# Merges rows (sorted by time) into buckets of resolution seconds, per vehicle
+# or across all vehicles
+def reduceRollup(rows, resolution, byVehicle=True):
+    if(len(rows["time"]) == 0):
+        return {c: v[:0] for c, v in rows.items()}
+    step = resolution * 10**9
+    bucket = rows["time"] // step * step
+    vehicle = rows["vehicle"] if(byVehicle) else np.zeros(len(bucket), dtype=np.uint16)
+    order = np.lexsort((bucket, vehicle))
+    bucket, vehicle = bucket[order], vehicle[order]
+    starts = np.flatnonzero(np.r_[True, (bucket[1:] != bucket[:-1]) | (vehicle[1:] != vehicle[:-1])])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+
+    reduced = {"time": bucket[starts], "vehicle": vehicle[starts]}
+    for name in rowSignals(rows):
+        reduced[f"{name}.count"] = np.add.reduceat(rows[f"{name}.count"][order], starts)
+        reduced[f"{name}.min"] = np.fmin.reduceat(rows[f"{name}.min"][order], starts)
+        reduced[f"{name}.max"] = np.fmax.reduceat(rows[f"{name}.max"][order], starts)
+        reduced[f"{name}.sum"] = np.add.reduceat(rows[f"{name}.sum"][order], starts)
+        reduced[f"{name}.last"] = rows[f"{name}.last"][order][ends]
+    return reduced
+
+
+# All rollup levels of a block of samples sorted by time: {resolution: rows}
+def buildRollups(time, vehicle, signals):
+    rows = sampleRows(time, vehicle, signals)
+    rollups = {}
+    for resolution in rollupLevels:
+        rows = reduceRollup(rows, resolution)
+        order = np.argsort(rows["time"], kind="stable")
+        rows = {c: v[order] for c, v in rows.items()}
+        rollups[resolution] = rows
+    return rollups
+
+
+# Coarsest resolution which still has at least points / 2 buckets in the time
+# range (nanoseconds), every bucket is drawn as two points and rollupTrace()
+# reduces the rest to points. None if the raw frames are needed.
+def rollupLevel(start, end, points):
+    span = (end - start) / 1e9
+    levels = [r for r in rollupLevels if(span / r >= points // 2)]
+    return max(levels) if(len(levels) > 0) else None
+
+
+# Rollup rows of one signal as DataFrame with date, count, min, max, mean, last
+def rollupFrame(rows, signal):
+    count = rows[f"{signal}.count"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = rows[f"{signal}.sum"] / count
+    return pd.DataFrame({"date": rows["time"].astype("datetime64[ns]"),
+                         "count": count,
+                         "min": rows[f"{signal}.min"],
+                         "max": rows[f"{signal}.max"],
+                         "mean": np.where(count > 0, mean, np.nan),
+                         "last": rows[f"{signal}.last"]})
+
+
+# Plot points of a rollup frame: minimum at the bucket start and maximum in its
+# middle, keeps the peaks a line through the means would hide. Reduced to the
+# min/max envelope of at most points when given.
+def rollupTrace(frame, resolution, points=None):
+    date = frame["date"].to_numpy()
+    x = np.empty(2 * len(frame), dtype=date.dtype)
+    y = np.empty(2 * len(frame))
+    x[0::2] = date
+    x[1::2] = date + np.timedelta64(resolution * 10**9 // 2, "ns")
+    y[0::2] = frame["min"].to_numpy()
+    y[1::2] = frame["max"].to_numpy()
+    if(points is not None and len(x) > points):
+        index = minMaxIndex(x.astype("datetime64[ns]").view(np.int64), y, max(1, points // 4))
+        x, y = x[index], y[index]
+    return x, y
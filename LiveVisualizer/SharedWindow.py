@@ -0,0 +1,272 @@
+###############################################################################
+# file    SharedWindow.py
+###############################################################################
+# brief   Live window in shared memory, one writer and lock-free readers
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import os
+import mmap
+import time
+import numpy as np
+import pandas as pd
+from RingBuffer import RingBuffer
+from Metrics import metrics
+
+magic = 0x464D5357  # "FMSW"
+version = 1
+headerFields = ["magic", "version", "sequence", "vehicleCount", "maxVehicles", "capacity", "blobSize", "blobLength"]
+nameLength = 32
+
+
+# RingBuffer whose columns and head/count pointers live in the shared mapping.
+# It never grows, the capacity is fixed when the mapping is created.
+class SharedRing(RingBuffer):
+    def __init__(self, columns, pointers):
+        self.columns = columns
+        self.pointers = pointers  # int64[2]: head, count
+        self.capacity = len(next(iter(columns.values()))) // 2
+        self.maxCapacity = self.capacity
+
+    @property
+    def head(self):
+        return int(self.pointers[0])
+
+    @head.setter
+    def head(self, value):
+        self.pointers[0] = value
+
+    @property
+    def count(self):
+        return int(self.pointers[1])
+
+    @count.setter
+    def count(self, value):
+        self.pointers[1] = value
+
+
+# Copied columns of one PGN, read like a ring by liveUpdate()
+class Columns:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns["time"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+
+# Consistent copy of one vehicle, read like a LiveWindow
+class SharedVehicle:
+    def __init__(self, rings, latest):
+        self.rings = rings
+        self.latest = latest
+
+    @property
+    def last(self):
+        return None if(self.latest is None) else pd.Timestamp(self.latest)
+
+
+# The decoded live window of all vehicles in a memory-mapped file (use
+# /dev/shm for RAM). One ingest process mirrors its FleetWindow into it with
+# update(), any number of server processes read it without locking: a sequence
+# counter is odd while the writer changes the mapping and readers retry when it
+# changed while they copied (seqlock). A small blob carries other shared
+# results, e.g. the trip statistics as JSON.
+# Every vehicle slot holds capacity samples (twice, see RingBuffer) of every
+# column, 2 * 8 * capacity bytes each: about 0.8 MB per vehicle for the live
+# traces at the default capacity, 390 MB for 512 vehicles. The file is
+# sparse, slots which were never used take no memory. Vehicles beyond
+# maxVehicles or with names longer than nameLength bytes are not shared, they
+# are logged and counted (shared_vehicles_dropped_total).
+class SharedWindow:
+    def __init__(self, path, signals, maxVehicles=512, capacity=6000, blobSize=256 * 1024, create=False):
+        self.path = path
+        self.layout = {}  # pgn -> [signals], same order in every process
+        for pgn, signal in signals:
+            self.layout.setdefault(pgn, []).append(signal)
+        if(create):
+            size = self.mappingSize(maxVehicles, capacity, blobSize)
+            with open(path, "wb") as file:
+                file.truncate(size)
+        with open(path, "r+b" if(create) else "rb") as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if(create) else mmap.ACCESS_READ)
+        self.header = np.frombuffer(self.mapping, dtype=np.int64, count=len(headerFields))
+        if(create):
+            self.header[:] = [magic, version, 0, 0, maxVehicles, capacity, blobSize, 0]
+        elif(self.header[0] != magic or self.header[1] != version):
+            raise ValueError(f"{path} is not a shared window (version {version})")
+        self.writable = create
+        self.mapArrays(int(self.header[4]), int(self.header[5]), int(self.header[6]))
+        self.slots = {}  # name -> slot, writer only
+        self.unshared = set()  # Vehicles which got no slot, writer only
+
+    @property
+    def size(self):
+        return len(self.mapping)
+
+    def mappingSize(self, maxVehicles, capacity, blobSize):
+        columns = sum(1 + len(signals) for signals in self.layout.values())
+        ring = 2 * 8 * len(self.layout) + 2 * capacity * 8 * columns
+        return 8 * len(headerFields) + maxVehicles * (nameLength + 8 + ring) + blobSize
+
+    def mapArrays(self, maxVehicles, capacity, blobSize):
+        offset = 8 * len(headerFields)
+
+        def take(dtype, shape):
+            nonlocal offset
+            array = np.ndarray(shape, dtype=dtype, buffer=self.mapping, offset=offset)
+            offset += array.nbytes
+            return array
+
+        self.names = take(f"S{nameLength}", (maxVehicles,))
+        self.latest = take(np.int64, (maxVehicles,))
+        self.rings = []  # slot -> {pgn: SharedRing}
+        for _ in range(maxVehicles):
+            rings = {}
+            for pgn, signals in self.layout.items():
+                pointers = take(np.int64, (2,))
+                columns = {"time": take(np.int64, (2 * capacity,))}
+                columns.update({signal: take(np.float64, (2 * capacity,)) for signal in signals})
+                rings[pgn] = SharedRing(columns, pointers)
+            self.rings.append(rings)
+        self.blobData = take(np.uint8, (blobSize,))
+
+    # Writer: copies what is new in the FleetWindow and drops what it dropped
+    def update(self, fleet, blob=None):
+        self.header[2] += 1  # Odd: readers retry
+        try:
+            for name in fleet.vehicles:
+                slot = self.slot(name)
+                if(slot is None):
+                    continue
+                window = fleet[name]
+                for pgn, signals in self.layout.items():
+                    ring, shared = window.rings.get(pgn), self.rings[slot][pgn]
+                    if(ring is None or len(ring) == 0):
+                        shared.clear()
+                        continue
+                    times = ring["time"]
+                    first = 0 if(len(shared) == 0) else int(np.searchsorted(times, shared["time"][-1], side="right"))
+                    if(first < len(times)):
+                        shared.extend(time=times[first:], **{s: ring[s][first:].astype(np.float64) for s in signals})
+                    shared.drop(int(np.searchsorted(shared["time"], times[0], side="left")))
+                self.latest[slot] = -1 if(window.latest is None) else window.latest
+            if(blob is not None and len(blob) > len(self.blobData)):  # Keeps the last one that fit
+                metrics.count("shared_blob_oversize_total")
+                print(f"Shared blob of {len(blob)} bytes does not fit into {len(self.blobData)} bytes, not shared")
+            elif(blob is not None):
+                self.blobData[:len(blob)] = np.frombuffer(blob, dtype=np.uint8)
+                self.header[7] = len(blob)
+        finally:
+            self.header[2] += 1
+
+    # Slot of a vehicle, None if it is not shared: the window is full or the
+    # name is longer than nameLength bytes (UTF-8), a cut name could split a
+    # character or match another vehicle
+    def slot(self, name):
+        if(name not in self.slots):
+            count = int(self.header[3])
+            encoded = name.encode()
+            if(count == len(self.names) or len(encoded) > nameLength):
+                if(name not in self.unshared):
+                    self.unshared.add(name)
+                    metrics.count("shared_vehicles_dropped_total")
+                    reason = f"is full ({count} vehicles)" if(len(encoded) <= nameLength) else f"takes names up to {nameLength} bytes"
+                    print(f"Shared window {reason}, {name} is not shared")
+                return None
+            self.names[count] = encoded
+            self.slots[name] = count
+            self.header[3] = count + 1
+        return self.slots[name]
+
+    # Reader: runs copy() until no write overlapped it. Raises TimeoutError
+    # after timeout seconds, e.g. when the writer died during an update.
+    def consistent(self, copy, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while(time.monotonic() < deadline):
+            sequence = int(self.header[2])
+            if(sequence % 2 == 0):
+                result = copy()
+                if(int(self.header[2]) == sequence):
+                    return result
+            time.sleep(0.0001)
+        raise TimeoutError(f"{self.path}: no consistent state within {timeout} s, is the ingest process running?")
+
+    def vehicleSlots(self):
+        names = self.names[:int(self.header[3])]
+        return {name.decode(errors="replace"): slot for slot, name in enumerate(names)}
+
+    @property
+    def vehicles(self):
+        return sorted(self.consistent(self.vehicleSlots))
+
+    # Counts the updates of the writer, keys cached figures
+    @property
+    def version(self):
+        return int(self.header[2]) // 2
+
+    def __len__(self):
+        return int(self.header[3])
+
+    def __contains__(self, name):
+        return name in self.consistent(self.vehicleSlots)
+
+    def __getitem__(self, name):
+        def copy():
+            slot = self.vehicleSlots()[name]
+            rings = {pgn: Columns({column: ring[column].copy() for column in ring.columns})
+                     for pgn, ring in self.rings[slot].items()}
+            latest = int(self.latest[slot])
+            return SharedVehicle(rings, None if(latest < 0) else latest)
+        return self.consistent(copy)
+
+    # Same as FleetWindow.overview()
+    def overview(self, signals):
+        def copy():
+            rows = []
+            for name, slot in sorted(self.vehicleSlots().items()):
+                latest = int(self.latest[slot])
+                row = {"vehicle": name, "last": None if(latest < 0) else pd.Timestamp(latest)}
+                for pgn, signal in signals:
+                    ring = self.rings[slot].get(pgn)
+                    row[signal] = ring[signal][-1] if(ring is not None and len(ring) > 0 and signal in ring.columns) else np.nan
+                rows.append(row)
+            return rows
+        return pd.DataFrame(self.consistent(copy), columns=["vehicle", "last"] + [signal for _, signal in signals])
+
+    def blob(self):
+        return self.consistent(lambda: self.blobData[:int(self.header[7])].tobytes())
+
+    def close(self):
+        self.header = self.names = self.latest = self.rings = self.blobData = None
+        self.mapping.close()
+
+    def unlink(self):
+        os.unlink(self.path)
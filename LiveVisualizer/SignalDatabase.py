@@ -0,0 +1,285 @@
+###############################################################################
+# file    SignalDatabase.py
+###############################################################################
+# brief   J1939/FMS signal database and compiled vectorized signal decoders
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+
+pgnNameTable = {
+    'FEE9': "Fuel Consumption: LFC",
+    'FEFC': "Dash Display 1: DD1",
+    'F004': "Electronic Engine Controller #1: EEC1",
+    'FEE5': "Engine Hours, Revolutions: HOURS",
+    'FEEC': "Vehicle Identification: VI",
+    'FDD1': "MS-standard Interface Identity / Capabilities: FMS",
+    'FEC1': "High Resolution Vehicle Distance: VDHR",
+    'FE6C': "Tachograph : TCO1",
+    'FEEE': "Engine Temperature 1: ET1",
+    'FEF5': "Ambient Conditions: AMB",
+    'FE6B': "Driver's Identification: DI",
+    'FEF2': "Fuel Economy: LFE",
+    'FEAE': "Air Supply Pressure : AIR1",
+    'FD09': "High Resolution Fuel Consumption (Liquid): HRLFC",
+    'FE56': "Aftertreatment 1 Diesel Exhaust Fluid Tank 1 Information: AT1T1I",
+    'FD7D': "FMS Tell Tale Status: FMS1",
+    'F001': "Electronic Brake Controller 1: EBC1",
+    'FDC2': "Electronic Engine Controller 14: EEC14",
+    'FEAF': "Fuel Consumption (Gaseous): GFC",
+    'F000': "Electronic Retarder Controller 1: ERC1",
+    'FEF1': "Cruise Control/Vehicle Speed 1: CCVS1",
+    'F003': "Electronic Engine Controller #2: EEC2",
+    'FEEA': "Vehicle Weight: VW",
+    'FEC0': "Service Information: SERV",
+    'FDA4': "PTO Drive Engagement: PTODE",
+    'FE70': "Combination Vehicle Weight: CVW",
+    'FE4E': "Door Control 1: DC1",
+    'FDA5': "Door Control 2: DC2",
+    'FEE6': "Time / Date : TD",
+    'FED5': "Alternator Speed : AS",
+    'F005': "Electronic Transmission Controller 2 : ETC2",
+    'FE58': "Air Suspension Control 4 : ASC4",
+    'FCB7': "Vehicle Electrical Power #4 : VEP4",
+    'F009': "Vehicle Dynamic Stability Control 2 : VDC2",
+}
+
+doorStatus = {0x00: "closed", 0x01: "open", 0x02: "error", 0x03: "not available"}
+alternatorStatus = {0x00: "not charging", 0x01: "charging", 0x02: "error", 0x03: "not available"}
+cruiseControlStatus = {0x00: "off", 0x01: "hold", 0x02: "accelerate", 0x03: "decelerate", 0x04: "resume", 0x05: "set", 0x06: "accel. override", 0x07: "not available"}
+cruiseControlPtoStatus = {0x00: "off", 0x05: "set", 0x1F: "not available"}
+
+# Signal definitions per PGN. Bits are numbered from the least significant bit
+# of byte 0 ("startBit" is the lowest bit of the signal). Optional fields:
+#   byteOrder  "little" (J1939, default) or "big" (startBit then counts from the
+#              most significant bit of byte 0 and names the first signal bit)
+#   scale      physical = raw * scale + offset (default 1.0)
+#   offset     default 0.0
+#   enum       raw value -> state name, replaces the numeric value
+#   invalid    raw values >= invalid are error / not available and decode to
+#              NaN. Defaults to the J1939 range (0xFB.. for byte sized signals).
+signalDatabase = {
+    0xFE6C: [
+        {"name": "speed", "startBit": 48, "length": 16, "scale": 1 / 256.0, "unit": "km/h"},
+    ],
+    0xFD09: [
+        {"name": "fuelConsumption", "startBit": 32, "length": 32, "scale": 0.001, "unit": "l"},
+    ],
+    0xFEE9: [
+        {"name": "tripFuel", "startBit": 0, "length": 32, "scale": 0.5, "unit": "l"},
+        {"name": "fuelConsumption", "startBit": 32, "length": 32, "scale": 0.5, "unit": "l"},
+    ],
+    0xFEF2: [
+        {"name": "fuelRate", "startBit": 0, "length": 16, "scale": 0.05, "unit": "l/h"},
+        {"name": "fuelEconomy", "startBit": 16, "length": 16, "scale": 1 / 512.0, "unit": "km/l"},
+    ],
+    0xFDA5: [
+        {"name": "door1", "startBit": 2, "length": 2, "enum": doorStatus},
+        {"name": "door2", "startBit": 8, "length": 2, "enum": doorStatus},
+    ],
+    0xFE58: [
+        {"name": "suspension", "startBit": 0, "length": 64, "scale": 0.1, "unit": "kPa"},
+    ],
+    0xFEEE: [
+        {"name": "temperature", "startBit": 0, "length": 8, "offset": -40.0, "unit": "°C"},
+    ],
+    0xFE56: [
+        {"name": "diselExhaustFluid", "startBit": 0, "length": 8, "scale": 0.4, "unit": "%"},
+    ],
+    0xFEF5: [
+        {"name": "ambientAir", "startBit": 24, "length": 16, "scale": 0.03125, "offset": -273.0, "unit": "°C"},
+    ],
+    0xFED5: [
+        {"name": "alternatorSpeed", "startBit": 0, "length": 16, "scale": 1 / 8.0, "unit": "rpm"},
+        {"name": "alternator1", "startBit": 16, "length": 2, "enum": alternatorStatus},
+        {"name": "alternator2", "startBit": 18, "length": 2, "enum": alternatorStatus},
+        {"name": "alternator3", "startBit": 20, "length": 2, "enum": alternatorStatus},
+        {"name": "alternator4", "startBit": 22, "length": 2, "enum": alternatorStatus},
+    ],
+    0xFEC1: [
+        {"name": "vehicleDistance", "startBit": 0, "length": 32, "scale": 5.0, "unit": "m"},
+        {"name": "tripDistance", "startBit": 32, "length": 32, "scale": 5.0, "unit": "m"},
+    ],
+    0xFEAE: [
+        {"name": "airPressure", "startBit": 16, "length": 16, "scale": 8.0, "unit": "kPa"},
+    ],
+    0xFEF1: [
+        {"name": "parkBreak", "startBit": 2, "length": 1},
+        {"name": "wheelSpeed", "startBit": 8, "length": 16, "scale": 1 / 256.0, "unit": "km/h"},
+        {"name": "cruiseControl", "startBit": 24, "length": 1},
+        {"name": "breakSwitch", "startBit": 28, "length": 1},
+        {"name": "clutchSwitch", "startBit": 30, "length": 1},
+        {"name": "cruiseControlPto", "startBit": 48, "length": 5, "enum": cruiseControlPtoStatus},
+        {"name": "cruiseControlState", "startBit": 53, "length": 3, "enum": cruiseControlStatus},
+    ],
+    0xF004: [
+        {"name": "engineTorque", "startBit": 16, "length": 8, "offset": -125.0, "unit": "%"},
+        {"name": "engineSpeed", "startBit": 24, "length": 16, "scale": 1 / 8.0, "unit": "rpm"},
+    ],
+    0xF003: [
+        {"name": "acceleratorPedal", "startBit": 8, "length": 8, "scale": 0.4, "unit": "%"},
+        {"name": "engineLoad", "startBit": 16, "length": 8, "scale": 0.4, "unit": "%"},
+    ],
+    0xFEFC: [
+        {"name": "fuelLevel", "startBit": 8, "length": 8, "scale": 0.4, "unit": "%"},
+    ],
+    0xFEE5: [
+        {"name": "engineHours", "startBit": 0, "length": 32, "scale": 0.05, "unit": "h"},
+    ],
+    0xFEC0: [
+        {"name": "serviceDistance", "startBit": 8, "length": 16, "scale": 5.0, "offset": -160635.0, "unit": "km"},
+    ],
+    0xF001: [
+        {"name": "brakePedal", "startBit": 8, "length": 8, "scale": 0.4, "unit": "%"},
+    ],
+    0xF000: [
+        {"name": "retarderTorque", "startBit": 8, "length": 8, "offset": -125.0, "unit": "%"},
+    ],
+    0xFEAF: [
+        {"name": "gaseousFuelConsumption", "startBit": 32, "length": 32, "scale": 0.5, "unit": "kg"},
+    ],
+    0xFE70: [
+        {"name": "combinationWeight", "startBit": 16, "length": 16, "scale": 10.0, "unit": "kg"},
+    ],
+    0xF005: [
+        {"name": "selectedGear", "startBit": 0, "length": 8, "offset": -125.0},
+        {"name": "currentGear", "startBit": 24, "length": 8, "offset": -125.0},
+    ],
+    0xF009: [
+        {"name": "steeringWheelAngle", "startBit": 0, "length": 16, "scale": 1 / 1024.0, "offset": -31.374, "unit": "rad"},
+    ],
+    0xFEE6: [
+        {"name": "seconds", "startBit": 0, "length": 8, "scale": 0.25, "unit": "s"},
+        {"name": "minutes", "startBit": 8, "length": 8, "unit": "min"},
+        {"name": "hours", "startBit": 16, "length": 8, "unit": "h"},
+        {"name": "month", "startBit": 24, "length": 8},
+        {"name": "day", "startBit": 32, "length": 8, "scale": 0.25},
+        {"name": "year", "startBit": 40, "length": 8, "offset": 1985.0},
+    ],
+}
+
+
+# Turns one signal definition into the constants its decoder needs
+def compileSignal(signal):
+    length = signal["length"]
+    if(signal.get("byteOrder", "little") == "little"):
+        shift = signal["startBit"]
+    else:
+        shift = 64 - signal["startBit"] - length
+    if(shift < 0 or shift + length > 64):
+        raise ValueError(f"signal {signal['name']} does not fit into 8 bytes")
+
+    enum = signal.get("enum")
+    if(enum is not None):
+        labels = np.full(2**length, None, dtype=object)
+        for raw, label in enum.items():
+            labels[raw] = label
+        enum = labels
+    invalid = signal.get("invalid", 0xFB << (length - 8) if(length >= 8) else None)
+    return {"name": signal["name"],
+            "bigEndian": signal.get("byteOrder", "little") != "little",
+            "shift": np.uint64(shift),
+            "mask": np.uint64(2**length - 1),
+            "scale": signal.get("scale", 1.0),
+            "offset": signal.get("offset", 0.0),
+            "enum": enum,
+            "invalid": None if(invalid is None) else np.uint64(invalid)}
+
+
+# Builds a decoder which extracts all signals of one PGN from an uint64 payload
+# array in a single pass over the frames of that PGN.
+def compileDecoder(signals):
+    compiled = [compileSignal(s) for s in signals]
+    needsBigEndian = any(s["bigEndian"] for s in compiled)
+
+    # labels=False keeps the raw state code (uint8) of enum signals
+    def decode(payload, labels=True):
+        payload = np.asarray(payload, dtype=np.uint64)
+        swapped = payload.byteswap() if(needsBigEndian) else None
+        values = {}
+        for s in compiled:
+            raw = ((swapped if(s["bigEndian"]) else payload) >> s["shift"]) & s["mask"]
+            if(s["enum"] is not None):
+                values[s["name"]] = s["enum"][raw] if(labels) else raw.astype(np.uint8)
+                continue
+            value = raw * s["scale"] + s["offset"]
+            if(s["invalid"] is not None):
+                value[raw >= s["invalid"]] = np.nan
+            values[s["name"]] = value
+        return values
+    decode.labels = {s["name"]: s["enum"] for s in compiled if(s["enum"] is not None)}
+    decode.signals = compiled
+    return decode
+
+
+decoders = {pgn: compileDecoder(signals) for pgn, signals in signalDatabase.items()}
+
+
+# Decodes all signals of a PGN, returns {signal name: array}
+def decodeSignals(pgn, payload, labels=True):
+    if(pgn not in decoders):
+        return {}
+    return decoders[pgn](payload, labels)
+
+
+# Inverse of decodeSignals: packs {signal name: physical value or state code}
+# into count uint64 payloads. NaN and signals which are not given are sent as
+# "not available" (all bits set), like unused bits.
+def encodeSignals(pgn, values, count):
+    payload = np.full(count, np.uint64(2**64 - 1))
+    signals = decoders[pgn].signals if(pgn in decoders) else []
+    for bigEndian in (False, True):
+        if(bigEndian):
+            payload = payload.byteswap()
+        for s in signals:
+            if(s["bigEndian"] != bigEndian or s["name"] not in values):
+                continue
+            value = np.broadcast_to(np.asarray(values[s["name"]], dtype=np.float64), count)
+            if(s["enum"] is None):
+                value = np.round((value - s["offset"]) / s["scale"])
+            limit = float(s["mask"] if(s["invalid"] is None) else s["invalid"] - np.uint64(1))
+            raw = np.where(np.isfinite(value), np.clip(value, 0, limit), float(s["mask"])).astype(np.uint64)
+            payload = (payload & ~(s["mask"] << s["shift"])) | (raw << s["shift"])
+        if(bigEndian):
+            payload = payload.byteswap()
+    return payload
+
+
+# State code -> label lookup array of an enum signal, None for numeric signals
+def signalLabels(pgn, name):
+    if(pgn not in decoders):
+        return None
+    return decoders[pgn].labels.get(name)
+
+
+# Selects the frames of one PGN and adds all of its decoded signals as columns
+def signalGroup(df, pgn):
+    if(len(df) == 0):
+        return df.assign(**{s["name"]: [] for s in signalDatabase.get(pgn, [])})
+    group = df[df["pgn"] == pgn]
+    return group.assign(**decodeSignals(pgn, group["payload"].to_numpy()))
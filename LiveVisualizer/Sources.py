@@ -0,0 +1,255 @@
+###############################################################################
+# file    Sources.py
+###############################################################################
+# brief   Frame sources of the live visualizer: data directory, socket and queue
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import queue
+import socket
+import selectors
+import numpy as np
+from urllib.parse import urlsplit
+from CsvReader import parseCsv
+from FrameArray import FrameArray, internVehicles, vehicleNames
+from FrameDecoder import pgnFilter, toNanoseconds, timeMask
+from DirectoryWatcher import DirectoryWatcher
+from Metrics import metrics
+
+# Binary frame record of the direct sources, 35 bytes little-endian. A UDP
+# datagram or TCP stream carries whole records back to back. The vehicle name
+# is UTF-8, at most nameLength bytes.
+frameRecord = np.dtype([("time", "<i8"), ("pgn", "<u2"), ("source", "u1"),
+                        ("payload", "<u8"), ("name", "S16")])
+nameLength = frameRecord["name"].itemsize
+datagramRecords = 1400 // frameRecord.itemsize  # Stays below a typical MTU
+unsentVehicles = set()  # Names too long for a record, logged once
+
+
+# Frames of vehicles whose name does not fit into a record are not sent (a cut
+# name could match another vehicle), they are logged and counted
+def encodeRecords(frames):
+    codes, index = np.unique(frames.vehicle, return_inverse=True)
+    names = [vehicleNames[c].encode() if(c < len(vehicleNames)) else b"" for c in codes]
+    fits = np.array([len(name) <= nameLength for name in names], dtype=bool)
+    for code, name, fit in zip(codes, names, fits):
+        if(not fit and name not in unsentVehicles):
+            unsentVehicles.add(name)
+            print(f"Vehicle name {vehicleNames[code]} is longer than {nameLength} bytes, its frames are not sent")
+    keep = fits[index]
+    metrics.count("frames_unsent_total", int(len(keep) - np.count_nonzero(keep)))
+
+    records = np.empty(int(np.count_nonzero(keep)), dtype=frameRecord)
+    records["time"] = frames.time[keep]
+    records["pgn"] = frames.pgn[keep]
+    records["source"] = frames.source[keep]
+    records["payload"] = frames.payload[keep]
+    records["name"] = np.array(names, dtype=frameRecord["name"])[index[keep]] if(len(names) > 0) else b""
+    return records.tobytes()
+
+
+def decodeRecords(data):
+    records = np.frombuffer(data, dtype=frameRecord)
+    names = np.char.decode(records["name"], "utf-8", "replace") if(len(records) > 0) else []
+    return FrameArray(records["time"], records["pgn"], records["source"], records["payload"], internVehicles(names))
+
+
+# Applies the PGN filter (pgnFilter()) and the start time like readCsv does
+def filterFrames(frames, pgns=None, start=None):
+    mask = timeMask(frames.time, toNanoseconds(start))
+    if(pgns is not None):
+        mask &= np.isin(frames.pgn, pgns)
+    metrics.count("frames_ingested_total", int(np.count_nonzero(mask)))
+    metrics.count("frames_dropped_total", int(len(mask) - np.count_nonzero(mask)))  # Other PGNs or too old
+    return frames if(mask.all()) else frames[mask]
+
+
+# Network-tool CSV files in a directory, the lines appended since the last
+# read (today's path through the disk)
+class DirectorySource:
+    def __init__(self, path, pgns=None, start=None, history=None, suffix=".csv"):
+        self.pgns = pgns
+        self.start = start
+        self.watcher = DirectoryWatcher(path, suffix, history)
+        self.fileName = None
+
+    # New frames as a list of FrameArray, waits up to timeout seconds
+    def read(self, timeout=0):
+        frames = []
+        with metrics.stage("poll"):
+            chunks = self.watcher.poll(timeout)
+        for fileName, data in chunks:
+            if(fileName != self.fileName):
+                self.fileName = fileName
+                print(f"We have a new file ready: {fileName}")
+            with metrics.stage("parse"):
+                tmp = parseCsv(data, pgns=self.pgns, start=self.start)
+            metrics.count("frames_ingested_total", len(tmp))
+            metrics.count("frames_dropped_total", data.count(b"\n") - len(tmp))  # Other PGNs or too old
+            frames.append(FrameArray.fromFrame(tmp))
+        return frames
+
+    def close(self):
+        self.watcher.close()
+
+
+# Binary frame records from a local socket: UDP datagrams or any number of TCP
+# connections. No text encoding, no disk and no polling delay.
+class SocketSource:
+    def __init__(self, host, port, pgns=None, start=None, protocol="udp"):
+        self.pgns = pgnFilter(pgns)
+        self.start = start
+        self.protocol = protocol
+        self.selector = selectors.DefaultSelector()
+        kind = socket.SOCK_DGRAM if(protocol == "udp") else socket.SOCK_STREAM
+        self.socket = socket.socket(socket.AF_INET, kind)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port))
+        if(protocol == "udp"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        else:
+            self.socket.listen()
+        self.socket.setblocking(False)
+        self.selector.register(self.socket, selectors.EVENT_READ)
+        self.partial = {}  # TCP connection -> bytes of an incomplete record
+
+    @property
+    def address(self):
+        return self.socket.getsockname()
+
+    def read(self, timeout=0):
+        chunks = []
+        with metrics.stage("poll"):
+            for key, _ in self.selector.select(timeout):
+                if(key.fileobj is not self.socket):
+                    self.receive(key.fileobj, chunks)
+                elif(self.protocol == "udp"):
+                    self.receiveDatagrams(chunks)
+                else:
+                    connection, _ = self.socket.accept()
+                    connection.setblocking(False)
+                    self.selector.register(connection, selectors.EVENT_READ)
+                    self.partial[connection] = b""
+        if(len(chunks) == 0):
+            return []
+        with metrics.stage("parse"):
+            frames = filterFrames(decodeRecords(b"".join(chunks)), self.pgns, self.start)
+        return [frames]
+
+    def receiveDatagrams(self, chunks):
+        while(True):
+            try:
+                data = self.socket.recv(65536)
+            except BlockingIOError:
+                return
+            chunks.append(data[:len(data) - len(data) % frameRecord.itemsize])
+
+    def receive(self, connection, chunks):
+        try:
+            data = connection.recv(1024 * 1024)
+        except BlockingIOError:
+            return
+        except ConnectionResetError:
+            data = b""
+        if(len(data) == 0):  # Closed by the sender
+            self.selector.unregister(connection)
+            connection.close()
+            self.partial.pop(connection, None)
+            return
+        data = self.partial[connection] + data
+        cut = len(data) - len(data) % frameRecord.itemsize
+        self.partial[connection] = data[cut:]
+        chunks.append(data[:cut])
+
+    def close(self):
+        for connection in list(self.partial):
+            connection.close()
+        self.selector.close()
+        self.socket.close()
+
+
+# FrameArrays (or binary records) put into a queue.Queue by a receiver running
+# in the same process
+class QueueSource:
+    def __init__(self, frameQueue=None, pgns=None, start=None):
+        self.queue = queue.Queue() if(frameQueue is None) else frameQueue
+        self.pgns = pgnFilter(pgns)
+        self.start = start
+
+    def put(self, frames):
+        self.queue.put(frames)
+
+    def read(self, timeout=0):
+        items = []
+        try:
+            items.append(self.queue.get(timeout=timeout) if(timeout > 0) else self.queue.get_nowait())
+            while(True):
+                items.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        items = [decodeRecords(item) if(isinstance(item, bytes)) else item for item in items]
+        if(len(items) == 0):
+            return []
+        return [filterFrames(FrameArray.concat(items), self.pgns, self.start)]
+
+    def close(self):
+        pass
+
+
+# "udp://host:port", "tcp://host:port" or the path of a data directory
+def openSource(url, pgns=None, start=None, history=None):
+    parts = urlsplit(str(url))
+    if(parts.scheme in ("udp", "tcp")):
+        return SocketSource(parts.hostname, parts.port, pgns, start, parts.scheme)
+    return DirectorySource(url, pgns, start, history)
+
+
+# Counterpart of SocketSource, e.g. for the receiver of the network tool or
+# TrafficGenerator --send
+class FrameSender:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.protocol = parts.scheme
+        kind = socket.SOCK_DGRAM if(self.protocol == "udp") else socket.SOCK_STREAM
+        self.socket = socket.socket(socket.AF_INET, kind)
+        self.socket.connect((parts.hostname, parts.port))
+
+    def send(self, frames):
+        data = encodeRecords(frames)
+        if(self.protocol == "udp"):
+            step = datagramRecords * frameRecord.itemsize
+            for offset in range(0, len(data), step):
+                try:
+                    self.socket.send(data[offset:offset + step])
+                except ConnectionRefusedError:
+                    pass  # Nobody listening (yet), datagrams are fire and forget
+        else:
+            self.socket.sendall(data)
+
+    def close(self):
+        self.socket.close()
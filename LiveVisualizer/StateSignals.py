@@ -0,0 +1,114 @@
+###############################################################################
+# file    StateSignals.py
+###############################################################################
+# brief   Run-length encoded state signals (doors, cruise control, alternator)
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+from SignalDatabase import signalDatabase
+
+stateGap = 5  # [s] samples further apart end a stored run (FrameStore.runs())
+
+# Colors of the common states, the others get the plotly defaults
+stateColors = {"closed": "#2CA02C", "open": "#D62728", "off": "#BBBBBB", "hold": "#1F77B4",
+               "charging": "#2CA02C", "not charging": "#FF7F0E", "error": "#000000",
+               "not available": "#EEEEEE"}
+
+
+# Run-length encoding of a state signal: one row per run of equal values with
+# its first sample time, the end (the next change) and the value. Samples more
+# than maxGap seconds apart end a run at the last sample, the state in between
+# is unknown. A 10 Hz signal changing a few times per hour becomes a few rows.
+def stateRuns(time, values, maxGap=None):
+    rows = runRows(np.asarray(time).astype("datetime64[ns]").astype(np.int64), np.asarray(values), maxGap=maxGap)
+    return pd.DataFrame({"start": rows["start"].astype("datetime64[ns]"),
+                         "end": rows["end"].astype("datetime64[ns]"),
+                         "value": rows["value"]})
+
+
+# Same as stateRuns() on arrays, per vehicle (uint16 codes) when given: the
+# columns start, end (int64 ns), value and vehicle sorted by vehicle and time
+def runRows(time, values, vehicle=None, maxGap=None):
+    vehicle = np.zeros(len(time), dtype=np.uint16) if(vehicle is None) else np.asarray(vehicle, dtype=np.uint16)
+    if(len(time) == 0):
+        return {"start": time[:0], "end": time[:0], "value": values[:0], "vehicle": vehicle[:0]}
+    if(((np.diff(vehicle.astype(np.int64)) < 0) | ((vehicle[1:] == vehicle[:-1]) & (np.diff(time) < 0))).any()):
+        order = np.lexsort((time, vehicle))
+        time, values, vehicle = time[order], values[order], vehicle[order]
+
+    other = np.r_[True, vehicle[1:] != vehicle[:-1]]
+    change = other | np.r_[True, values[1:] != values[:-1]]
+    gap = np.r_[False, np.diff(time) > maxGap * 1e9] if(maxGap is not None) else np.zeros(len(time), dtype=bool)
+    first = np.flatnonzero(change | gap)
+    last = np.r_[first[1:] - 1, len(time) - 1]
+    end = np.r_[time[first[1:]], time[-1]]
+    end = np.where(np.r_[(gap | other)[first[1:]], True], time[last], end)
+    return {"start": time[first], "end": end, "value": values[first], "vehicle": vehicle[first]}
+
+
+# Joins the runs of consecutive blocks (FrameStore partitions): a run ending
+# at the last sample of a block continues in the next one when its first
+# sample follows within maxGap seconds. Rows sorted by vehicle and start.
+def joinRuns(rows, maxGap):
+    if(len(rows["start"]) == 0):
+        return rows
+    start, end, value, vehicle = rows["start"], rows["end"].copy(), rows["value"], rows["vehicle"]
+    follows = np.r_[False, (vehicle[1:] == vehicle[:-1]) & (start[1:] - end[:-1] <= maxGap * 1e9)]
+    changed = follows & np.r_[True, value[1:] != value[:-1]]
+    end[np.flatnonzero(changed) - 1] = start[changed]  # The state changed at the first sample of the block
+    first = np.flatnonzero(~(follows & ~changed))
+    last = np.r_[first[1:] - 1, len(start) - 1]
+    return {"start": start[first], "end": end[last], "value": value[first], "vehicle": vehicle[first]}
+
+
+# State signals of a PGN, stored as runs instead of rollups
+def stateSignals(pgn):
+    return [s["name"] for s in signalDatabase.get(pgn, []) if("enum" in s)]
+
+
+# State at the given times, looked up in the runs (None outside of them)
+def stateAt(runs, time):
+    time = np.asarray(time).astype("datetime64[ns]")
+    index = np.searchsorted(runs["start"].to_numpy(), time, side="right") - 1
+    inside = (index >= 0) & (time <= runs["end"].to_numpy()[np.maximum(index, 0)])
+    return np.where(inside, runs["value"].to_numpy(dtype=object)[np.maximum(index, 0)], None)
+
+
+# Timeline bars of the runs in one row named label, one trace per state so the
+# hover shows it. The x-axis must be a date axis and barmode "overlay".
+def stateTraces(runs, label, colors=stateColors):
+    traces = []
+    for value, group in runs.groupby("value", sort=False):
+        duration = (group["end"] - group["start"]).dt.total_seconds() * 1000  # [ms] on a date axis
+        traces.append(go.Bar(base=group["start"], x=duration, y=[label] * len(group), orientation="h",
+                             name=f"{label} {value}", marker_color=colors.get(value), width=0.6,
+                             customdata=group["end"], hovertemplate=f"{label} {value}<br>%{{base}} - %{{customdata}}<extra></extra>"))
+    return traces
@@ -5,7 +5,6 @@ Created on Thu Dec 30 00:19:00 2021
 @author: Admin
 """
 
-import os
 import time
 import pathlib
 import numpy as np
@@ -15,78 +14,127 @@ import plotly.io as pio
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.express as px
+import dash
+from dash.dependencies import Output, Input
+import dash_core_components as dcc
+import dash_html_components as html
+import webbrowser
+import threading
+from FrameStore import openStore
+from Downsampling import screenPoints, downsample, viewRange
+from Rollups import rollupLevels, rollupLevel, rollupTrace
+from FrameDecoder import toNanoseconds
+from FigureCache import FigureCache
+from DataManifest import DataManifest
 
 pio.renderers.default = "browser"
 pd.options.mode.chained_assignment = None
 
 
 filepath = pathlib.Path(r"C:\Users\Admin\GoogleDrive\HSR\SA-OST-2021\fleet-monitor-network-tool\data")
-files = os.listdir(filepath)
-
-df = pd.DataFrame()
-for file in files:
-    tmp = pd.read_csv(filepath / file, header=None)  
-    tmp = tmp.iloc[: , 1:]                     # Remove index column
-    tmp[1] = pd.to_datetime(tmp[1], unit="s")  # Convert Unix Timestamp
-    tmp = tmp.rename({1: "date", 2: "pgn", 3: "data", 4: "name"}, axis=1)
-    tmp = tmp[tmp["date"] > '2020-01-01 00:00:00']
-    tmp["pgn"] = tmp["pgn"].apply(int, base=16)
-    for i in range(8):
-        tmp[f"{7-i}"] = pd.Series((tmp["data"].apply(int, base=16) // 2**(8*i)) & 0xFF)
-    df = df.append(tmp)
-
-
-print(len(set(df["name"].values.tolist())))
-
-
-tachograph = df[df["pgn"] == 0xFE6C]
-tachograph["speed"] = tachograph["7"] + tachograph["6"] / 256.0
-
-engineController1 = df[df["pgn"] == 0xF004]
-engineController1["engineTorque"] = engineController1["2"] - 125.0
-engineController1["engineSpeed"] = (engineController1["3"] + engineController1["4"] * 256) / 8.0
-
-engineController2 = df[df["pgn"] == 0xF003]
-engineController2["acceleratorPedal"] = engineController2["1"] * 0.4
-engineController2["engineLoad"] = engineController2["2"] * 0.4
-
-ambientAir = df[df["pgn"] == 0xFEF5]
-ambientAir["ambientAir"] = (ambientAir["3"] + ambientAir["4"] * 256) * 0.03125 - 273.0
-
-temperature = df[df["pgn"] == 0xFEEE]
-temperature["temperature"] = temperature["0"] - 40.0
-
-fuelConsumption = df[df["pgn"] == 0xFEE9]
-fuelConsumption["fuelConsumption"] = (fuelConsumption["4"] + 
-                                      fuelConsumption["5"] * 256 + 
-                                      fuelConsumption["6"] * 256**2  +
-                                      fuelConsumption["7"] * 256**3) * 0.5
-fuelConsumption["fuelConsumption"] -= fuelConsumption["fuelConsumption"].iloc[0]
-
-
-
-
-fig = make_subplots(rows=4, cols=1, shared_xaxes=True,
-                    vertical_spacing = 0.065,
-                    subplot_titles=["Vehicle Speed [km/h]",
-                                    "Accelerator Pedal [%]",
-                                    "Fuel Consumption [l]",
-                                    "  Door Open State        "])
-
-# fig.add_trace(go.Scatter(x=tachograph["date"], y=tachograph["speed"],
-#                           name="Vehicle Speed [km/h]",
-#                           fill="tozeroy"), row=1, col=1)
-
-# fig.add_trace(go.Scatter(x=temperature["date"], y=temperature["temperature"],
-#                           name="Engine Temperature [°C]",
-#                           fill="tozeroy"), row=1, col=1)
-
-# fig.add_trace(go.Scatter(x=ambientAir["date"], y=ambientAir["ambientAir"],
-#                           name="Ambient Air [°C]",
-#                           fill="tozeroy"), row=2, col=1)
-
-
-# fig.update_layout(width=2000, height=1100, template="plotly_white")#, title_text=fileName)
-
-# fig.show()
-
+storePath = filepath.parent / "store"  # Decoded frames, rebuilt when the files change
+manifestPath = filepath.parent / "data-manifest.json"  # Index of the data files, the data directory stays untouched
+figurePath = filepath.parent / "figures"  # Figures already built for a view, kept across restarts
+startTime = '2020-01-01 00:00:00'
+plotPgns = [0xFE6C, 0xF004, 0xF003, 0xFEF5, 0xFEEE, 0xFEE9]  # PGNs decoded for the graphs
+
+# (PGN, signal, title) of the plotted signals, one subplot each
+plotSignals = [(0xFE6C, "speed", "Vehicle Speed [km/h]"),
+               (0xF003, "acceleratorPedal", "Accelerator Pedal [%]"),
+               (0xFEE9, "fuelConsumption", "Fuel Consumption [l]")]
+               # (0xFEEE, "temperature", "Engine Temperature [°C]"),
+               # (0xFEF5, "ambientAir", "Ambient Air [°C]"),
+               # (0xF003, "engineLoad", "Engine Load [%]"),
+               # (0xF004, "engineSpeed", "Engine Speed [rpm]")]
+
+
+# Visible part of a signal of one vehicle (None: whole fleet), about
+# screenPoints points from the finest rollup level which fits, or from the raw
+# frames once zoomed in further
+def signalTrace(pgn, signal, start, end, vehicle=None):
+    level = rollupLevel(start.value, end.value, screenPoints)
+    if(level is not None):
+        return rollupTrace(store.rollup(pgn, signal, level, start=start, end=end, vehicle=vehicle), level, screenPoints)
+    frame = store.read(pgn, [signal], start=start, end=end, vehicle=vehicle)
+    return downsample(frame["date"], frame[signal], start=start, end=end)
+
+
+# First fuel counter value after startTime, the fuel trace starts at zero
+def fuelOffset(vehicle=None):
+    first = store.rollup(0xFEE9, "fuelConsumption", rollupLevels[-1], start=startTime, vehicle=vehicle)["min"]
+    return first.iloc[0] if(len(first) > 0) else 0.0
+
+
+# Figure of the visible range, reduced to about one point per pixel. Recomputed
+# on zoom and pan, so zooming in shows the full resolution again. An empty
+# store gives an empty figure with a note.
+def buildFigure(start=None, end=None, vehicle=None):
+    if(timeRange is None):
+        fig = go.Figure()
+        fig.add_annotation(text=f"No frames of the plotted PGNs after {startTime}", showarrow=False,
+                           xref="paper", yref="paper", x=0.5, y=0.5)
+        fig.update_layout(template="plotly_white", xaxis_visible=False, yaxis_visible=False)
+        return fig
+    start = timeRange[0] if(start is None) else pd.Timestamp(start)
+    end = timeRange[1] if(end is None) else pd.Timestamp(end)
+    fig = make_subplots(rows=len(plotSignals), cols=1, shared_xaxes=True,
+                        vertical_spacing = 0.065,
+                        subplot_titles=[title for _, _, title in plotSignals])
+
+    for row, (pgn, signal, title) in enumerate(plotSignals, 1):
+        x, y = signalTrace(pgn, signal, start, end, vehicle)
+        if(signal == "fuelConsumption"):
+            y = y - fuelOffset(vehicle)
+        fig.add_trace(go.Scatter(x=x, y=y, name=title,
+                                 fill="tozeroy"), row=row, col=1)
+
+    fig.update_xaxes(range=[start, end])
+    fig.update_layout(width=2000, height=1100, template="plotly_white", uirevision="static")#, title_text=fileName)
+    return fig
+
+
+# buildFigure() once per store content and view, zooming back or reloading
+# the page reuses the figure built before
+def cachedFigure(start=None, end=None, vehicle=None):
+    key = ("static", store.revision, startTime, tuple(plotSignals), str(start), str(end), vehicle)
+    return figureCache.figure(key, lambda: buildFigure(start, end, vehicle))
+
+
+app = dash.Dash(__name__)
+
+
+@app.callback(
+    Output('static-graph', 'figure'),
+    [ Input('static-graph', 'relayoutData'), Input('vehicle-select', 'value') ]
+)
+def update_graph_range(relayoutData, vehicle):
+    visible = viewRange(relayoutData)
+    if(visible is None):
+        if(dash.callback_context.triggered[0]["prop_id"].startswith("static-graph")):
+            return dash.no_update
+        visible = (None, None)
+    return cachedFigure(*visible, vehicle=vehicle)
+
+
+# Everything that reads data runs in the main process only, the loader's worker
+# processes import this file as well
+if __name__ == '__main__':
+    files = DataManifest(filepath, manifestPath).update().overlapping(start=startTime)  # Only the files after startTime
+    store = openStore(storePath, [filepath / file for file in files])
+    print(f"{len(store.vehicles)} vehicles")
+    figureCache = FigureCache(64 * 2**20, directory=figurePath)
+
+    timeRange = store.bounds(plotPgns)
+    if(timeRange is not None):
+        first, last = timeRange
+        timeRange = (pd.Timestamp(max(first - 1, toNanoseconds(startTime))), pd.Timestamp(last + 1))  # Initial view
+
+    app.layout = html.Div([
+        dcc.Dropdown(id='vehicle-select', placeholder="All vehicles", style={'width': 400},
+                     options=[{"label": name, "value": name} for name in sorted(store.vehicles)]),
+        dcc.Graph(id='static-graph', figure=cachedFigure())
+    ])
+
+    port = 40001
+    threading.Timer(1, webbrowser.open_new("http://localhost:{}".format(port))).start();
+    app.run_server(port=port)
@@ -0,0 +1,206 @@
+###############################################################################
+# file    TrafficGenerator.py
+###############################################################################
+# brief   Synthetic FMS traffic as candump text and network-tool CSV files
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import argparse
+import pathlib
+import numpy as np
+import pandas as pd
+from FrameArray import FrameArray, internVehicles
+from FrameDecoder import bytesToHex
+from SignalDatabase import pgnNameTable, signalDatabase, encodeSignals
+from Sources import FrameSender
+
+# Typical FMS gateway rates [frames/s], the other PGNs are sent once a second
+fmsRates = {0xFE6C: 20, 0xF004: 20, 0xF003: 10, 0xFEF1: 10, 0xF001: 10, 0xF000: 10,
+            0xF005: 10, 0xF009: 10, 0xFEF2: 10, 0xFDA5: 10, 0xFED5: 5, 0xFE58: 2}
+sourceAddress = {0xF004: 0x00, 0xF003: 0x00, 0xF005: 0x03, 0xF001: 0x0B, 0xF000: 0x0F, 0xFE6C: 0xEE}
+cycleStep = 0.1  # [s] resolution of the simulated drive cycle
+
+
+# One vehicle's drive cycle sampled every cycleStep seconds: speed targets
+# every 20-60 s (with stops), everything else is derived from the speed
+def driveCycle(duration, rng):
+    knots = np.cumsum(rng.uniform(20, 60, size=int(duration / 20) + 2))
+    knots = np.r_[0.0, knots]
+    targets = rng.choice([0.0, 0.0, 30.0, 50.0, 60.0, 80.0, 85.0], size=len(knots))
+    t = np.arange(0, duration + cycleStep, cycleStep)
+    speed = np.interp(t, knots, targets)
+    acceleration = np.gradient(speed, cycleStep) / 3.6
+    pedal = np.clip(np.where(acceleration > 0, 25 + 60 * acceleration, 0) + 0.2 * speed, 0, 100)
+    gear = np.searchsorted([0.5, 10, 20, 30, 40, 50, 60, 70, 80], speed)
+    engineSpeed = np.where(speed > 0.5, 900 + 1100 * ((speed % 10) / 10), 600) + rng.normal(0, 5, len(t))
+    fuelRate = 1.5 + 0.4 * pedal + 0.02 * speed
+    fuel = rng.uniform(1e4, 1e5) + np.cumsum(fuelRate) * cycleStep / 3600
+    distance = rng.uniform(1e7, 5e8) + np.cumsum(speed / 3.6) * cycleStep
+    stopped = speed < 0.5
+    doors = np.where(stopped & (np.sin(t / 7.0) > 0), 1, 0)  # Open part of the time at stops
+    slow = np.interp(t, np.linspace(0, duration, 8), rng.normal(0, 1, 8))
+    return t, {
+        "speed": speed, "wheelSpeed": speed + rng.normal(0, 0.2, len(t)),
+        "acceleratorPedal": pedal, "engineLoad": np.clip(pedal * 0.9 + 10, 0, 100),
+        "engineSpeed": engineSpeed, "engineTorque": np.clip(pedal - 10, -10, 100),
+        "brakePedal": np.where(acceleration < -0.3, np.clip(-40 * acceleration, 0, 100), 0),
+        "retarderTorque": np.where(acceleration < -0.5, -20.0, 0.0),
+        "fuelRate": fuelRate, "fuelEconomy": np.clip(speed / fuelRate, 0, 120),
+        "fuelConsumption": fuel, "tripFuel": fuel - fuel[0],
+        "fuelLevel": np.clip(80 - (fuel - fuel[0]) * 0.2, 0, 100),
+        "vehicleDistance": distance, "tripDistance": distance - distance[0],
+        "serviceDistance": 30000 - (distance - distance[0]) / 1000,
+        "engineHours": rng.uniform(1e3, 2e4) + t / 3600,
+        "temperature": 85 + 3 * slow, "ambientAir": 15 + 5 * slow,
+        "diselExhaustFluid": 60 - t / duration * 5, "airPressure": 850 + 40 * np.sin(t / 30),
+        "suspension": 400 + 20 * slow, "combinationWeight": np.full(len(t), rng.uniform(12000, 38000)),
+        "alternatorSpeed": engineSpeed * 3, "alternator1": np.ones(len(t)),
+        "selectedGear": gear, "currentGear": gear,
+        "steeringWheelAngle": 0.3 * np.sin(t / 11) * (speed < 30),
+        "door1": doors, "door2": np.roll(doors, 20), "parkBreak": stopped.astype(float),
+        "breakSwitch": (acceleration < -0.3).astype(float), "clutchSwitch": np.zeros(len(t)),
+        "cruiseControl": (speed > 70).astype(float),
+        "cruiseControlState": np.where(speed > 70, 1, 0), "cruiseControlPto": np.zeros(len(t)),
+    }
+
+
+# Frames (FrameArray, sorted by time) of vehicles driving for duration seconds
+# from start on. pgns defaults to all PGNs of pgnNameTable; frameRate (one rate
+# for every PGN) defaults to fmsRates. PGNs without signal definitions get a
+# random payload per vehicle.
+def generateFrames(vehicles=1, duration=60.0, frameRate=None, pgns=None, start="2021-11-17 16:00:00", seed=0):
+    rng = np.random.default_rng(seed)
+    pgns = [int(p, 16) for p in pgnNameTable] if(pgns is None) else list(pgns)
+    start = pd.Timestamp(start).value
+    codes = internVehicles([f"vehicle{v:03d}" for v in range(vehicles)])
+    parts = []
+    for vehicle in range(vehicles):
+        t, cycle = driveCycle(duration, rng)
+        for pgn in pgns:
+            rate = frameRate if(frameRate is not None) else fmsRates.get(pgn, 1)
+            offsets = np.arange(rng.uniform(0, 1 / rate), duration, 1 / rate)
+            offsets = np.sort(offsets + rng.normal(0, 0.02 / rate, len(offsets)).clip(0))
+            if(pgn in signalDatabase):
+                values = {s["name"]: np.interp(offsets, t, cycle[s["name"]]) for s in signalDatabase[pgn] if(s["name"] in cycle)}
+                values.update({n: np.round(v) for n, v in values.items() if(n in ("door1", "door2", "cruiseControlState"))})
+                payload = encodeSignals(pgn, values, len(offsets))
+            else:
+                payload = np.full(len(offsets), rng.integers(0, 2**63, dtype=np.uint64))
+            parts.append(FrameArray(start + np.round(offsets * 1e9).astype(np.int64), np.full(len(offsets), pgn),
+                                    np.full(len(offsets), sourceAddress.get(pgn, 0x27)), payload,
+                                    np.full(len(offsets), codes[vehicle])))
+    frames = FrameArray.concat(parts)
+    return frames[np.argsort(frames.time, kind="stable")]
+
+
+# Payload words as hex strings with byte 0 first, like the network tool
+def payloadHex(payload):
+    return bytesToHex(np.ascontiguousarray(payload, dtype="<u8").view(np.uint8).reshape(-1, 8))
+
+
+# Network-tool CSV: index, unix timestamp, PGN (hex), payload (hex), vehicle
+def writeCsv(fileName, frames):
+    pd.DataFrame({"index": np.arange(len(frames)),
+                  "time": frames.time / 1e9,
+                  "pgn": [f"{p:04X}" for p in frames.pgn],
+                  "data": payloadHex(frames.payload),
+                  "name": frames["name"]}).to_csv(fileName, header=False, index=False, float_format="%.6f")
+
+
+# candump -L style text: "(1637164800.010000) can0 18FE6C00 [8] D9 A3 ..."
+def writeCandump(fileName, frames, interface="can0"):
+    canId = (6 << 26) | (frames.pgn.astype(np.int64) << 8) | frames.source
+    data = payloadHex(frames.payload).astype("S16").view(np.uint8).reshape(-1, 16)
+    spaced = np.full((len(frames), 23), ord(" "), dtype=np.uint8)
+    spaced[:, [i + i // 2 for i in range(16)]] = data
+    data = spaced.view("S23").ravel().astype(str)
+    with open(fileName, "w") as file:
+        for t, i, d in zip((frames.time / 1e9).tolist(), canId.tolist(), data):
+            file.write(f"({t:.6f}) {interface} {i:08X} [8] {d}\n")
+
+
+# Writes frames into files numbered like the network tool does (0.csv, 1.csv,
+# ...), each one holding the same time span
+def writeFiles(directory, frames, files, writer=writeCsv, suffix=".csv"):
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    bounds = np.zeros(files + 1, dtype=np.int64)
+    if(len(frames) > 0):  # Edges in int64, float64 can not resolve single nanoseconds of today's times
+        span = int(frames.time[-1]) - int(frames.time[0]) + 1
+        edges = frames.time[0] + np.array([span * i // files for i in range(files + 1)], dtype=np.int64)
+        bounds = np.searchsorted(frames.time, edges)
+        bounds[-1] = len(frames)
+    for i in range(files):
+        writer(directory / f"{i}{suffix}", frames[bounds[i]:bounds[i + 1]])
+
+
+# Sends frames to a SocketSource ("udp://host:port" or "tcp://host:port") in
+# step second slices, paced by their timestamps and speed times real time
+def sendFrames(url, frames, speed=1.0, step=0.05):
+    sender = FrameSender(url)
+    if(len(frames) > 0):
+        edges = np.arange(frames.time[0], frames.time[-1] + 1, step * 1e9).astype(np.int64)
+        bounds = np.searchsorted(frames.time, np.r_[edges, frames.time[-1] + 1])
+        begin = time.perf_counter()
+        for i, edge in enumerate(edges):
+            delay = begin + (edge - frames.time[0]) / 1e9 / speed - time.perf_counter()
+            if(delay > 0):
+                time.sleep(delay)
+            if(bounds[i + 1] > bounds[i]):
+                sender.send(frames[bounds[i]:bounds[i + 1]])
+    sender.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generates synthetic FMS traffic")
+    parser.add_argument("output", nargs="?", help="output file, or directory with --files")
+    parser.add_argument("--format", choices=["csv", "candump"], default="csv")
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=600.0, help="[s]")
+    parser.add_argument("--rate", type=float, default=None, help="frames/s per PGN (default: FMS rates)")
+    parser.add_argument("--start", default="2021-11-17 16:00:00")
+    parser.add_argument("--files", type=int, default=None, help="split into numbered files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--send", metavar="URL", help="stream to udp://host:port or tcp://host:port instead of writing")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed with --send")
+    args = parser.parse_args()
+    if(args.output is None and args.send is None):
+        parser.error("either an output or --send is required")
+
+    frames = generateFrames(args.vehicles, args.duration, args.rate, start=args.start, seed=args.seed)
+    if(args.send is not None):
+        sendFrames(args.send, frames, args.speed)
+        print(f"{len(frames)} frames of {args.vehicles} vehicles sent to {args.send}")
+    else:
+        writer = writeCsv if(args.format == "csv") else writeCandump
+        if(args.files is None):
+            writer(args.output, frames)
+        else:
+            writeFiles(args.output, frames, args.files, writer, ".csv" if(args.format == "csv") else ".txt")
+        print(f"{len(frames)} frames of {args.vehicles} vehicles written to {args.output}")
@@ -0,0 +1,274 @@
+###############################################################################
+# file    TripStatistics.py
+###############################################################################
+# brief   Incremental trip and shift statistics (fuel, distance, idle time)
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import math
+import threading
+import collections
+import numpy as np
+import pandas as pd
+from FrameArray import vehicleNames, vehicleCodes
+from SignalDatabase import decoders, decodeSignals
+
+# Cumulative counters: name -> (PGN, signal, highest plausible rate [unit/s])
+counterSignals = {"fuelLfc": (0xFEE9, "fuelConsumption", 0.1),   # 360 l/h
+                  "fuelHr": (0xFD09, "fuelConsumption", 0.1),
+                  "distance": (0xFEC1, "vehicleDistance", 70.0)}  # 252 km/h
+tripPgns = [0xF004, 0xFD09, 0xFE6C, 0xFEC1, 0xFEE9, 0xFEF2]  # PGNs the statistics need
+totalNames = ["fuelLfc", "fuelHr", "distance", "rateFuel", "engineTime", "drivingTime", "idleTime", "resets"]
+maxGap = 5.0          # [s] longer gaps between two samples are not integrated
+idleSpeed = 1.0       # [km/h] slower counts as standing
+runningSpeed = 300.0  # [rpm] faster counts as engine running
+shiftLength = 8 * 3600  # [s]
+shiftStart = 6 * 3600   # [s] after midnight, shifts at 06:00, 14:00 and 22:00
+
+
+# Range after which a counter wraps around (the raw values below "not
+# available") and its resolution
+def counterRange(pgn, name):
+    signal = next(s for s in decoders[pgn].signals if(s["name"] == name))
+    return float(signal["invalid"]) * signal["scale"], signal["scale"]
+
+
+# Increments of a cumulative counter between consecutive samples, including
+# the step from the previous batch (last, lastTime). A decrease that fits a
+# wrap-around within the plausible rate (plus one resolution step) is
+# unwrapped, any other decrease or jump (reset, replaced ECU) starts a new
+# baseline and adds nothing. Returns the increments and a mask of the resets.
+def counterDeltas(values, times, last, lastTime, modulus, resolution, maxRate):
+    previous = np.r_[values[0] if(last is None) else last, values[:-1]]
+    previousTime = np.r_[times[0] if(lastTime is None) else lastTime, times[:-1]]
+    delta = values - previous
+    limit = maxRate * np.maximum((times - previousTime) / 1e9, 1.0) + resolution
+    wrapped = (delta < 0) & (delta + modulus <= limit)
+    delta[wrapped] += modulus
+    reset = (delta < 0) | (delta > limit)
+    delta[reset] = 0.0
+    return delta, reset
+
+
+# Interval lengths [s] between consecutive samples, the first one measured
+# from lastTime. Gaps longer than maxGap count as zero.
+def intervals(times, lastTime):
+    previous = np.r_[times[0] if(lastTime is None) else lastTime, times[:-1]]
+    dt = (times - previous) / 1e9
+    dt[dt > maxGap] = 0.0
+    return dt
+
+
+def newTotals(start):
+    return dict({name: 0.0 for name in totalNames}, start=start, end=start)
+
+
+# Running state of one vehicle: the last sample of every input and the totals
+# of the current trip, the current shift and the finished shifts
+class VehicleTrip:
+    def __init__(self, start, history):
+        self.last = {}  # input -> (time, value)
+        self.engine = None  # Engine speed samples of the latest batch (times, values, value before)
+        self.trip = newTotals(start)
+        self.shiftIndex = None
+        self.shift = None
+        self.shifts = collections.deque(maxlen=history)  # Finished shifts, oldest first
+
+    # Totals of the shift with the given index: the current one, a finished
+    # one or a new shift, None when it is too old
+    def shiftTotals(self, index, start):
+        if(self.shiftIndex is None or index > self.shiftIndex):
+            if(self.shift is not None):
+                self.shifts.append(self.shift)
+            self.shiftIndex = index
+            self.shift = newTotals(start)
+            self.shift["index"] = index
+            return self.shift
+        if(index == self.shiftIndex):
+            return self.shift
+        return next((s for s in self.shifts if(s["index"] == index)), None)
+
+    # Adds per-sample increments to the trip and to the shift they fall into
+    def accumulate(self, name, times, values):
+        self.trip[name] += float(values.sum())
+        self.trip["end"] = max(self.trip["end"], int(times[-1]))
+        index = (times // 1_000_000_000 - shiftStart) // shiftLength
+        for i in np.unique(index):
+            totals = self.shiftTotals(int(i), int(times[index == i][0]))
+            if(totals is not None):
+                totals[name] += float(values[index == i].sum())
+                totals["end"] = max(totals["end"], int(times[index == i][-1]))
+
+
+# Trip and shift statistics of every vehicle, updated with each batch of new
+# frames in O(batch): nothing is recomputed over the history. Fuel comes from
+# the high resolution counter (FD09) when the vehicle sends it, else from FEE9,
+# the distance from FEC1, fuel per 100 km from the FEF2 fuel rate.
+class TripStatistics:
+    def __init__(self, shiftHistory=21):
+        self.shiftHistory = shiftHistory
+        self.vehicles = {}  # vehicle code -> VehicleTrip
+        self.version = 0  # Counts the updates
+        self.lock = threading.Lock()
+        self.ranges = {name: counterRange(pgn, signal) for name, (pgn, signal, _) in counterSignals.items()}
+
+    def add(self, frames):
+        if(len(frames) == 0):
+            return
+        mask = np.isin(frames.pgn, tripPgns)
+        if(not mask.any()):
+            return
+        order = np.flatnonzero(mask)[np.lexsort((frames.time[mask], frames.pgn[mask], frames.vehicle[mask]))]
+        time, pgn, vehicle, payload = frames.time[order], frames.pgn[order], frames.vehicle[order], frames.payload[order]
+        bounds = np.flatnonzero(np.diff(vehicle) | np.diff(pgn)) + 1
+        with self.lock:
+            for begin, end in zip(np.r_[0, bounds], np.r_[bounds, len(order)]):
+                code = int(vehicle[begin])
+                if(code not in self.vehicles):
+                    self.vehicles[code] = VehicleTrip(int(time[begin]), self.shiftHistory)
+                self.addGroup(self.vehicles[code], int(pgn[begin]), time[begin:end], payload[begin:end])
+            self.version += 1
+
+    def addGroup(self, state, pgn, times, payload):
+        signals = decodeSignals(pgn, payload, labels=False)
+        for name, (counterPgn, signal, maxRate) in counterSignals.items():
+            if(counterPgn == pgn):
+                self.addCounter(state, name, times, signals[signal], maxRate)
+        if(pgn == 0xF004):
+            self.addHeld(state, "engineSpeed", times, signals["engineSpeed"])
+        elif(pgn == 0xFE6C):
+            self.addHeld(state, "speed", times, signals["speed"])
+        elif(pgn == 0xFEF2):
+            self.addHeld(state, "fuelRate", times, signals["fuelRate"])
+
+    def addCounter(self, state, name, times, values, maxRate):
+        valid = np.isfinite(values)
+        last = state.last.get(name, (None, None))
+        valid &= times > (-1 if(last[0] is None) else last[0])  # Late frames were already counted
+        if(not valid.any()):
+            return
+        times, values = times[valid], values[valid]
+        delta, reset = counterDeltas(values, times, last[1], last[0], *self.ranges[name], maxRate)
+        state.accumulate(name, times, delta)
+        state.accumulate("resets", times, reset.astype(np.float64))
+        state.last[name] = (int(times[-1]), float(values[-1]))
+
+    # Integrates a sampled signal which holds its value until the next sample
+    def addHeld(self, state, name, times, values):
+        last = state.last.get(name, (None, math.nan))
+        keep = times > (-1 if(last[0] is None) else last[0])
+        if(not keep.any()):
+            return
+        times, values = times[keep], values[keep]
+        dt = intervals(times, last[0])
+        held = np.r_[last[1], values[:-1]]  # Value during each interval
+        if(name == "engineSpeed"):
+            state.accumulate("engineTime", times, np.where(held > runningSpeed, dt, 0.0))
+            state.engine = (times, values, last[1])
+        elif(name == "speed"):
+            running = self.engineRunning(state, np.r_[times[0] if(last[0] is None) else last[0], times[:-1]])
+            state.accumulate("drivingTime", times, np.where(held >= idleSpeed, dt, 0.0))
+            state.accumulate("idleTime", times, np.where((held < idleSpeed) & running, dt, 0.0))
+        elif(name == "fuelRate"):
+            state.accumulate("rateFuel", times, np.nan_to_num(held) * dt / 3600)
+        state.last[name] = (int(times[-1]), float(values[-1]))
+
+    # Engine running at the given times according to the engine speed sampled
+    # last before them (the engine PGN F004 is added before the speed FE6C)
+    def engineRunning(self, state, times):
+        if(state.engine is None):
+            return np.zeros(len(times), dtype=bool)
+        engineTimes, engineSpeeds, before = state.engine
+        index = np.searchsorted(engineTimes, times, side="right") - 1
+        return np.where(index >= 0, engineSpeeds[np.maximum(index, 0)], before) > runningSpeed
+
+    # Trip, current shift and finished shifts of a vehicle as dicts
+    def query(self, name):
+        with self.lock:
+            state = self.vehicles.get(vehicleCodes.get(name))
+            if(state is None):
+                return None
+            return {"vehicle": name, "trip": summarize(state.trip), "shift": summarize(state.shift),
+                    "shifts": [summarize(s) for s in state.shifts]}
+
+    # One row per vehicle with its trip (or current shift) statistics
+    def summary(self, kind="trip"):
+        with self.lock:
+            rows = [dict(vehicle=vehicleNames[code], **(summarize(getattr(state, kind)) or {}))
+                    for code, state in self.vehicles.items()]
+        rows.sort(key=lambda row: row["vehicle"])
+        return pd.DataFrame(rows, columns=["vehicle"] + summaryColumns)
+
+    # Starts a new trip, e.g. at the beginning of a tour
+    def resetTrip(self, name):
+        with self.lock:
+            state = self.vehicles.get(vehicleCodes.get(name))
+            if(state is not None):
+                state.trip = newTotals(state.trip["end"])
+                self.version += 1
+
+    # Adds /trips (all vehicles) and /trips/<vehicle> (JSON) to a Flask server
+    def register(self, server):
+        import flask
+
+        @server.route("/trips")
+        def tripsRoute():
+            kind = "shift" if(flask.request.args.get("kind") == "shift") else "trip"
+            summary = self.summary(kind).astype(object)
+            return flask.jsonify(summary.where(summary.notna(), None).to_dict("records"))
+
+        @server.route("/trips/<name>")
+        def tripRoute(name):
+            result = self.query(name)
+            if(result is None):
+                return flask.Response("unknown vehicle\n", status=404, mimetype="text/plain")
+            return flask.jsonify(result)
+
+
+summaryColumns = ["start", "end", "fuel", "distance", "averageSpeed", "fuelPer100km",
+                  "engineTime", "drivingTime", "idleTime", "resets"]
+
+
+# Totals -> fuel [l], distance [km], speed [km/h], times [s], None for what
+# is not known (yet)
+def summarize(totals):
+    if(totals is None):
+        return None
+    fuel = totals["fuelHr"] if(totals["fuelHr"] > 0) else totals["fuelLfc"]
+    distance = totals["distance"] / 1000
+    rateFuel = totals["rateFuel"] if(totals["rateFuel"] > 0) else fuel
+    return {"start": pd.Timestamp(totals["start"]).isoformat(),
+            "end": pd.Timestamp(totals["end"]).isoformat(),
+            "fuel": fuel,
+            "distance": distance,
+            "averageSpeed": distance / (totals["drivingTime"] / 3600) if(totals["drivingTime"] > 0) else None,
+            "fuelPer100km": 100 * rateFuel / distance if(distance > 0) else None,
+            "engineTime": totals["engineTime"],
+            "drivingTime": totals["drivingTime"],
+            "idleTime": totals["idleTime"],
+            "resets": int(totals["resets"])}
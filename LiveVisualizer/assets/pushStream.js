@@ -0,0 +1,29 @@
+// Appends the samples streamed from /stream/<vehicle> (PushStream.py) to the
+// live graph. graph-state holds the vehicle, the window length and the
+// sequence number of the snapshot the server sent, the stream continues right
+// after it.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    pushStream: {
+        connect: function(state) {
+            if(window.pushStreamSource) {
+                window.pushStreamSource.close();
+                window.pushStreamSource = null;
+            }
+            if(!state || !state.vehicle) {
+                return null;
+            }
+            var url = "/stream/" + encodeURIComponent(state.vehicle) + "?since=" + state.sequence +
+                      (state.length ? "&length=" + state.length : "");
+            var source = new EventSource(url);
+            source.onmessage = function(event) {
+                var graph = document.querySelector("#live-update-graph .js-plotly-plot");
+                if(graph) {
+                    var update = JSON.parse(event.data);  // [data, indices, maxPoints] like extendData
+                    Plotly.extendTraces(graph, update[0], update[1], update[2]);
+                }
+            };
+            window.pushStreamSource = source;
+            return state.vehicle;
+        }
+    }
+});
@@ -0,0 +1,60 @@
+###############################################################################
+# file    test_RingBuffer.py
+###############################################################################
+# brief   Fleet window partitioning of generated traffic by vehicle
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+from TrafficGenerator import generateFrames
+from RingBuffer import FleetWindow
+
+
+# Every frame ends up in the window of its vehicle, selected by name
+def test_fleetWindow():
+    frames = generateFrames(3, 10.0)
+    fleet = FleetWindow(60)
+    fleet.add(frames[::2])
+    fleet.add(frames[1::2])
+    assert fleet.vehicles == ["vehicle000", "vehicle001", "vehicle002"]
+    assert fleet.version == 2
+    for name in fleet.vehicles:
+        assert name in fleet
+        assert len(fleet[name]) == np.count_nonzero(frames.names() == name)
+    assert "vehicle003" not in fleet
+
+
+# Only the last maxDisplayTime seconds are kept, per vehicle
+def test_fleetWindowTrim():
+    frames = generateFrames(2, 30.0, pgns=[0xFE6C])
+    fleet = FleetWindow(10)
+    fleet.add(frames)
+    for name in fleet.vehicles:
+        time = fleet[name].rings[0xFE6C]["time"]
+        assert len(time) > 0
+        assert time[-1] - time[0] <= 10 * 10**9
@@ -0,0 +1,70 @@
+###############################################################################
+# file    test_Rollups.py
+###############################################################################
+# brief   Rollup level choice keeps the static plot traces within the screen budget
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+import pandas as pd
+from Downsampling import screenPoints, downsample
+from Rollups import rollupLevels, rollupLevel, rollupTrace
+
+
+# Rollup frame of one bucket per resolution over [start, end], plus the bucket
+# before start FrameStore.rollup() returns as well
+def bucketFrame(start, end, resolution, rng):
+    step = resolution * 10**9
+    date = np.arange(start // step * step - step, end, step)
+    low = rng.normal(50, 10, len(date))
+    return pd.DataFrame({"date": date.astype("datetime64[ns]"), "count": 1, "min": low, "max": low + 5,
+                         "mean": low + 2, "last": low + 1})
+
+
+# From a few minutes up to a year: the trace never exceeds screenPoints
+def test_traceWithinBudget():
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2021-11-17").value
+    for days in [0.005, 0.02, 0.2, 1, 2, 7, 20, 100, 365]:
+        end = start + int(days * 86400e9)
+        level = rollupLevel(start, end, screenPoints)
+        if(level is None):
+            time = np.arange(start, end, 10**8)  # Raw frames at 10 Hz
+            x, y = downsample(time.astype("datetime64[ns]"), rng.normal(size=len(time)), start=start, end=end)
+        else:
+            x, y = rollupTrace(bucketFrame(start, end, level, rng), level, screenPoints)
+        assert len(x) <= screenPoints + 2, days  # Plus one point beyond each edge
+        assert len(x) >= screenPoints // 4, days  # Still resolves the view
+
+
+def test_levelChoice():
+    start = pd.Timestamp("2021-11-17").value
+    hour = 3600 * 10**9
+    assert rollupLevel(start, start + hour // 4, screenPoints) is None  # 900 one-second buckets
+    assert rollupLevel(start, start + 6 * hour, screenPoints) == 10
+    assert rollupLevel(start, start + 480 * hour, screenPoints) == rollupLevels[-1]
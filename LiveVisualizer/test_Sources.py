@@ -0,0 +1,89 @@
+###############################################################################
+# file    test_Sources.py
+###############################################################################
+# brief   Frames sent with FrameSender or put into a queue arrive unchanged
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import time
+import numpy as np
+from TrafficGenerator import generateFrames
+from FrameArray import FrameArray
+from Sources import SocketSource, QueueSource, FrameSender, openSource, encodeRecords
+
+
+def sameFrames(received, frames):
+    order = np.lexsort((received.pgn, received.time, received.vehicle))
+    expected = np.lexsort((frames.pgn, frames.time, frames.vehicle))
+    return all((getattr(received, c)[order] == getattr(frames, c)[expected]).all() for c in FrameArray.dtypes)
+
+
+# Reads the source until count frames arrived or timeout seconds passed
+def readAll(source, count, timeout=5.0):
+    parts = []
+    deadline = time.monotonic() + timeout
+    while(sum(len(p) for p in parts) < count and time.monotonic() < deadline):
+        parts += source.read(0.05)
+    return FrameArray.concat(parts)
+
+
+def roundTrip(protocol):
+    frames = generateFrames(3, 5.0)
+    source = openSource(f"{protocol}://127.0.0.1:0")
+    assert isinstance(source, SocketSource)
+    host, port = source.address
+    sender = FrameSender(f"{protocol}://{host}:{port}")
+    try:
+        for begin in range(0, len(frames), 500):
+            sender.send(frames[begin:begin + 500])
+            time.sleep(0.001)  # Datagrams of a loopback burst could overflow the receive buffer
+        received = readAll(source, len(frames))
+    finally:
+        sender.close()
+        source.close()
+    assert len(received) == len(frames)
+    assert sameFrames(received, frames)
+
+
+def test_udpRoundTrip():
+    roundTrip("udp")
+
+
+def test_tcpRoundTrip():
+    roundTrip("tcp")
+
+
+# FrameArrays and binary records alike, filtered by PGN like the other sources
+def test_queueSource():
+    frames = generateFrames(2, 5.0, pgns=[0xFE6C, 0xF004])
+    source = QueueSource(pgns=[0xFE6C])
+    source.put(frames[:100])
+    source.put(encodeRecords(frames[100:]))
+    received = FrameArray.concat(source.read())
+    assert source.read() == []
+    assert sameFrames(received, frames[frames.pgn == 0xFE6C])
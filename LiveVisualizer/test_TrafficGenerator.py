@@ -0,0 +1,61 @@
+###############################################################################
+# file    test_TrafficGenerator.py
+###############################################################################
+# brief   Generated traffic read back through the CSV reader
+###############################################################################
+# author  Fleet Monitor contributors
+# version 1.0
+# date    2026-10-18
+###############################################################################
+# MIT License
+#
+# Copyright (c) 2021 Institute for Networked Solutions OST
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+###############################################################################
+
+import numpy as np
+from TrafficGenerator import generateFrames, writeCsv, writeCandump, writeFiles
+from CsvReader import parseCsv
+from FrameArray import FrameArray
+
+
+# Three vehicles written as network-tool CSV and parsed like an appended block
+# come back unchanged
+def test_csvRoundTrip(tmp_path):
+    frames = generateFrames(3, 10.0)
+    writeCsv(tmp_path / "0.csv", frames)
+    parsed = FrameArray.fromFrame(parseCsv((tmp_path / "0.csv").read_bytes()))
+
+    assert len(parsed) == len(frames)
+    assert np.abs(parsed.time - frames.time).max() <= 1000  # CSV keeps microseconds
+    assert (parsed.pgn == frames.pgn).all()
+    assert (parsed.payload == frames.payload).all()
+    assert parsed.vehicles == ["vehicle000", "vehicle001", "vehicle002"]
+
+
+# Every generated frame is written exactly once, whatever the number of files
+def test_writeFiles(tmp_path):
+    frames = generateFrames(2, 30.0)
+    for files in [1, 3, 7]:
+        writeFiles(tmp_path / f"csv{files}", frames, files)
+        rows = sum(len(f.read_bytes().splitlines()) for f in (tmp_path / f"csv{files}").glob("*.csv"))
+        assert rows == len(frames), files
+    writeFiles(tmp_path / "candump", frames, 4, writer=writeCandump, suffix=".log")
+    assert sum(len(f.read_bytes().splitlines()) for f in (tmp_path / "candump").glob("*.log")) == len(frames)